@@ -1,21 +1,95 @@
-from langchain_google_vertexai import ChatVertexAI
+from functools import lru_cache
 
 from ale.core.config import config as c
+from ale.agents.artifacts import AgentArtifacts
+from ale.agents.cache import TieredLLMCache
+from ale.agents.history import HistoryWindow
 from ale.agents.resume import ResumeAgent
+from ale.agents.router import ModelRouter
+from ale.agents.speculative import SpeculativeRenderer
 
 
 def create_resume_agent():
     """Create default resume agent."""
-    llm = ChatVertexAI(
-        model_name=c.VERTEXAI_MODEL_NAME,
-        temperature=c.VERTEXAI_TEMPERATURE,
-        max_output_tokens=c.VERTEXAI_MAX_OUTPUT_TOKENS,
-        top_p=c.VERTEXAI_TOP_P,
+    # Deferred, as importing the Vertex AI SDK takes seconds.
+    from langchain_google_vertexai import ChatVertexAI
+
+    cache = (
+        TieredLLMCache(c.LLM_CACHE_PATH, c.LLM_CACHE_MAX_ENTRIES)
+        if c.LLM_CACHE_ENABLED
+        else None
+    )
+
+    def chat_model(model_name: str) -> ChatVertexAI:
+        return ChatVertexAI(
+            model_name=model_name,
+            temperature=c.VERTEXAI_TEMPERATURE,
+            max_output_tokens=c.VERTEXAI_MAX_OUTPUT_TOKENS,
+            top_p=c.VERTEXAI_TOP_P,
+            cache=cache,
+        )
+
+    llm = chat_model(c.VERTEXAI_MODEL_NAME)
+    return ResumeAgent(
+        model=llm,
+        incremental=c.RESUME_INCREMENTAL_EXTRACTION,
+        pre_extraction=c.RESUME_PRE_EXTRACTION,
+        section_extraction=c.RESUME_SECTION_EXTRACTION,
+        section_min_tokens=c.RESUME_SECTION_MIN_TOKENS,
+        document_ingestion=c.RESUME_DOCUMENT_INGESTION,
+        upload_dir=c.RESUME_UPLOAD_DIR,
+        ingest_chunk_chars=c.RESUME_INGEST_CHUNK_CHARS,
+        ingest_concurrency=c.RESUME_INGEST_CONCURRENCY,
+        history=(
+            HistoryWindow(llm, c.HISTORY_MAX_TOKENS, c.HISTORY_KEEP_TURNS)
+            if c.HISTORY_WINDOW_ENABLED
+            else None
+        ),
+        speculative=(
+            SpeculativeRenderer(c.RESUME_SPECULATIVE_WORKERS)
+            if c.RESUME_SPECULATIVE_RENDER
+            else None
+        ),
+        router=(
+            ModelRouter(
+                fast=chat_model(c.VERTEXAI_FAST_MODEL_NAME),
+                full=llm,
+                max_tokens=c.LLM_ROUTER_MAX_TOKENS,
+                max_lines=c.LLM_ROUTER_MAX_LINES,
+                max_prompt_tokens=c.LLM_ROUTER_MAX_PROMPT_TOKENS,
+            )
+            if c.LLM_ROUTER_ENABLED
+            else None
+        ),
     )
-    return ResumeAgent(model=llm)
 
 
-resume_agent = create_resume_agent().agent
+@lru_cache(maxsize=None)
+def get_resume_agent() -> ResumeAgent:
+    """Default resume agent, created on first use and shared afterwards."""
+    return create_resume_agent()
+
+
+def resume_graph():
+    """Graph factory served through `langgraph.json`."""
+    return get_resume_agent().agent
+
+
+def __getattr__(name: str):
+    # `resume_agent` is resolved on first access, so importing this package
+    # neither loads the Vertex AI SDK nor needs credentials.
+    if name == "resume_agent":
+        return resume_graph()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
-__all__ = ["resume_agent"]
+__all__ = [
+    "AgentArtifacts",
+    "HistoryWindow",
+    "ResumeAgent",
+    "TieredLLMCache",
+    "create_resume_agent",
+    "get_resume_agent",
+    "resume_agent",
+    "resume_graph",
+]
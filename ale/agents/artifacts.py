@@ -0,0 +1,117 @@
+"""Precompiled prompt and schema artifacts for agent hot paths."""
+import threading
+from dataclasses import dataclass, field
+from weakref import WeakKeyDictionary
+
+from langchain_core.language_models.base import BaseLanguageModel
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import Runnable
+from pydantic import BaseModel
+
+from ale.agents.streaming import NOSTREAM
+from ale.tools.utils import get_pydantic_schema
+
+
+@dataclass
+class AgentArtifacts:
+    """Per-agent memo of everything a turn needs besides the LLM call.
+
+    Structured-output runnables and serialized schemas are cached per
+    Pydantic class in weak mappings, so a class that is redefined or
+    garbage collected never serves stale entries. Runnables are also bound
+    to `model` and are dropped whenever a different model is assigned.
+
+    Example:
+        >>> artifacts = AgentArtifacts(model)
+        >>> extractor = artifacts.structured(ResumeData)
+        >>> schema = artifacts.schema(ResumeData, ["name", "email"])
+    """
+
+    model: BaseLanguageModel
+    _runnables: WeakKeyDictionary = field(
+        default_factory=WeakKeyDictionary, init=False, repr=False
+    )
+    _schemas: WeakKeyDictionary = field(
+        default_factory=WeakKeyDictionary, init=False, repr=False
+    )
+    _templates: dict[str, PromptTemplate] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    _bound_model: BaseLanguageModel = field(
+        default=None, init=False, repr=False
+    )
+    _lock: threading.Lock = field(
+        default_factory=threading.Lock, init=False, repr=False
+    )
+
+    def structured(
+        self, schema: type[BaseModel], include_raw: bool = True
+    ) -> Runnable:
+        """Structured-output runnable of `model` for `schema`.
+
+        Its calls are kept out of streamed replies.
+
+        Args:
+            schema (type[BaseModel]): output model class.
+            include_raw (bool): whether the raw message is returned
+                alongside the parsed output.
+
+        Returns:
+            Runnable
+        """
+        with self._lock:
+            if self._bound_model is not self.model:
+                self._runnables.clear()
+                self._bound_model = self.model
+            cache = self._runnables.setdefault(schema, {})
+            if include_raw not in cache:
+                cache[include_raw] = self.model.with_structured_output(
+                    schema, include_raw=include_raw
+                ).with_config(tags=NOSTREAM)
+            return cache[include_raw]
+
+    def schema(
+        self, schema: type[BaseModel], include_fields: list[str] = None
+    ) -> str:
+        """Serialized schema from `get_pydantic_schema`, cached per subset.
+
+        Args:
+            schema (type[BaseModel]): model class to describe.
+            include_fields (list[str]): fields to keep. Default is None,
+                meaning every field.
+
+        Returns:
+            str: model schema
+        """
+        key = frozenset(include_fields) if include_fields else None
+        with self._lock:
+            cache = self._schemas.setdefault(schema, {})
+            if key not in cache:
+                cache[key] = get_pydantic_schema(schema, include_fields)
+            return cache[key]
+
+    def template(self, template: str, **partials) -> PromptTemplate:
+        """Parsed f-string prompt template with constant variables bound.
+
+        Args:
+            template (str): f-string prompt template.
+            **partials: variables that do not change between turns.
+
+        Returns:
+            PromptTemplate
+        """
+        key = repr((template, sorted(partials.items())))
+        with self._lock:
+            if key not in self._templates:
+                self._templates[key] = PromptTemplate.from_template(
+                    template
+                ).partial(**partials)
+            return self._templates[key]
+
+    def invalidate(self):
+        """Drop every cached artifact."""
+        with self._lock:
+            self._runnables.clear()
+            self._schemas.clear()
+            self._templates.clear()
+            self._bound_model = None
@@ -0,0 +1,181 @@
+"""Tiered response cache for chat models."""
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from langchain_core.caches import RETURN_VAL_TYPE, BaseCache
+from langchain_core.load import dumps, loads
+from langchain_core.outputs import ChatGeneration
+
+_LOGGER = logging.getLogger(__name__)
+
+# message attributes that differ between otherwise identical prompts
+_VOLATILE_KEYS = frozenset(
+    ["id", "response_metadata", "usage_metadata", "additional_kwargs"]
+)
+
+
+def _normalize(value: Any) -> Any:
+    if isinstance(value, dict):
+        if value.get("type") == "constructor" and "kwargs" in value:
+            return {
+                "type": value["id"][-1],
+                **{
+                    key: _normalize(item)
+                    for key, item in value["kwargs"].items()
+                    if key not in _VOLATILE_KEYS
+                },
+            }
+        return {
+            key: _normalize(item)
+            for key, item in value.items()
+            if key != "id"
+        }
+    if isinstance(value, list):
+        return [_normalize(item) for item in value]
+    return value
+
+
+def cache_key(prompt: str, llm_string: str) -> str:
+    """Key a model call by its normalized messages and model parameters.
+
+    Message ids and response metadata are dropped, so replaying a
+    conversation produces the same keys as the original run.
+
+    Args:
+        prompt (str): serialized messages, as passed to `BaseCache.lookup`.
+        llm_string (str): serialized model parameters and bound tools.
+
+    Returns:
+        str: hex encoded sha256 digest.
+    """
+    try:
+        normalized = json.dumps(
+            _normalize(json.loads(prompt)),
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+    except ValueError:
+        normalized = prompt
+    digest = hashlib.sha256(normalized.encode("utf-8"))
+    digest.update(b"\0" + llm_string.encode("utf-8"))
+    return digest.hexdigest()
+
+
+class TieredLLMCache(BaseCache):
+    """Bounded in-memory LRU in front of a local SQLite store.
+
+    Only worth enabling with deterministic sampling (temperature 0), where
+    identical prompts produce identical responses. Returned messages carry
+    no id, so replayed responses never collide with messages already in a
+    conversation.
+
+    Args:
+        path (str): SQLite database file. `:memory:` keeps the second tier
+            in process too.
+        max_entries (int): capacity of the in-memory tier.
+        ttl (float): seconds a stored response stays valid. Default is
+            None, meaning forever.
+    """
+
+    def __init__(
+        self, path: str, max_entries: int = 1024, ttl: float = None
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """Lazily opened connection to the on-disk tier."""
+        if not hasattr(self, "_connection"):
+            if self.path != ":memory:":
+                Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(self.path, check_same_thread=False)
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                "created REAL NOT NULL)"
+            )
+            setattr(self, "_connection", connection)
+        return getattr(self, "_connection")
+
+    def _remember(self, key: str, value: str):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def lookup(self, prompt: str, llm_string: str) -> RETURN_VAL_TYPE | None:
+        key = cache_key(prompt, llm_string)
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return loads(value)
+
+            row = self.connection.execute(
+                "SELECT value, created FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and (self.ttl is None or time.time() - row[1] < self.ttl):
+                self._remember(key, row[0])
+                self.hits += 1
+                self.disk_hits += 1
+                return loads(row[0])
+
+            self.misses += 1
+            return None
+
+    def update(
+        self, prompt: str, llm_string: str, return_val: RETURN_VAL_TYPE
+    ):
+        generations = []
+        for generation in return_val:
+            if isinstance(generation, ChatGeneration):
+                generation = generation.model_copy(
+                    update={
+                        "message": generation.message.model_copy(
+                            update={"id": None}
+                        )
+                    }
+                )
+            generations.append(generation)
+        key = cache_key(prompt, llm_string)
+        value = dumps(generations)
+        with self._lock:
+            self._remember(key, value)
+            self.connection.execute(
+                "INSERT OR REPLACE INTO llm_cache VALUES (?, ?, ?)",
+                (key, value, time.time()),
+            )
+            self.connection.commit()
+
+    def clear(self, **kwargs: Any):
+        with self._lock:
+            self._memory.clear()
+            self.connection.execute("DELETE FROM llm_cache")
+            self.connection.commit()
+
+    def stats(self) -> dict[str, float]:
+        """Hit and miss counters since the cache was created."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.hits - self.disk_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
@@ -0,0 +1,124 @@
+"""Conversation window trimming with a rolling summary."""
+import logging
+from dataclasses import dataclass, field
+from typing import Callable
+
+from langchain_core.language_models.base import BaseLanguageModel
+from langchain_core.messages import (
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    get_buffer_string,
+)
+from langchain_core.messages.utils import count_tokens_approximately
+
+from ale.agents.streaming import NOSTREAM
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class HistoryWindow:
+    """Keep the messages sent to the LLM within a token budget.
+
+    The graph node `summarize` folds messages that fall out of the window
+    into a running summary kept in state (`summary`, `summarized_until`).
+    LLM nodes then call `messages` to get the summary followed by the
+    recent messages. The window keeps at least the last `keep_turns` turns
+    verbatim, where a turn starts at a human message, so tool calls are
+    never split from their results. The summary is only recomputed when
+    the window start moves, i.e. when the recent messages exceed
+    `max_tokens`.
+
+    Args:
+        model (BaseLanguageModel): model writing the summary.
+        max_tokens (int): token budget of the verbatim messages.
+        keep_turns (int): turns kept verbatim regardless of the budget.
+    """
+
+    model: BaseLanguageModel
+    max_tokens: int = 4000
+    keep_turns: int = 4
+    summary_prompt: str = field(
+        default=(
+            "You maintain a running summary of a conversation. Update the "
+            "summary with the new messages, keeping every fact the user "
+            "shared about themselves. Reply with the summary only."
+        )
+    )
+    token_counter: Callable[[list[BaseMessage]], int] = field(
+        default=count_tokens_approximately, repr=False
+    )
+
+    def _pending(self, state) -> list[BaseMessage]:
+        messages = state["messages"]
+        since = state.get("summarized_until")
+        ids = [message.id for message in messages]
+        return messages[ids.index(since) + 1:] if since in ids else messages
+
+    def _split(self, messages: list[BaseMessage]) -> int:
+        """Index of the first verbatim message in `messages`."""
+        if self.token_counter(messages) <= self.max_tokens:
+            return 0
+        starts = [
+            index
+            for index, message in enumerate(messages)
+            if message.type == "human"
+        ]
+        if len(starts) <= self.keep_turns:
+            return 0
+        split = starts[-self.keep_turns]
+        for start in starts[-self.keep_turns - 1::-1]:
+            if self.token_counter(messages[start:]) > self.max_tokens:
+                break
+            split = start
+        return split
+
+    def _summary_input(self, state, folded: list[BaseMessage]) -> list:
+        return [
+            SystemMessage(content=self.summary_prompt),
+            HumanMessage(
+                content=(
+                    f"Current summary:\n{state.get('summary') or '-'}\n\n"
+                    f"New messages:\n{get_buffer_string(folded)}"
+                )
+            ),
+        ]
+
+    def _folded(self, state) -> list[BaseMessage]:
+        pending = self._pending(state)
+        return pending[:self._split(pending)]
+
+    def summarize(self, state) -> dict:
+        """Graph node folding messages that left the window."""
+        folded = self._folded(state)
+        if not folded:
+            return {}
+        _LOGGER.info("Summarizing %d messages out of window", len(folded))
+        summary = self.model.invoke(
+            self._summary_input(state, folded), {"tags": NOSTREAM}
+        )
+        return {"summary": summary.content, "summarized_until": folded[-1].id}
+
+    async def asummarize(self, state) -> dict:
+        """Async counterpart of `summarize`."""
+        folded = self._folded(state)
+        if not folded:
+            return {}
+        _LOGGER.info("Summarizing %d messages out of window", len(folded))
+        summary = await self.model.ainvoke(
+            self._summary_input(state, folded), {"tags": NOSTREAM}
+        )
+        return {"summary": summary.content, "summarized_until": folded[-1].id}
+
+    def messages(self, state) -> list[BaseMessage]:
+        """Messages to send to the LLM: summary first, then the window."""
+        recent = self._pending(state)
+        if not state.get("summary"):
+            return recent
+        return [
+            SystemMessage(
+                content=f"Summary of the earlier conversation:\n"
+                f"{state['summary']}"
+            )
+        ] + recent
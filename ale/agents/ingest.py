@@ -0,0 +1,295 @@
+"""Ingestion of existing resume documents into `ResumeData`.
+
+A document is read as a stream of chunks, each chunk is extracted into a
+partial `ResumeData` concurrently, and the partials are reduced into one,
+merging entries of the list sections that describe the same job, degree
+or certification. Text files are read line by line, PDF files page by
+page with `pypdf`.
+"""
+import asyncio
+import logging
+import re
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.runnables import Runnable, RunnableConfig
+from pydantic import BaseModel
+
+from ale.models.resume import ResumeData
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fields identifying the same entry of a list section across chunks.
+ENTRY_KEYS = {
+    "experience": ("company", "title"),
+    "education": ("institution", "degree"),
+    "certifications": ("name", "organization"),
+}
+_NON_WORD = re.compile(r"\W+")
+
+
+def _lines(path: Path) -> Iterator[str]:
+    if path.suffix.lower() == ".pdf":
+        # Deferred, as only uploads need it.
+        from pypdf import PdfReader
+
+        for page in PdfReader(path).pages:
+            yield from (page.extract_text() or "").splitlines()
+        return
+    with open(path, encoding="utf-8", errors="replace") as file:
+        for line in file:
+            yield line.rstrip("\n")
+
+
+def iter_chunks(
+    path: str, max_chars: int = 4000, overlap_lines: int = 2
+) -> Iterator[str]:
+    """Stream a document as chunks of whole lines.
+
+    Each chunk repeats the last `overlap_lines` lines of the previous one,
+    so an entry cut at a chunk boundary is seen whole at least once.
+
+    Args:
+        path (str): text or PDF document.
+        max_chars (int): chunk size, exceeded only by a single longer line.
+        overlap_lines (int): lines carried over to the next chunk.
+
+    Yields:
+        str: text of each chunk.
+    """
+    lines, size = [], 0
+    for line in _lines(Path(path)):
+        if lines and size + len(line) + 1 > max_chars:
+            yield "\n".join(lines)
+            lines = lines[-overlap_lines:] if overlap_lines else []
+            size = sum(len(kept) + 1 for kept in lines)
+        lines.append(line)
+        size += len(line) + 1
+    if any(line.strip() for line in lines):
+        yield "\n".join(lines)
+
+
+def _is_empty(value: Any) -> bool:
+    return value is None or value == "" or value == [] or value == {}
+
+
+def _normalize(value: Any) -> str:
+    return _NON_WORD.sub(" ", str(value or "")).strip().casefold()
+
+
+def dedupe_entries(entries: list, keys: tuple[str, ...]) -> list:
+    """Merge entries sharing the normalized values of `keys`.
+
+    The first entry is kept, its empty fields filled from the duplicates
+    and its list fields extended with the items it lacks. Entries with no
+    value for any of `keys` are kept as they are.
+
+    Args:
+        entries (list): models or dicts of one list section.
+        keys (tuple[str, ...]): fields identifying an entry.
+
+    Returns:
+        list: deduplicated entries, in first-seen order and of their
+            original type.
+    """
+    merged: dict[tuple, tuple[type, dict]] = {}
+    for entry in entries:
+        values = (
+            entry.model_dump() if isinstance(entry, BaseModel)
+            else dict(entry)
+        )
+        key = tuple(_normalize(values.get(name)) for name in keys)
+        if not any(key):
+            key = ("", len(merged))
+        if key not in merged:
+            merged[key] = (type(entry), values)
+            continue
+        current = merged[key][1]
+        for name, value in values.items():
+            if _is_empty(current.get(name)):
+                current[name] = value
+            elif isinstance(current[name], list) and isinstance(value, list):
+                current[name] = current[name] + [
+                    item for item in value if item not in current[name]
+                ]
+    return [
+        kind.model_construct(**values) if issubclass(kind, BaseModel)
+        else values
+        for kind, values in merged.values()
+    ]
+
+
+def merge_resume_data(parts: list[BaseModel]) -> ResumeData:
+    """Reduce partial extractions into one `ResumeData`.
+
+    Scalar fields keep the first value found, list sections are
+    concatenated and deduplicated with `ENTRY_KEYS`, and skill categories
+    are unioned.
+
+    Args:
+        parts (list[BaseModel]): partial resume data, in document order.
+
+    Returns:
+        ResumeData
+    """
+    values: dict[str, Any] = {}
+    for part in parts:
+        for name in ResumeData.model_fields:
+            value = getattr(part, name, None)
+            if _is_empty(value):
+                continue
+            current = values.get(name)
+            if current is None:
+                if isinstance(value, dict):
+                    value = {key: list(items) for key, items in value.items()}
+                elif isinstance(value, list):
+                    value = list(value)
+                values[name] = value
+            elif isinstance(current, list):
+                current.extend(value)
+            elif isinstance(current, dict):
+                for category, items in value.items():
+                    known = current.setdefault(category, [])
+                    known.extend(item for item in items if item not in known)
+    for name, keys in ENTRY_KEYS.items():
+        if name in values:
+            values[name] = dedupe_entries(values[name], keys)
+    return ResumeData.model_construct(**values)
+
+
+@dataclass
+class DocumentIngestor:
+    """Extract `ResumeData` from a document, chunk by chunk.
+
+    At most `max_concurrency` chunks are read ahead of the extractions in
+    flight, so memory stays bounded whatever the document size. Chunks
+    whose extraction cannot be parsed are logged and skipped.
+
+    Documents are only read from `upload_dir`: a path resolving anywhere
+    else, e.g. through `../` or a symlink, is rejected, as paths come from
+    the graph input.
+
+    Args:
+        structured (Callable): factory of the structured-output runnable
+            for a schema, returning the raw message alongside the parsed
+            output, e.g. `AgentArtifacts.structured`.
+        upload_dir (str): directory uploaded documents are saved to.
+        chunk_chars (int): chunk size passed to `iter_chunks`.
+        overlap_lines (int): lines repeated across chunk boundaries.
+        max_concurrency (int): chunk extractions running at once.
+    """
+
+    structured: Callable[[type[BaseModel]], Runnable]
+    upload_dir: str = "data/uploads"
+    chunk_chars: int = 4000
+    overlap_lines: int = 2
+    max_concurrency: int = 4
+    prompt: str = field(
+        default=(
+            "Extract the resume fields found in this part of the user's "
+            "resume document. Leave out anything that is not in it.\n"
+        )
+    )
+
+    def _input(self, chunk: str) -> list:
+        return [SystemMessage(content=self.prompt), HumanMessage(chunk)]
+
+    def resolve(self, path: str) -> Path:
+        """Uploaded document at `path`, relative to `upload_dir`.
+
+        Raises:
+            ValueError: `path` is not a file inside `upload_dir`.
+        """
+        root = Path(self.upload_dir).resolve()
+        resolved = (root / path).resolve()
+        if not resolved.is_relative_to(root) or not resolved.is_file():
+            raise ValueError(f"No uploaded document {path!r}")
+        return resolved
+
+    def _chunks(self, path: str) -> Iterator[str]:
+        return iter_chunks(
+            str(self.resolve(path)), self.chunk_chars, self.overlap_lines
+        )
+
+    def ingest(self, path: str, config: RunnableConfig = None) -> ResumeData:
+        """Extract and merge the resume data of the document at `path`.
+
+        Args:
+            path (str): text or PDF document under `upload_dir`.
+            config (RunnableConfig): config of the extraction calls.
+
+        Returns:
+            ResumeData
+
+        Raises:
+            ValueError: `path` is not a file inside `upload_dir`.
+        """
+        start = time.monotonic()
+        runnable = self.structured(ResumeData)
+        futures, in_flight = [], set()
+        with ThreadPoolExecutor(self.max_concurrency) as executor:
+            for chunk in self._chunks(path):
+                if len(in_flight) >= self.max_concurrency:
+                    _, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                future = executor.submit(
+                    runnable.invoke, self._input(chunk), config
+                )
+                futures.append(future)
+                in_flight.add(future)
+            responses = [future.result() for future in futures]
+        return self._reduce(path, responses, start)
+
+    async def aingest(
+        self, path: str, config: RunnableConfig = None
+    ) -> ResumeData:
+        """Async counterpart of `ingest`."""
+        start = time.monotonic()
+        runnable = self.structured(ResumeData)
+        chunks = self._chunks(path)
+        slots = asyncio.Semaphore(self.max_concurrency)
+
+        async def extract(chunk: str) -> dict:
+            try:
+                return await runnable.ainvoke(self._input(chunk), config)
+            finally:
+                slots.release()
+
+        tasks = []
+        try:
+            while True:
+                await slots.acquire()
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                tasks.append(asyncio.create_task(extract(chunk)))
+        finally:
+            responses = await asyncio.gather(*tasks)
+        return self._reduce(path, responses, start)
+
+    def _reduce(
+        self, path: str, responses: list[dict], start: float
+    ) -> ResumeData:
+        parts = []
+        for index, response in enumerate(responses):
+            if response["parsed"] is None:
+                _LOGGER.warning(
+                    "Could not parse chunk %d of %s: %s",
+                    index,
+                    Path(path).name,
+                    response["parsing_error"],
+                )
+                continue
+            parts.append(response["parsed"])
+        data = merge_resume_data(parts)
+        _LOGGER.info(
+            "Ingested %s from %d chunks in %.3fs, missing: %s",
+            Path(path).name,
+            len(responses),
+            time.monotonic() - start,
+            data.missing_fields(),
+        )
+        return data
@@ -0,0 +1,175 @@
+"""Rule-based extraction of contact fields from user messages."""
+import re
+from dataclasses import dataclass, field
+
+from langchain_core.messages import BaseMessage
+
+_URL = r"(?:https?://)?(?:www\.)?"
+PATTERNS = {
+    "email": re.compile(r"\b[\w.+-]+@[\w-]+(?:\.[\w-]+)*\.[a-z]{2,}\b", re.I),
+    "linkedin": re.compile(
+        _URL + r"(?:[a-z]{2}\.)?linkedin\.com/in/[\w%-]+/?", re.I
+    ),
+    "github": re.compile(_URL + r"github\.com/[\w-]+/?", re.I),
+    "phone": re.compile(
+        r"(?<![\w/])\+?\(?\d{1,4}\)?(?:[\s.-]?\(?\d{2,4}\)?){2,4}(?!\w)"
+    ),
+    "website": re.compile(
+        r"(?:https?://|www\.)[\w-]+(?:\.[\w-]+)+(?:/[\w./%#?=&-]*)?", re.I
+    ),
+}
+# bare domains are only taken as a website when the user says so
+_BARE_DOMAIN = re.compile(
+    r"\b(?:website|site|portfolio|blog|homepage)\b[^\n]*?"
+    r"\b((?:[\w-]+\.)+[a-z]{2,}(?:/[\w./%#?=&-]*)?)",
+    re.I,
+)
+_FILLER = frozenset(
+    "a an and are as at by can contact do does email for found handle here "
+    "i i'm im is it it's its linkedin mail me mine my number of on or our "
+    "phone please profile reach site sure that's the this to url use via "
+    "website github you your yes ok okay also".split()
+)
+# the user asks for the resume as it is, optional sections left out
+_GENERATE = re.compile(
+    r"\b(?:go ahead|that'?s (?:fine|all|enough|it)"
+    r"|(?:generate|create|build|make|render) (?:it|my resume|the resume)"
+    r"|skip (?:it|them|that|those|the rest))\b",
+    re.I,
+)
+# ... unless the request is put off
+_DEFER = re.compile(
+    r"\b(?:don['\u2019]?t|do not|not yet|until|wait|hold off)\b", re.I
+)
+# keywords introducing a field right before its value
+_CUES = {
+    "phone": re.compile(
+        r"\b(?:phone|tel|telp|mobile|cell|call|whatsapp|number|reach me)\b"
+        r"[^\d\n]{0,25}$",
+        re.I,
+    ),
+}
+_WORD = re.compile(r"[a-z']+", re.I)
+_DATE = re.compile(r"^\d{1,4}[./-]\d{1,2}[./-]\d{1,4}$")
+_YEARS = re.compile(r"^(?:19|20)\d{2}\s*[-/]\s*(?:19|20)\d{2}$")
+_IP = re.compile(r"^\d{1,3}(?:\.\d{1,3}){3}$")
+# digits grouped by thousands, e.g. a salary of "120 000 000"
+_AMOUNT = re.compile(r"^\d{1,3}(?:[\s.,]\d{3})+$")
+
+
+def _is_cued(name: str, text: str, match: re.Match) -> bool:
+    cue = _CUES.get(name)
+    return bool(cue and cue.search(text, 0, match.start()))
+
+
+def _is_valid(name: str, value: str, cued: bool = False) -> bool:
+    if name != "phone":
+        return True
+    digits = sum(char.isdigit() for char in value)
+    return (
+        7 <= digits <= 15
+        and not _DATE.match(value)
+        and not _YEARS.match(value)
+        and not _IP.match(value)
+        and (cued or not _AMOUNT.match(value))
+    )
+
+
+@dataclass
+class PreExtraction:
+    """Fields found in a turn and whether they are all it contained."""
+
+    fields: dict[str, str] = field(default_factory=dict)
+    complete: bool = True
+    # fields matched without their keyword, e.g. a bare number as phone
+    weak: set[str] = field(default_factory=set)
+
+
+def pre_extract(text: str) -> PreExtraction:
+    """Pull contact fields out of a message with compiled patterns.
+
+    Patterns run in a fixed order and each match is cut from the text
+    before the next one runs, so e.g. the domain of an email address is
+    never taken as a website. A phone number right after a keyword such
+    as "phone" or "call" is preferred over the first one found, and only
+    such a number may look like an amount.
+
+    Args:
+        text (str): message content.
+
+    Returns:
+        PreExtraction: the first match per field, and whether the rest of
+            the message is only filler words around them.
+    """
+    result = PreExtraction()
+    for name, pattern in PATTERNS.items():
+        matches, cued = [], []
+        for match in pattern.finditer(text):
+            is_cued = _is_cued(name, text, match)
+            if _is_valid(name, match.group(0).strip(), is_cued):
+                matches.append(match)
+                if is_cued:
+                    cued.append(match)
+        if name == "website" and not matches:
+            match = _BARE_DOMAIN.search(text)
+            if match:
+                result.fields[name] = match.group(1)
+                text = text[:match.start(1)] + " " + text[match.end(1):]
+            continue
+        if matches:
+            result.fields[name] = (cued or matches)[0].group(0).strip()
+            if name in _CUES and not cued:
+                result.weak.add(name)
+            for match in reversed(matches):
+                text = text[:match.start()] + " " + text[match.end():]
+
+    words = (word.lower() for word in _WORD.findall(text))
+    result.complete = all(word in _FILLER for word in words)
+    return result
+
+
+def pre_extract_messages(messages: list[BaseMessage]) -> PreExtraction:
+    """Run `pre_extract` over the human messages, later ones winning.
+
+    A weak match only replaces an earlier weak one, never a field found
+    next to its keyword.
+
+    Args:
+        messages (list[BaseMessage]): conversation messages.
+
+    Returns:
+        PreExtraction: merged fields, complete only if every human message
+            held nothing but contact fields.
+    """
+    result = PreExtraction()
+    for message in messages:
+        if message.type != "human" or not isinstance(message.content, str):
+            continue
+        extraction = pre_extract(message.content)
+        for name, value in extraction.fields.items():
+            if name in extraction.weak:
+                if name in result.fields and name not in result.weak:
+                    continue
+                result.weak.add(name)
+            else:
+                result.weak.discard(name)
+            result.fields[name] = value
+        result.complete = result.complete and extraction.complete
+    return result
+
+
+def wants_generation(message: BaseMessage) -> bool:
+    """Whether a human message asks to generate the resume right away.
+
+    Args:
+        message (BaseMessage): latest message of the conversation.
+
+    Returns:
+        bool
+    """
+    return (
+        message.type == "human"
+        and isinstance(message.content, str)
+        and bool(_GENERATE.search(message.content))
+        and not _DEFER.search(message.content)
+    )
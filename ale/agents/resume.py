@@ -1,20 +1,64 @@
 """Resume Agent."""
 
-import json
 import logging
+import re
 from dataclasses import dataclass, field
 
 from langchain_core.language_models.base import BaseLanguageModel
-from langchain_core.messages import HumanMessage, SystemMessage
-from langgraph.checkpoint.memory import MemorySaver
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import END, START, StateGraph
+from pydantic import BaseModel
 
+from ale.agents.artifacts import AgentArtifacts
+from ale.agents.history import HistoryWindow
+from ale.agents.ingest import DocumentIngestor, merge_resume_data
+from ale.agents.preextract import pre_extract_messages, wants_generation
+from ale.agents.router import ModelRouter
+from ale.agents.sections import SectionExtractor
+from ale.agents.speculative import SpeculativeRenderer
+from ale.agents.streaming import areply_tokens, reply_tokens
+from ale.core.checkpoint import create_checkpointer
 from ale.core.config import config as c
-from ale.models.resume import ResumeData, ResumeState
+from ale.core.metrics import instrument
+from ale.models.resume import (
+    COLLECTION_FIELDS,
+    OPTIONAL_FIELDS,
+    ResumeData,
+    ResumeState,
+    partial_resume_model,
+)
 from ale.tools.resume import tool_generate_resume
-from ale.tools.utils import get_pydantic_schema
 
 _LOGGER = logging.getLogger(__name__)
+# nodes whose model output is the reply streamed to the user
+REPLY_NODES = frozenset(["ask_more"])
+# words showing a message talks about a scalar field, e.g. to correct it
+_MENTIONS = {
+    "name": re.compile(r"\bname\b", re.I),
+    "title": re.compile(r"\b(?:title|role|position)\b", re.I),
+    "email": re.compile(r"\be-?mail\b", re.I),
+    "phone": re.compile(r"\b(?:phone|mobile|tel|number)\b", re.I),
+    "linkedin": re.compile(r"\blinkedin\b", re.I),
+    "github": re.compile(r"\bgithub\b", re.I),
+    "website": re.compile(
+        r"\b(?:website|site|portfolio|blog|homepage)\b", re.I
+    ),
+    "summary": re.compile(r"\b(?:summary|about me|bio)\b", re.I),
+}
+
+
+def _mentioned_fields(messages: list[BaseMessage]) -> set[str]:
+    """Scalar fields the human messages talk about, per `_MENTIONS`."""
+    text = "\n".join(
+        message.content
+        for message in messages
+        if message.type == "human" and isinstance(message.content, str)
+    )
+    return {
+        name for name, pattern in _MENTIONS.items() if pattern.search(text)
+    }
 
 
 @dataclass
@@ -38,15 +82,97 @@ class ResumeAgent:
             "Extract relevant fields needed for generating resume.\n"
         )
     )
-    checkpointer: MemorySaver = field(default_factory=MemorySaver)
+    delta_prompt: str = field(
+        default=(
+            "Extract only the resume fields the user provides in the new "
+            "messages below. Leave out anything that is not mentioned.\n"
+        )
+    )
+    incremental: bool = False
+    pre_extraction: bool = False
+    section_extraction: bool = False
+    section_min_tokens: int = 512
+    document_ingestion: bool = False
+    upload_dir: str = "data/uploads"
+    ingest_chunk_chars: int = 4000
+    ingest_concurrency: int = 4
+    history: HistoryWindow | None = None
+    speculative: SpeculativeRenderer | None = None
+    router: ModelRouter | None = None
+    checkpointer: BaseCheckpointSaver = field(
+        default_factory=lambda: create_checkpointer("resume")
+    )
 
     def __post_init__(self):
+        self.artifacts = AgentArtifacts(self.model)
+        self.sections = (
+            SectionExtractor(
+                self.artifacts, self._structured, self.section_min_tokens
+            )
+            if self.section_extraction
+            else None
+        )
+        self.ingestor = (
+            DocumentIngestor(
+                self._structured,
+                upload_dir=self.upload_dir,
+                chunk_chars=self.ingest_chunk_chars,
+                max_concurrency=self.ingest_concurrency,
+            )
+            if self.document_ingestion
+            else None
+        )
         self.graph = StateGraph(ResumeState)
-        self.graph.add_node("extract_content", self.extract_content)
-        self.graph.add_node("generate_resume", tool_generate_resume)
-        self.graph.add_node("ask_more", self.ask_more)
+        self.graph.add_node(
+            "extract_content",
+            RunnableLambda(
+                self.extract_content, afunc=self.aextract_content
+            ),
+        )
+        self.graph.add_node(
+            "generate_resume",
+            RunnableLambda(
+                self.generate_resume, afunc=self.agenerate_resume
+            )
+            if self.speculative
+            else tool_generate_resume,
+        )
+        self.graph.add_node(
+            "ask_more", RunnableLambda(self.ask_more, afunc=self.aask_more)
+        )
 
-        self.graph.add_edge(START, "extract_content")
+        if self.history:
+            self.graph.add_node(
+                "summarize_history",
+                RunnableLambda(
+                    self.history.summarize, afunc=self.history.asummarize
+                ),
+            )
+            self.graph.add_edge("summarize_history", "extract_content")
+        chat = "summarize_history" if self.history else "extract_content"
+        if self.ingestor:
+            self.graph.add_node(
+                "ingest_document",
+                RunnableLambda(
+                    self.ingest_document, afunc=self.aingest_document
+                ),
+            )
+            self.graph.add_conditional_edges(
+                START,
+                self.route_document,
+                {"document": "ingest_document", "chat": chat},
+            )
+            self.graph.add_conditional_edges(
+                "ingest_document",
+                self.route_ingested,
+                {
+                    "chat": chat,
+                    "missing": "ask_more",
+                    "complete": "generate_resume",
+                },
+            )
+        else:
+            self.graph.add_edge(START, chat)
         self.graph.add_conditional_edges(
             "extract_content",
             self.validate_content,
@@ -57,56 +183,346 @@ class ResumeAgent:
         if c.ENV.lower() != "prod":
             self.checkpointer = None
         self.agent = self.graph.compile(checkpointer=self.checkpointer)
+        if c.METRICS_ENABLED:
+            self.agent = instrument(self.agent, "resume_agent")
 
-    def extract_content(self, state: ResumeState):
-        """Extract resume data."""
-        messages = state["messages"]
-        response = self.model.with_structured_output(
-            ResumeData, include_raw=True
-        ).invoke(
-            [
-                SystemMessage(
-                    content=(
-                        self.extractor_prompt
-                        + (
-                            "" if not state.get("data")
-                            else f"Current resume data: {state['data']}"
-                        )
+    def _pre_extract(self, state: ResumeState, messages: list) -> tuple:
+        """Run the rule-based extractor ahead of the LLM call.
+
+        Weak matches, e.g. a bare number taken as the phone, are left to
+        the LLM, so it can still correct them.
+
+        Returns:
+            tuple: the fields found in `messages`, and whether the latest
+                turn only added such fields so the LLM call can be skipped.
+        """
+        if not self.pre_extraction:
+            return {}, False
+        extraction = pre_extract_messages(messages)
+        found = {
+            name: value
+            for name, value in extraction.fields.items()
+            if name not in extraction.weak
+        }
+        turn = []
+        for message in reversed(state["messages"]):
+            if message.type != "human":
+                break
+            turn.append(message)
+        latest = pre_extract_messages(turn)
+        skip = bool(
+            state.get("data")
+            and latest.fields
+            and latest.complete
+            and not latest.weak
+        )
+        return found, skip
+
+    def _structured(self, schema: type[BaseModel]):
+        """Extraction runnable for `schema`, routed if `router` is set."""
+        if self.router:
+            return self.router.structured(schema)
+        return self.artifacts.structured(schema)
+
+    def _extraction_input(self, state: ResumeState) -> list:
+        """Build the prompt for the structured extraction call."""
+        return [
+            SystemMessage(
+                content=(
+                    self.extractor_prompt
+                    + (
+                        "" if not state.get("data")
+                        else f"Current resume data: {state['data']}"
                     )
                 )
-            ]
-            + messages
+            )
+        ] + self._conversation(state)
+
+    def _conversation(self, state: ResumeState) -> list:
+        """Conversation as sent to the LLM, windowed if `history` is set."""
+        if self.history:
+            return self.history.messages(state)
+        return state["messages"]
+
+    def _extraction_request(self, state: ResumeState) -> tuple:
+        """Build the structured extraction call for this turn.
+
+        Returns:
+            tuple: the structured-output runnable, its input and the fields
+                found by pre-extraction. The runnable is None when the LLM
+                call is not needed.
+        """
+        if self.incremental:
+            return self._delta_request(state)
+
+        found, skip = self._pre_extract(state, state["messages"])
+        if skip:
+            return None, None, found
+        schema = ResumeData
+        fields = [
+            name for name in ResumeData.model_fields if name not in found
+        ]
+        if found:
+            schema = partial_resume_model(fields)
+        prompt = self._extraction_input(state)
+        if self.sections and self.sections.applies(prompt, fields):
+            return self.sections.runnable(fields), prompt, found
+        return self._structured(schema), prompt, found
+
+    def _extraction_update(
+        self, state: ResumeState, response: dict | None, found: dict
+    ) -> dict:
+        """Turn the structured extraction response into a state update."""
+        if self.incremental:
+            return self._delta_update(state, response, found)
+
+        if response is None:
+            _LOGGER.info("Pre-extracted %s, skipping LLM", list(found))
+            return {
+                "missing_fields": [
+                    field
+                    for field in state["missing_fields"]
+                    if field not in found
+                ],
+                "data": state["data"].model_copy(update=found),
+            }
+
+        parsed = response["parsed"]
+        data = (
+            parsed if type(parsed) is ResumeData
+            else ResumeData.model_construct(**dict(parsed))
         )
-        resume_data = response["parsed"].model_dump()
-        _LOGGER.info("Got resume data: %s", resume_data.keys())
+        data.apply(found)
+        _LOGGER.info("Got resume data: %s", data.model_fields_set)
 
         extracted_field = response["raw"].tool_calls[0]["args"].keys()
         missing_fields = [
             field
             for field in ResumeData.model_fields.keys()
-            if field not in extracted_field
+            if field not in extracted_field and field not in found
         ]
 
         return {
             "missing_fields": missing_fields,
-            "data": ResumeData(**resume_data),
-            "messages": messages,
+            "data": data,
+            "messages": state["messages"],
         }
 
-    def ask_more(self, state: ResumeState):
-        """Ask user for more information."""
-        system_prompt = self.system_prompt.format(
-            current_data=json.dumps(state["data"].model_dump()),
-            resume_schema=get_pydantic_schema(ResumeData),
+    def _delta_request(self, state: ResumeState) -> tuple:
+        """Build the structured call for the messages not yet extracted.
+
+        Only messages after `extracted_until` are sent, and the schema is
+        narrowed to the fields that are still missing, the sections that
+        can gain entries and the fields the new messages mention, so the
+        prompt size does not grow with the conversation while later jobs
+        and corrections are still picked up.
+
+        Returns:
+            tuple: the structured-output runnable, its input and the fields
+                found by pre-extraction. The runnable is None when there is
+                nothing left to extract.
+        """
+        messages = state["messages"]
+        since = state.get("extracted_until")
+        ids = [message.id for message in messages]
+        new_messages = (
+            messages[ids.index(since) + 1:] if since in ids else messages
+        )
+        found, skip = self._pre_extract(state, new_messages)
+        data = state.get("data") or ResumeData()
+        wanted = (
+            set(data.missing_fields())
+            | COLLECTION_FIELDS
+            | _mentioned_fields(new_messages)
+        )
+        fields = [
+            field for field in ResumeData.model_fields
+            if field in wanted and field not in found
+        ]
+        if skip or not new_messages or not fields:
+            return None, None, found
+
+        prompt = [SystemMessage(content=self.delta_prompt)] + new_messages
+        if self.sections and self.sections.applies(prompt, fields):
+            return self.sections.runnable(fields), prompt, found
+        runnable = self._structured(partial_resume_model(fields))
+        return runnable, prompt, found
+
+    def _delta_update(
+        self, state: ResumeState, response: dict | None, found: dict
+    ) -> dict:
+        """Merge an incremental extraction into the current resume data."""
+        data = (state.get("data") or ResumeData()).model_copy()
+        data.apply(found)
+        update = {}
+        if response and response["parsed"] is not None:
+            data.apply(response["parsed"])
+            update["extracted_until"] = state["messages"][-1].id
+        elif response:
+            _LOGGER.warning(
+                "Could not parse extraction: %s", response["parsing_error"]
+            )
+        else:
+            update["extracted_until"] = state["messages"][-1].id
+        _LOGGER.info("Merged resume data, missing: %s", data.missing_fields())
+        return {
+            **update,
+            "missing_fields": data.missing_fields(),
+            "data": data,
+        }
+
+    def _ask_more_input(self, state: ResumeState) -> list:
+        """Build the prompt asking the user for the missing data."""
+        template = self.artifacts.template(
+            self.system_prompt,
+            resume_schema=self.artifacts.schema(ResumeData),
         )
-        response = self.model.invoke([HumanMessage(content=system_prompt)])
+        system_prompt = template.format(current_data=state["data"].to_json())
+        return [HumanMessage(content=system_prompt)]
+
+    def _ingested(self, state: ResumeState, ingested: ResumeData) -> dict:
+        """Merge ingested data under what the conversation already has."""
+        data = merge_resume_data([state.get("data") or ResumeData(), ingested])
+        return {
+            "document": None,
+            "data": data,
+            "missing_fields": data.missing_fields(),
+        }
+
+    def ingest_document(
+        self, state: ResumeState, config: RunnableConfig = None
+    ):
+        """Extract resume data from the uploaded document.
+
+        Only the extracted data is kept in state, the document itself is
+        never added to the conversation.
+        """
+        ingested = self.ingestor.ingest(state["document"], config)
+        return self._ingested(state, ingested)
+
+    async def aingest_document(
+        self, state: ResumeState, config: RunnableConfig = None
+    ):
+        """Async counterpart of `ingest_document`."""
+        ingested = await self.ingestor.aingest(state["document"], config)
+        return self._ingested(state, ingested)
+
+    def extract_content(self, state: ResumeState):
+        """Extract resume data."""
+        runnable, prompt, found = self._extraction_request(state)
+        response = runnable.invoke(prompt) if runnable else None
+        return self._extraction_update(state, response, found)
+
+    async def aextract_content(self, state: ResumeState):
+        """Extract resume data without blocking the event loop."""
+        runnable, prompt, found = self._extraction_request(state)
+        response = await runnable.ainvoke(prompt) if runnable else None
+        return self._extraction_update(state, response, found)
+
+    def _speculate(self, state: ResumeState, config: RunnableConfig):
+        """Render ahead if only optional fields are left to ask for."""
+        data = state.get("data")
+        if self.speculative and data and not data.missing_required():
+            self.speculative.speculate(_thread_id(config), data)
+
+    def ask_more(self, state: ResumeState, config: RunnableConfig = None):
+        """Ask user for more information."""
+        self._speculate(state, config)
+        response = self.model.invoke(self._ask_more_input(state))
         return {"messages": [response]}
 
+    async def aask_more(
+        self, state: ResumeState, config: RunnableConfig = None
+    ):
+        """Ask user for more information without blocking the event loop."""
+        self._speculate(state, config)
+        response = await self.model.ainvoke(self._ask_more_input(state))
+        return {"messages": [response]}
+
+    def generate_resume(
+        self, state: ResumeState, config: RunnableConfig = None
+    ):
+        """Generate resume, reusing the speculative render of its data."""
+        path = self.speculative.render(_thread_id(config), state["data"])
+        return {"resume": str(path)}
+
+    async def agenerate_resume(
+        self, state: ResumeState, config: RunnableConfig = None
+    ):
+        """Async counterpart of `generate_resume`."""
+        path = await self.speculative.arender(
+            _thread_id(config), state["data"]
+        )
+        return {"resume": str(path)}
+
+    def stream_reply(self, inputs: dict, config: dict = None):
+        """Run a turn, yielding the follow-up question as it is generated.
+
+        The turn is checkpointed like with `invoke` once the run ends.
+
+        Args:
+            inputs (dict): graph input, e.g. the new user messages.
+            config (dict): run config, e.g. the conversation thread id.
+
+        Yields:
+            str: text of each streamed chunk.
+        """
+        yield from reply_tokens(
+            self.agent.stream(inputs, config, stream_mode="messages"),
+            REPLY_NODES,
+        )
+
+    async def astream_reply(self, inputs: dict, config: dict = None):
+        """Async counterpart of `stream_reply`."""
+        async for text in areply_tokens(
+            self.agent.astream(inputs, config, stream_mode="messages"),
+            REPLY_NODES,
+        ):
+            yield text
+
+    def route_document(self, state: ResumeState) -> str:
+        """Ingest an uploaded document before handling the conversation."""
+        return "document" if state.get("document") else "chat"
+
+    def route_ingested(self, state: ResumeState) -> str:
+        """Skip extraction when a document was uploaded without a message."""
+        if state["messages"]:
+            return "chat"
+        return self.validate_content(state)
+
     def validate_content(self, state: ResumeState) -> str:
-        """Validate resume data."""
+        """Validate resume data.
+
+        With `speculative` set, a turn asking to generate the resume skips
+        the optional fields still missing.
+        """
+        required = [
+            field
+            for field in state["missing_fields"]
+            if field not in OPTIONAL_FIELDS
+        ]
+        if (
+            self.speculative
+            and state["missing_fields"]
+            and not required
+            and state["messages"]
+            and wants_generation(state["messages"][-1])
+        ):
+            _LOGGER.info(
+                "Generating without optional fields: %s",
+                state["missing_fields"],
+            )
+            return "complete"
         if state["missing_fields"]:
             _LOGGER.info("Missing fields: %s", state["missing_fields"])
             return "missing"
 
         _LOGGER.info("Resume data is complete. Routing to resume generator")
         return "complete"
+
+
+def _thread_id(config: RunnableConfig | None) -> str:
+    """Conversation of a run, shared by runs without a thread id."""
+    return ((config or {}).get("configurable") or {}).get(
+        "thread_id", "default"
+    )
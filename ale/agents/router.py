@@ -0,0 +1,191 @@
+"""Route structured extraction between a fast and a full model."""
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable
+
+from langchain_core.language_models.base import BaseLanguageModel
+from langchain_core.messages import BaseMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from pydantic import BaseModel
+
+from ale.agents.artifacts import AgentArtifacts
+from ale.agents.streaming import NOSTREAM
+from ale.core.metrics import LATENCY_BUCKETS, metrics
+
+_LOGGER = logging.getLogger(__name__)
+
+FAST = "fast"
+FULL = "full"
+
+
+@dataclass
+class ModelRouter:
+    """Send simple turns to `fast` and escalate the rest to `full`.
+
+    A turn is the trailing human messages of the extraction input. It goes
+    to the full model when it holds more than `max_tokens` tokens or more
+    than `max_lines` lines, e.g. a pasted CV, or when the whole input
+    holds more than `max_prompt_tokens` tokens, e.g. a short follow-up
+    sent along with a long conversation. Otherwise the fast model
+    answers first, and the call is retried on the full model if it raises
+    or its output cannot be parsed into the schema. Decisions are logged
+    and counted in `ale_llm_route_total`, the time spent in each tier in
+    `ale_llm_tier_seconds`.
+
+    Args:
+        fast (BaseLanguageModel): cheaper, lower latency model.
+        full (BaseLanguageModel): model used for everything else.
+        max_tokens (int): largest turn the fast model takes.
+        max_lines (int): most lines of a turn the fast model takes.
+        max_prompt_tokens (int): largest input the fast model takes,
+            history included.
+
+    Example:
+        >>> router = ModelRouter(fast=flash_lite, full=flash)
+        >>> response = router.structured(ResumeData).invoke(messages)
+    """
+
+    fast: BaseLanguageModel
+    full: BaseLanguageModel
+    max_tokens: int = 256
+    max_lines: int = 8
+    max_prompt_tokens: int = 2048
+    token_counter: Callable[[list[BaseMessage]], int] = field(
+        default=count_tokens_approximately, repr=False
+    )
+
+    def __post_init__(self):
+        self._artifacts = {
+            FAST: AgentArtifacts(self.fast),
+            FULL: AgentArtifacts(self.full),
+        }
+
+    def structured(self, schema: type[BaseModel]) -> Runnable:
+        """Routed counterpart of `AgentArtifacts.structured`.
+
+        The runnable returns the raw message alongside the parsed output,
+        as escalation needs to see parsing errors.
+
+        Args:
+            schema (type[BaseModel]): output model class.
+
+        Returns:
+            Runnable
+        """
+        return RunnableLambda(
+            partial(self._route, schema),
+            afunc=partial(self._aroute, schema),
+            name="model_router",
+        ).with_config(tags=NOSTREAM)
+
+    def tier(self, messages: list[BaseMessage]) -> tuple[str, str]:
+        """Tier to try first for `messages`, with the reason.
+
+        Returns:
+            tuple: `FAST` or `FULL`, and why.
+        """
+        turn = []
+        for message in reversed(messages):
+            if message.type != "human":
+                break
+            turn.append(message)
+        if not turn:
+            return FULL, "no_turn"
+        if self.token_counter(turn) > self.max_tokens:
+            return FULL, "tokens"
+        lines = sum(
+            str(message.content).count("\n") + 1 for message in turn
+        )
+        if lines > self.max_lines:
+            return FULL, "lines"
+        if self.token_counter(messages) > self.max_prompt_tokens:
+            return FULL, "prompt_tokens"
+        return FAST, "simple"
+
+    def _route(
+        self,
+        schema: type[BaseModel],
+        messages: list[BaseMessage],
+        config: RunnableConfig = None,
+    ) -> dict:
+        tier, reason = self.tier(messages)
+        if tier == FAST:
+            start = time.monotonic()
+            try:
+                response = self._runnable(FAST, schema).invoke(
+                    messages, config
+                )
+            except Exception as exc:
+                response, error = None, exc
+            else:
+                error = response["parsing_error"] or (
+                    None if response["parsed"] is not None else "no output"
+                )
+            self._record(FAST, reason, start, error)
+            if error is None:
+                return response
+            reason = "escalated"
+
+        start = time.monotonic()
+        response = self._runnable(FULL, schema).invoke(messages, config)
+        self._record(FULL, reason, start)
+        return response
+
+    async def _aroute(
+        self,
+        schema: type[BaseModel],
+        messages: list[BaseMessage],
+        config: RunnableConfig = None,
+    ) -> dict:
+        tier, reason = self.tier(messages)
+        if tier == FAST:
+            start = time.monotonic()
+            try:
+                response = await self._runnable(FAST, schema).ainvoke(
+                    messages, config
+                )
+            except Exception as exc:
+                response, error = None, exc
+            else:
+                error = response["parsing_error"] or (
+                    None if response["parsed"] is not None else "no output"
+                )
+            self._record(FAST, reason, start, error)
+            if error is None:
+                return response
+            reason = "escalated"
+
+        start = time.monotonic()
+        response = await self._runnable(FULL, schema).ainvoke(
+            messages, config
+        )
+        self._record(FULL, reason, start)
+        return response
+
+    def _runnable(self, tier: str, schema: type[BaseModel]) -> Runnable:
+        return self._artifacts[tier].structured(schema, include_raw=True)
+
+    def _record(
+        self, tier: str, reason: str, start: float, error: object = None
+    ):
+        elapsed = time.monotonic() - start
+        if error is not None:
+            _LOGGER.info(
+                "Escalating %s tier after %.3fs: %s", tier, elapsed, error
+            )
+        else:
+            _LOGGER.info(
+                "Extracted on %s tier (%s) in %.3fs", tier, reason, elapsed
+            )
+        metrics.increment(
+            "ale_llm_route_total",
+            tier=tier,
+            reason=reason,
+            outcome="error" if error is not None else "ok",
+        )
+        metrics.observe(
+            "ale_llm_tier_seconds", elapsed, LATENCY_BUCKETS, tier=tier
+        )
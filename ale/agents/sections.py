@@ -0,0 +1,202 @@
+"""Concurrent per-section extraction of long resume inputs."""
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Callable
+
+from langchain_core.messages import AIMessage, BaseMessage, SystemMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.runnables.config import get_executor_for_config
+from pydantic import BaseModel
+
+from ale.agents.artifacts import AgentArtifacts
+from ale.agents.streaming import NOSTREAM
+from ale.models.resume import ResumeData, partial_resume_model
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fields extracted together; the nested sections each get their own call.
+SECTION_GROUPS = (
+    (
+        "name", "title", "email", "phone", "linkedin", "github", "website",
+        "summary",
+    ),
+    ("experience",),
+    ("education",),
+    ("skills",),
+    ("certifications",),
+)
+
+
+@dataclass
+class SectionExtractor:
+    """Split one structured extraction into concurrent calls per section.
+
+    Each section of `groups` still requested is extracted by its own
+    structured-output call, with the schema narrowed to its fields both in
+    the tool definition and in the prompt. The answers are merged into one
+    response shaped like `with_structured_output(include_raw=True)`, whose
+    raw message carries a single tool call with the merged arguments.
+    Sections that fail to parse are logged and left out; the response
+    only reports a parsing error when every section failed.
+
+    Args:
+        artifacts (AgentArtifacts): artifacts of the agent, used for the
+            section schemas and, unless `structured` is set, the calls.
+        structured (Callable): factory of the structured runnable for a
+            schema, e.g. `ModelRouter.structured`. Default is None,
+            meaning `artifacts.structured`.
+        min_tokens (int): smallest latest turn worth splitting.
+        groups (tuple): fields extracted together by one call.
+    """
+
+    artifacts: AgentArtifacts
+    structured: Callable[[type[BaseModel]], Runnable] | None = None
+    min_tokens: int = 512
+    groups: tuple[tuple[str, ...], ...] = SECTION_GROUPS
+    section_prompt: str = field(
+        default=(
+            "Only extract the following sections of the resume, leaving "
+            "everything else out:\n{schema}\n"
+        )
+    )
+    token_counter: Callable[[list[BaseMessage]], int] = field(
+        default=count_tokens_approximately, repr=False
+    )
+
+    def applies(self, messages: list[BaseMessage], fields: list[str]) -> bool:
+        """Whether extracting `fields` from `messages` should be split.
+
+        Args:
+            messages (list[BaseMessage]): extraction input.
+            fields (list[str]): fields the extraction asks for.
+
+        Returns:
+            bool: True when the latest turn holds at least `min_tokens`
+                tokens and `fields` span more than one section.
+        """
+        turn = []
+        for message in reversed(messages):
+            if message.type != "human":
+                break
+            turn.append(message)
+        return (
+            len(self._sections(fields)) > 1
+            and self.token_counter(turn) >= self.min_tokens
+        )
+
+    def runnable(self, fields: list[str]) -> Runnable:
+        """Runnable extracting `fields` with one call per section.
+
+        Args:
+            fields (list[str]): names of `ResumeData` fields to extract.
+
+        Returns:
+            Runnable
+        """
+        return RunnableLambda(
+            partial(self._extract, fields),
+            afunc=partial(self._aextract, fields),
+            name="section_extraction",
+        ).with_config(tags=NOSTREAM)
+
+    def _sections(self, fields: list[str]) -> list[list[str]]:
+        sections = [
+            [name for name in group if name in fields]
+            for group in self.groups
+        ]
+        grouped = {name for group in self.groups for name in group}
+        sections.append([name for name in fields if name not in grouped])
+        return [section for section in sections if section]
+
+    def _requests(
+        self, fields: list[str], messages: list[BaseMessage]
+    ) -> list[tuple[Runnable, list[BaseMessage]]]:
+        factory = self.structured or self.artifacts.structured
+        requests = []
+        for section in self._sections(fields):
+            instruction = self.section_prompt.format(
+                schema=self.artifacts.schema(ResumeData, section)
+            )
+            if messages and messages[0].type == "system":
+                head = SystemMessage(
+                    content=f"{messages[0].content}\n{instruction}"
+                )
+                prompt = [head] + messages[1:]
+            else:
+                prompt = [SystemMessage(content=instruction)] + messages
+            requests.append((factory(partial_resume_model(section)), prompt))
+        return requests
+
+    def _extract(
+        self,
+        fields: list[str],
+        messages: list[BaseMessage],
+        config: RunnableConfig = None,
+    ) -> dict:
+        start = time.monotonic()
+        requests = self._requests(fields, messages)
+        with get_executor_for_config(config) as executor:
+            responses = list(executor.map(
+                lambda request: request[0].invoke(request[1], config),
+                requests,
+            ))
+        return self._merge(fields, responses, start)
+
+    async def _aextract(
+        self,
+        fields: list[str],
+        messages: list[BaseMessage],
+        config: RunnableConfig = None,
+    ) -> dict:
+        start = time.monotonic()
+        responses = await asyncio.gather(*(
+            runnable.ainvoke(prompt, config)
+            for runnable, prompt in self._requests(fields, messages)
+        ))
+        return self._merge(fields, responses, start)
+
+    def _merge(
+        self, fields: list[str], responses: list[dict], start: float
+    ) -> dict:
+        """Merge section responses into one structured-output response."""
+        values, args, errors = {}, {}, []
+        for response in responses:
+            parsed = response["parsed"]
+            if parsed is None:
+                errors.append(response["parsing_error"] or "no output")
+                continue
+            values.update({
+                name: getattr(parsed, name)
+                for name in parsed.model_fields_set
+            })
+            for call in response["raw"].tool_calls[:1]:
+                args.update(call["args"])
+        for error in errors:
+            _LOGGER.warning("Could not parse resume section: %s", error)
+        _LOGGER.info(
+            "Extracted %d sections in %.3fs",
+            len(responses) - len(errors),
+            time.monotonic() - start,
+        )
+
+        if errors and len(errors) == len(responses):
+            return {
+                "raw": AIMessage(content=""),
+                "parsed": None,
+                "parsing_error": errors[0],
+            }
+        schema = partial_resume_model(fields)
+        return {
+            "raw": AIMessage(
+                content="",
+                tool_calls=[{
+                    "name": schema.__name__, "args": args, "id": "sections"
+                }],
+            ),
+            "parsed": schema.model_construct(**values),
+            "parsing_error": None,
+        }
@@ -0,0 +1,241 @@
+"""Speculative rendering of resumes while optional fields are collected.
+
+Once the required fields of a conversation are known, its resume is
+rendered in the background, keyed by `content_key`, while the agent asks
+for the optional ones. A later render of the same data waits for or
+reuses that artifact instead of calling the generator again. A
+speculation superseded by newer data is cancelled if it has not started
+yet, or counted as wasted; its file is left to the store's eviction.
+"""
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+from ale.core.metrics import LATENCY_BUCKETS, metrics
+from ale.models.resume import ResumeData
+from ale.tools.resume import arender_resume, render_resume
+from ale.tools.storage import ResumeStore, content_key
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class _Render:
+    """A render in flight or finished, shared by everyone asking for it."""
+
+    future: Future
+    speculative: bool = True
+    started: float | None = None
+    finished: float | None = None
+    used: bool = False
+
+
+class SpeculativeRenderer:
+    """Render resumes ahead of the turn that asks for them.
+
+    Args:
+        workers (int): background renders running at once.
+        max_threads (int): conversations whose latest speculation is
+            tracked; the least recently active ones are dropped first.
+        store (ResumeStore): store to render into. Default is None,
+            meaning the `ale.tools.resume` module store.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        max_threads: int = 1024,
+        store: ResumeStore = None,
+    ):
+        self.workers = workers
+        self.max_threads = max_threads
+        self.store = store
+        self._renders: dict[str, _Render] = {}
+        self._latest: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if not hasattr(self, "_executor"):
+            setattr(self, "_executor", ThreadPoolExecutor(
+                max_workers=self.workers,
+                thread_name_prefix="speculative-render",
+            ))
+        return getattr(self, "_executor")
+
+    def speculate(self, thread_id: str, data: ResumeData):
+        """Start rendering `data` in the background for a conversation.
+
+        The previous speculation of the conversation is superseded unless
+        it rendered the same data.
+
+        Args:
+            thread_id (str): conversation the data belongs to.
+            data (ResumeData): resume data with every required field.
+        """
+        key = content_key(data)
+        with self._lock:
+            previous = self._latest.pop(thread_id, None)
+            self._latest[thread_id] = key
+            if previous is not None and previous != key:
+                self._supersede(previous)
+            while len(self._latest) > self.max_threads:
+                _, stale = self._latest.popitem(last=False)
+                self._supersede(stale)
+            if key in self._renders:
+                return
+            entry = self._renders[key] = _Render(Future())
+            entry.future = self.executor.submit(
+                self._speculate, key, data.model_copy(), entry
+            )
+        _LOGGER.info("Speculatively rendering resume %s", key[:12])
+        metrics.increment("ale_speculative_renders_total", outcome="started")
+
+    def render(self, thread_id: str, data: ResumeData) -> Path:
+        """Render `data`, reusing a speculation of the same data.
+
+        Args:
+            thread_id (str): conversation the data belongs to.
+            data (ResumeData): Content of the resume.
+
+        Returns:
+            Path: stored PDF.
+        """
+        key = content_key(data)
+        asked = time.monotonic()
+        entry, owner = self._claim(thread_id, key)
+        if owner:
+            entry.started = asked
+            try:
+                path = render_resume(data, self.store)
+            except BaseException as exc:
+                self._release(key, entry, exc=exc)
+                raise
+            self._release(key, entry, path=path)
+            return path
+        try:
+            path = entry.future.result()
+        except Exception:
+            return render_resume(data, self.store)
+        self._used(key, entry, asked)
+        return path
+
+    async def arender(self, thread_id: str, data: ResumeData) -> Path:
+        """Async counterpart of `render`."""
+        key = content_key(data)
+        asked = time.monotonic()
+        entry, owner = self._claim(thread_id, key)
+        if owner:
+            entry.started = asked
+            try:
+                path = await arender_resume(data, self.store)
+            except BaseException as exc:
+                self._release(key, entry, exc=exc)
+                raise
+            self._release(key, entry, path=path)
+            return path
+        try:
+            path = await asyncio.wrap_future(entry.future)
+        except asyncio.CancelledError:
+            # a superseded speculation, unlike the caller, was cancelled
+            if not entry.future.cancelled():
+                raise
+            return await arender_resume(data, self.store)
+        except Exception:
+            return await arender_resume(data, self.store)
+        self._used(key, entry, asked)
+        return path
+
+    def _claim(self, thread_id: str, key: str) -> tuple[_Render, bool]:
+        """Return the render of `key`, registering one if there is none.
+
+        Returns:
+            tuple: the render and whether the caller has to run it.
+        """
+        with self._lock:
+            # the conversation is done with this data, nothing to supersede
+            if self._latest.get(thread_id) == key:
+                del self._latest[thread_id]
+            entry = self._renders.get(key)
+            if entry is not None:
+                return entry, False
+            entry = self._renders[key] = _Render(Future(), speculative=False)
+            return entry, True
+
+    def _release(
+        self,
+        key: str,
+        entry: _Render,
+        path: Path = None,
+        exc: BaseException = None,
+    ):
+        """Publish a render made by a caller and stop tracking it."""
+        entry.finished = time.monotonic()
+        with self._lock:
+            if self._renders.get(key) is entry:
+                del self._renders[key]
+        if exc is not None:
+            entry.future.set_exception(exc)
+        else:
+            entry.future.set_result(path)
+
+    def _speculate(self, key: str, data: ResumeData, entry: _Render) -> Path:
+        entry.started = time.monotonic()
+        try:
+            return render_resume(data, self.store)
+        except Exception:
+            _LOGGER.warning(
+                "Speculative render %s failed", key[:12], exc_info=True
+            )
+            metrics.increment(
+                "ale_speculative_renders_total", outcome="failed"
+            )
+            with self._lock:
+                if self._renders.get(key) is entry:
+                    del self._renders[key]
+            raise
+        finally:
+            entry.finished = time.monotonic()
+
+    def _supersede(self, key: str):
+        """Drop the speculation of `key` once no conversation wants it.
+
+        Must be called with the lock held.
+        """
+        if key in self._latest.values():
+            return
+        entry = self._renders.get(key)
+        if entry is None or not entry.speculative or entry.used:
+            return
+        del self._renders[key]
+        if entry.future.cancel():
+            outcome = "cancelled"
+        else:
+            # already rendering, the result stays in the store until evicted
+            outcome = "wasted"
+        _LOGGER.info(
+            "Discarding speculative render %s (%s)", key[:12], outcome
+        )
+        metrics.increment("ale_speculative_renders_total", outcome=outcome)
+
+    def _used(self, key: str, entry: _Render, asked: float):
+        """Record the time a speculation saved the caller that needed it."""
+        with self._lock:
+            if not entry.speculative or entry.used:
+                return
+            entry.used = True
+            if self._renders.get(key) is entry:
+                del self._renders[key]
+        saved = min(asked, entry.finished) - entry.started
+        _LOGGER.info(
+            "Reused speculative render %s, saved %.3fs", key[:12], saved
+        )
+        metrics.increment("ale_speculative_renders_total", outcome="used")
+        metrics.observe(
+            "ale_speculative_saved_seconds", max(saved, 0.0), LATENCY_BUCKETS
+        )
@@ -0,0 +1,50 @@
+"""Reply tokens of graph runs streamed in `messages` mode.
+
+Graph nodes keep calling `invoke` on their models: when the graph runs
+with `stream_mode="messages"`, LangGraph streams those calls and emits
+their chunks as they arrive, while the node still returns, and the graph
+checkpoints, the complete message. Model calls whose output is not meant
+for the user, such as extractions or summaries, are tagged `NOSTREAM`.
+"""
+from typing import AsyncIterator, Container, Iterator
+
+from langchain_core.messages import AIMessageChunk
+from langgraph.constants import TAG_NOSTREAM
+
+NOSTREAM = [TAG_NOSTREAM]
+
+
+def _text(item: tuple, nodes: Container[str]) -> str:
+    message, metadata = item
+    if not isinstance(message, AIMessageChunk):
+        return ""
+    if metadata.get("langgraph_node") not in nodes:
+        return ""
+    return message.text()
+
+
+def reply_tokens(stream: Iterator[tuple], nodes: Container[str]):
+    """Text of the chunks streamed by the model calls of `nodes`.
+
+    Args:
+        stream (Iterator[tuple]): `(message, metadata)` items of a graph
+            run in `messages` stream mode.
+        nodes (Container[str]): nodes answering the user.
+
+    Yields:
+        str: text of each chunk, in order.
+    """
+    for item in stream:
+        text = _text(item, nodes)
+        if text:
+            yield text
+
+
+async def areply_tokens(
+    stream: AsyncIterator[tuple], nodes: Container[str]
+):
+    """Async counterpart of `reply_tokens`."""
+    async for item in stream:
+        text = _text(item, nodes)
+        if text:
+            yield text
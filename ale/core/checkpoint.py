@@ -0,0 +1,203 @@
+"""Checkpointers for agent graphs."""
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+
+from langgraph.checkpoint.base import BaseCheckpointSaver
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from ale.core.config import config as c
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class BoundedSqliteSaver(SqliteSaver):
+    """SQLite checkpointer keeping a bounded history of live threads.
+
+    Only the newest `keep_last` checkpoints of each thread are kept, pruned
+    on every write. Threads without activity for `ttl` seconds are deleted
+    by `compact`, which a background thread runs every
+    `compaction_interval` seconds once `start_compaction` is called.
+
+    Async methods run the sync ones in a worker thread, so the saver can
+    back graphs invoked with `ainvoke`/`astream` as well.
+
+    Args:
+        conn (sqlite3.Connection): connection opened with
+            `check_same_thread=False`.
+        keep_last (int): checkpoints kept per thread and namespace.
+        ttl (float): idle seconds before a thread expires. Default is None,
+            meaning threads never expire.
+        compaction_interval (float): seconds between background
+            compactions.
+    """
+
+    def __init__(
+        self,
+        conn: sqlite3.Connection,
+        *,
+        keep_last: int = 5,
+        ttl: float = None,
+        compaction_interval: float = 300.0,
+        serde=None,
+    ):
+        super().__init__(conn, serde=serde)
+        self.keep_last = keep_last
+        self.ttl = ttl
+        self.compaction_interval = compaction_interval
+        self._stop = threading.Event()
+        self._compactor = None
+
+    def setup(self):
+        if self.is_setup:
+            return
+        super().setup()
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS thread_activity ("
+            "thread_id TEXT PRIMARY KEY, updated REAL NOT NULL)"
+        )
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        thread_id = str(config["configurable"]["thread_id"])
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        keep = (
+            "SELECT checkpoint_id FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ? "
+            "ORDER BY checkpoint_id DESC LIMIT ?"
+        )
+        args = (thread_id, checkpoint_ns, thread_id, checkpoint_ns,
+                self.keep_last)
+        with self.cursor() as cur:
+            cur.execute(
+                "INSERT OR REPLACE INTO thread_activity VALUES (?, ?)",
+                (thread_id, time.time()),
+            )
+            for table in ("checkpoints", "writes"):
+                cur.execute(
+                    f"DELETE FROM {table} "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? "
+                    f"AND checkpoint_id NOT IN ({keep})",
+                    args,
+                )
+        return saved
+
+    def delete_thread(self, thread_id: str):
+        super().delete_thread(thread_id)
+        with self.cursor() as cur:
+            cur.execute(
+                "DELETE FROM thread_activity WHERE thread_id = ?",
+                (str(thread_id),),
+            )
+
+    def compact(self) -> int:
+        """Delete expired threads and shrink the write-ahead log.
+
+        Returns:
+            int: number of threads deleted.
+        """
+        expired = []
+        if self.ttl is not None:
+            with self.cursor(transaction=False) as cur:
+                cur.execute(
+                    "SELECT thread_id FROM thread_activity WHERE updated < ?",
+                    (time.time() - self.ttl,),
+                )
+                expired = [row[0] for row in cur.fetchall()]
+        for thread_id in expired:
+            self.delete_thread(thread_id)
+        with self.cursor(transaction=False) as cur:
+            cur.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        if expired:
+            _LOGGER.info("Compacted %d expired threads", len(expired))
+        return len(expired)
+
+    def start_compaction(self):
+        """Run `compact` periodically in a daemon thread."""
+        if self._compactor:
+            return
+
+        def run():
+            while not self._stop.wait(self.compaction_interval):
+                try:
+                    self.compact()
+                except sqlite3.Error as exc:
+                    _LOGGER.error("Checkpoint compaction failed: %s", exc)
+
+        self._compactor = threading.Thread(
+            target=run, name="checkpoint-compaction", daemon=True
+        )
+        self._compactor.start()
+
+    def close(self):
+        """Stop background compaction and close the connection."""
+        self._stop.set()
+        if self._compactor:
+            self._compactor.join()
+        self.conn.close()
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        items = await asyncio.to_thread(
+            lambda: list(
+                self.list(config, filter=filter, before=before, limit=limit)
+            )
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        await asyncio.to_thread(
+            self.put_writes, config, writes, task_id, task_path
+        )
+
+    async def adelete_thread(self, thread_id: str):
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+
+@lru_cache(maxsize=None)
+def _sqlite_checkpointer(path: str, graph: str) -> BoundedSqliteSaver:
+    if path != ":memory:":
+        path = Path(path)
+        path = path.with_name(f"{path.stem}-{graph}{path.suffix}")
+        path.parent.mkdir(parents=True, exist_ok=True)
+    saver = BoundedSqliteSaver(
+        sqlite3.connect(path, check_same_thread=False),
+        keep_last=c.CHECKPOINT_KEEP_LAST,
+        ttl=c.CHECKPOINT_TTL,
+        compaction_interval=c.CHECKPOINT_COMPACTION_INTERVAL,
+    )
+    saver.start_compaction()
+    return saver
+
+
+def create_checkpointer(graph: str) -> BaseCheckpointSaver:
+    """Checkpointer selected by `CHECKPOINTER` for the graph `graph`.
+
+    `sqlite` returns the process-wide `BoundedSqliteSaver` of the graph,
+    stored next to `CHECKPOINT_SQLITE_PATH` with the graph name appended,
+    e.g. `data/checkpoints-resume.sqlite`. Graphs never share a database,
+    so their thread ids, pruning and expiry stay apart. Anything else
+    returns a new `MemorySaver`.
+
+    Args:
+        graph (str): name of the graph the checkpoints belong to.
+
+    Returns:
+        BaseCheckpointSaver
+    """
+    if c.CHECKPOINTER.lower() == "sqlite":
+        return _sqlite_checkpointer(c.CHECKPOINT_SQLITE_PATH, graph)
+    return MemorySaver()
@@ -30,16 +30,166 @@ class LLMConfig(BaseSettings):
         os.getenv("VERTEXAI_MAX_OUTPUT_TOKENS", "1024")
     )
     VERTEXAI_TOP_P: float = float(os.getenv("VERTEXAI_TOP_P", ".3"))
+    # cheaper model tried first for short extraction turns
+    VERTEXAI_FAST_MODEL_NAME: str = os.getenv(
+        "VERTEXAI_FAST_MODEL_NAME", "gemini-2.0-flash-lite"
+    )
+    LLM_ROUTER_ENABLED: bool = (
+        os.getenv("LLM_ROUTER_ENABLED", "false").lower() == "true"
+    )
+    LLM_ROUTER_MAX_TOKENS: int = int(
+        os.getenv("LLM_ROUTER_MAX_TOKENS", "256")
+    )
+    LLM_ROUTER_MAX_LINES: int = int(os.getenv("LLM_ROUTER_MAX_LINES", "8"))
+    LLM_ROUTER_MAX_PROMPT_TOKENS: int = int(
+        os.getenv("LLM_ROUTER_MAX_PROMPT_TOKENS", "2048")
+    )
+
+    LLM_CACHE_ENABLED: bool = (
+        os.getenv("LLM_CACHE_ENABLED", "false").lower() == "true"
+    )
+    LLM_CACHE_PATH: str = os.getenv(
+        "LLM_CACHE_PATH", "data/llm_cache.sqlite"
+    )
+    LLM_CACHE_MAX_ENTRIES: int = int(
+        os.getenv("LLM_CACHE_MAX_ENTRIES", "1024")
+    )
 
 
 class Settings(LLMConfig):
     ENV: str = os.getenv("ENV", "dev")
+    BQ_LOCATION: str = os.getenv("BQ_LOCATION", "US")
+    BQ_PAGE_SIZE: int = int(os.getenv("BQ_PAGE_SIZE", "10000"))
+    BQ_STORAGE_API: bool = (
+        os.getenv("BQ_STORAGE_API", "false").lower() == "true"
+    )
+    BQ_CACHE_ENABLED: bool = (
+        os.getenv("BQ_CACHE_ENABLED", "true").lower() == "true"
+    )
+    BQ_CACHE_DIR: str = os.getenv("BQ_CACHE_DIR", "data/bq_cache")
+    BQ_CACHE_TTL: float = float(os.getenv("BQ_CACHE_TTL", "600"))
+    BQ_CACHE_MAX_ENTRIES: int = int(os.getenv("BQ_CACHE_MAX_ENTRIES", "64"))
+    BQ_CACHE_MAX_BYTES: int = int(
+        os.getenv("BQ_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+    )
+    # "error" refuses, "warn" logs, "off" skips the dry run
+    BQ_COST_GATE: str = os.getenv("BQ_COST_GATE", "error")
+    BQ_MAX_BYTES_PROCESSED: int = int(
+        os.getenv("BQ_MAX_BYTES_PROCESSED", str(10 * 1024 ** 3))
+    )
+
+    CHECKPOINTER: str = os.getenv("CHECKPOINTER", "memory")
+    CHECKPOINT_SQLITE_PATH: str = os.getenv(
+        "CHECKPOINT_SQLITE_PATH", "data/checkpoints.sqlite"
+    )
+    CHECKPOINT_TTL: float = float(os.getenv("CHECKPOINT_TTL", "604800"))
+    CHECKPOINT_KEEP_LAST: int = int(os.getenv("CHECKPOINT_KEEP_LAST", "5"))
+    CHECKPOINT_COMPACTION_INTERVAL: float = float(
+        os.getenv("CHECKPOINT_COMPACTION_INTERVAL", "300")
+    )
+    CHAT_SESSION_MAX: int = int(os.getenv("CHAT_SESSION_MAX", "1024"))
+    CHAT_SESSION_MAX_BYTES: int = int(
+        os.getenv("CHAT_SESSION_MAX_BYTES", str(64 * 1024 * 1024))
+    )
+    CHAT_SESSION_TTL: float = float(os.getenv("CHAT_SESSION_TTL", "1800"))
+
+    METRICS_ENABLED: bool = (
+        os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    )
+    METRICS_MAX_THREADS: int = int(os.getenv("METRICS_MAX_THREADS", "1024"))
+
+    MODEL_REGISTRY_MAX_ENTRIES: int = int(
+        os.getenv("MODEL_REGISTRY_MAX_ENTRIES", "256")
+    )
+
+    HISTORY_WINDOW_ENABLED: bool = (
+        os.getenv("HISTORY_WINDOW_ENABLED", "false").lower() == "true"
+    )
+    HISTORY_MAX_TOKENS: int = int(os.getenv("HISTORY_MAX_TOKENS", "4000"))
+    HISTORY_KEEP_TURNS: int = int(os.getenv("HISTORY_KEEP_TURNS", "4"))
 
     RESUME_API_PREFIX: str = os.getenv("RESUME_API_PREFIX", "/sylab/api/v1")
-    RESUME_GENERATOR_URL: str = os.getenv("RESUME_GENERATOR_URL")
+    RESUME_GENERATOR_URL: str | None = os.getenv("RESUME_GENERATOR_URL")
     RESUME_DOWNLOAD_PATH: str = os.getenv(
         "RESUME_DOWNLOAD_PATH", "resume.pdf"
     )
+    RESUME_INCREMENTAL_EXTRACTION: bool = (
+        os.getenv("RESUME_INCREMENTAL_EXTRACTION", "false").lower() == "true"
+    )
+    RESUME_PRE_EXTRACTION: bool = (
+        os.getenv("RESUME_PRE_EXTRACTION", "false").lower() == "true"
+    )
+    RESUME_SECTION_EXTRACTION: bool = (
+        os.getenv("RESUME_SECTION_EXTRACTION", "false").lower() == "true"
+    )
+    RESUME_SECTION_MIN_TOKENS: int = int(
+        os.getenv("RESUME_SECTION_MIN_TOKENS", "512")
+    )
+    RESUME_DOCUMENT_INGESTION: bool = (
+        os.getenv("RESUME_DOCUMENT_INGESTION", "false").lower() == "true"
+    )
+    RESUME_UPLOAD_DIR: str = os.getenv("RESUME_UPLOAD_DIR", "data/uploads")
+    RESUME_INGEST_CHUNK_CHARS: int = int(
+        os.getenv("RESUME_INGEST_CHUNK_CHARS", "4000")
+    )
+    RESUME_INGEST_CONCURRENCY: int = int(
+        os.getenv("RESUME_INGEST_CONCURRENCY", "4")
+    )
+    RESUME_DOWNLOAD_CHUNK_SIZE: int = int(
+        os.getenv("RESUME_DOWNLOAD_CHUNK_SIZE", str(64 * 1024))
+    )
+    RESUME_STORE_DIR: str = os.getenv("RESUME_STORE_DIR", "data/resumes")
+    RESUME_STORE_MAX_BYTES: int = int(
+        os.getenv("RESUME_STORE_MAX_BYTES", str(512 * 1024 * 1024))
+    )
+    RESUME_STORE_TTL: float = float(os.getenv("RESUME_STORE_TTL", "86400"))
+    # a render is a POST, so only hedge it when the generator can take a
+    # duplicate of a slow call
+    RESUME_HEDGE_RENDER: bool = (
+        os.getenv("RESUME_HEDGE_RENDER", "false").lower() == "true"
+    )
+    RESUME_SPECULATIVE_RENDER: bool = (
+        os.getenv("RESUME_SPECULATIVE_RENDER", "false").lower() == "true"
+    )
+    RESUME_SPECULATIVE_WORKERS: int = int(
+        os.getenv("RESUME_SPECULATIVE_WORKERS", "2")
+    )
+    HTTP_POOL_CONNECTIONS: int = int(os.getenv("HTTP_POOL_CONNECTIONS", "10"))
+    HTTP_POOL_MAXSIZE: int = int(os.getenv("HTTP_POOL_MAXSIZE", "32"))
+    HTTP_POOL_BLOCK: bool = (
+        os.getenv("HTTP_POOL_BLOCK", "true").lower() == "true"
+    )
+    # deadline in seconds of a whole call to an upstream, hedge included
+    HTTP_DEADLINE: float = float(os.getenv("HTTP_DEADLINE", "60"))
+    HTTP_BREAKER_THRESHOLD: int = int(
+        os.getenv("HTTP_BREAKER_THRESHOLD", "5")
+    )
+    HTTP_BREAKER_RESET_TIMEOUT: float = float(
+        os.getenv("HTTP_BREAKER_RESET_TIMEOUT", "30")
+    )
+    HTTP_HEDGE_ENABLED: bool = (
+        os.getenv("HTTP_HEDGE_ENABLED", "true").lower() == "true"
+    )
+    HTTP_HEDGE_QUANTILE: float = float(
+        os.getenv("HTTP_HEDGE_QUANTILE", "0.95")
+    )
+    HTTP_HEDGE_MIN_SAMPLES: int = int(
+        os.getenv("HTTP_HEDGE_MIN_SAMPLES", "50")
+    )
+    HTTP_HEDGE_MIN_DELAY: float = float(
+        os.getenv("HTTP_HEDGE_MIN_DELAY", "0.1")
+    )
+    HTTP_HEDGE_INITIAL_DELAY: float = float(
+        os.getenv("HTTP_HEDGE_INITIAL_DELAY", "1.0")
+    )
+
+    BULK_RENDER_CONCURRENCY: int = int(
+        os.getenv("BULK_RENDER_CONCURRENCY", "8")
+    )
+    BACKFILL_MAX_CONCURRENCY: int = int(
+        os.getenv("BACKFILL_MAX_CONCURRENCY", "8")
+    )
+    BACKFILL_RETRIES: int = int(os.getenv("BACKFILL_RETRIES", "2"))
 
 
 config = Settings()
@@ -0,0 +1,435 @@
+"""Latency, token and payload metrics of agent graphs.
+
+`instrument` attaches a `GraphMetrics` callback handler to a compiled
+graph. It records, per node, the wall time, the payload size of the node
+output, the input and output tokens reported in the model responses,
+retries and errors. Routing functions of conditional edges are timed like
+nodes. Metrics are aggregated in a process-wide `MetricsRegistry`,
+exported with `to_prometheus` or `to_json`.
+"""
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.messages import BaseMessage
+from langgraph.graph.state import CompiledStateGraph
+from pydantic import BaseModel
+
+from ale.core.config import config as c
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0,
+)
+SIZE_BUCKETS = tuple(64 * 4 ** power for power in range(10))
+
+_HELP = {
+    "ale_node_duration_seconds": "Wall time of graph node runs.",
+    "ale_node_payload_bytes": "Serialized size of graph node outputs.",
+    "ale_llm_tokens_total": "Tokens reported by model responses.",
+    "ale_node_retries_total": "Retries of runnables within graph nodes.",
+    "ale_node_errors_total": "Graph node runs that raised.",
+    "ale_http_pool_wait_seconds": "Time to acquire a pooled connection.",
+    "ale_http_pool_checkouts_total": "Connections taken from HTTP pools.",
+    "ale_http_pool_opened_total": "Connections opened by HTTP pools.",
+    "ale_http_pool_connections": "Pooled HTTP connections by state.",
+    "ale_http_pool_reuse_ratio": "Share of checkouts reusing a connection.",
+    "ale_speculative_renders_total": "Speculative resume renders by outcome.",
+    "ale_speculative_saved_seconds": "Render time saved by speculation.",
+    "ale_llm_route_total": "Extraction calls per model tier and reason.",
+    "ale_llm_tier_seconds": "Wall time of extraction calls per model tier.",
+}
+
+
+@dataclass
+class Histogram:
+    """Cumulative histogram over fixed bucket bounds."""
+
+    buckets: tuple[float, ...]
+    counts: list[int] = field(default_factory=list)
+    sum: float = 0.0
+    count: int = 0
+
+    def __post_init__(self):
+        self.counts = self.counts or [0] * (len(self.buckets) + 1)
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> list[tuple[str, int]]:
+        """Bucket upper bounds with the number of values at or below them."""
+        bounds = [f"{bound:g}" for bound in self.buckets] + ["+Inf"]
+        running, result = 0, []
+        for bound, count in zip(bounds, self.counts):
+            running += count
+            result.append((bound, running))
+        return result
+
+
+def percentile(values: list[float], q: float) -> float:
+    """Nearest-rank percentile of `values`, with `q` in [0, 1]."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def _labels(labels: tuple) -> str:
+    return ",".join(f'{key}="{value}"' for key, value in labels)
+
+
+class MetricsRegistry:
+    """Thread-safe store of histograms, counters and per-thread totals.
+
+    Histograms and counters are labelled by graph and node, or by upstream
+    host, so their cardinality stays bounded. Gauges are not stored but
+    read from the collectors registered with `add_collector` on export.
+    Totals per conversation thread are kept for the `max_threads` most
+    recently active threads and only exported as JSON.
+
+    Args:
+        max_threads (int): conversation threads to keep totals for.
+    """
+
+    def __init__(self, max_threads: int = 1024):
+        self.max_threads = max_threads
+        self._histograms: dict[tuple, Histogram] = {}
+        self._counters: dict[tuple, float] = {}
+        self._threads: OrderedDict[str, dict] = OrderedDict()
+        self._collectors: list[Callable[[], Iterable[tuple]]] = []
+        self._lock = threading.Lock()
+
+    def observe(
+        self, name: str, value: float, buckets: tuple, **labels: str
+    ):
+        """Add `value` to the histogram `name` with `labels`."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, value: float = 1, **labels: str):
+        """Add `value` to the counter `name` with `labels`."""
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def add_collector(self, collect: Callable[[], Iterable[tuple]]):
+        """Export the gauges returned by `collect` with the other metrics.
+
+        Args:
+            collect (Callable): called on every export, returning
+                `(name, labels, value)` samples of current values.
+        """
+        with self._lock:
+            self._collectors.append(collect)
+
+    def _gauges(self) -> list[tuple]:
+        with self._lock:
+            collectors = list(self._collectors)
+        return sorted(
+            ((name, tuple(sorted(labels.items()))), value)
+            for collect in collectors
+            for name, labels, value in collect()
+        )
+
+    def add_thread(self, thread_id: str, **values: float):
+        """Add `values` to the running totals of a conversation thread."""
+        with self._lock:
+            totals = self._threads.pop(thread_id, None) or {}
+            for key, value in values.items():
+                totals[key] = totals.get(key, 0) + value
+            self._threads[thread_id] = totals
+            while len(self._threads) > self.max_threads:
+                self._threads.popitem(last=False)
+
+    def thread(self, thread_id: str) -> dict:
+        """Running totals of a conversation thread."""
+        with self._lock:
+            return dict(self._threads.get(thread_id, {}))
+
+    def reset(self):
+        """Drop every recorded value."""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+            self._threads.clear()
+
+    def to_prometheus(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted(
+                (key, Histogram(h.buckets, list(h.counts), h.sum, h.count))
+                for key, h in self._histograms.items()
+            )
+            counters = sorted(self._counters.items())
+        gauges = self._gauges()
+
+        lines, declared = [], set()
+        for (name, labels), histogram in histograms:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} histogram")
+            prefix = _labels(labels) + ("," if labels else "")
+            for bound, count in histogram.cumulative():
+                lines.append(
+                    f'{name}_bucket{{{prefix}le="{bound}"}} {count}'
+                )
+            lines.append(f"{name}_sum{{{_labels(labels)}}} {histogram.sum}")
+            lines.append(
+                f"{name}_count{{{_labels(labels)}}} {histogram.count}"
+            )
+        for (name, labels), value in counters:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{{{_labels(labels)}}} {value:g}")
+        for (name, labels), value in gauges:
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {_HELP.get(name, name)}")
+                lines.append(f"# TYPE {name} gauge")
+            lines.append(f"{name}{{{_labels(labels)}}} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> dict:
+        """Metrics as a JSON-serializable dict."""
+        gauges = [
+            {"name": name, "labels": dict(labels), "value": value}
+            for (name, labels), value in self._gauges()
+        ]
+        with self._lock:
+            return {
+                "histograms": [
+                    {
+                        "name": name,
+                        "labels": dict(labels),
+                        "count": histogram.count,
+                        "sum": histogram.sum,
+                        "buckets": dict(histogram.cumulative()),
+                    }
+                    for (name, labels), histogram in sorted(
+                        self._histograms.items()
+                    )
+                ],
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(
+                        self._counters.items()
+                    )
+                ],
+                "gauges": gauges,
+                "threads": {
+                    thread_id: dict(totals)
+                    for thread_id, totals in self._threads.items()
+                },
+            }
+
+
+metrics = MetricsRegistry(c.METRICS_MAX_THREADS)
+
+
+def _payload_size(payload: Any) -> int:
+    """Approximate serialized size of a node output, in bytes."""
+    if isinstance(payload, (str, bytes)):
+        return len(payload)
+    if isinstance(payload, BaseMessage):
+        return _payload_size(payload.content) + _payload_size(
+            getattr(payload, "tool_calls", None) or []
+        )
+    if isinstance(payload, BaseModel):
+        return len(payload.__pydantic_serializer__.to_json(payload))
+    if isinstance(payload, dict):
+        return sum(
+            len(str(key)) + _payload_size(value)
+            for key, value in payload.items()
+        )
+    if isinstance(payload, (list, tuple)):
+        return sum(_payload_size(item) for item in payload)
+    return len(str(payload))
+
+
+class GraphMetrics(BaseCallbackHandler):
+    """Callback handler recording node metrics of one graph.
+
+    Node runs are recognized by the `graph:step:*` tag LangGraph puts on
+    them; runs named after one of `routers` are timed as well. Model runs
+    and retries, either `with_retry` attempts or retries reported by a
+    model client, are attributed to the node they run in through the
+    `langgraph_node` metadata.
+
+    Args:
+        graph (str): `graph` label of the recorded metrics.
+        routers (set): names of the conditional edge functions.
+        registry (MetricsRegistry): where the metrics are recorded.
+    """
+
+    run_inline = True
+
+    def __init__(
+        self,
+        graph: str,
+        routers: set[str] = frozenset(),
+        registry: MetricsRegistry = None,
+    ):
+        self.graph = graph
+        self.routers = routers
+        self.registry = registry or metrics
+        self._runs: dict[UUID, tuple] = {}
+
+    def _start(self, run_id, name, tags, metadata):
+        metadata = metadata or {}
+        node = metadata.get("langgraph_node")
+        if node is None:
+            return
+        tags = tags or ()
+        thread_id = str(metadata.get("thread_id", ""))
+        timed = name in self.routers or any(
+            tag.startswith("graph:step:") for tag in tags
+        )
+        if any(tag.startswith("retry:attempt:") for tag in tags):
+            self._retry(node, thread_id)
+        self._runs[run_id] = (
+            name if timed else node,
+            thread_id,
+            time.perf_counter() if timed else None,
+        )
+
+    def _retry(self, node, thread_id):
+        self.registry.increment(
+            "ale_node_retries_total", graph=self.graph, node=node
+        )
+        if thread_id:
+            self.registry.add_thread(thread_id, retries=1)
+
+    def _end(self, run_id, payload=None, error=False):
+        run = self._runs.pop(run_id, None)
+        if run is None or run[2] is None:
+            return
+        node, thread_id, start = run
+        elapsed = time.perf_counter() - start
+        labels = {"graph": self.graph, "node": node}
+        self.registry.observe(
+            "ale_node_duration_seconds", elapsed, LATENCY_BUCKETS, **labels
+        )
+        if error:
+            self.registry.increment("ale_node_errors_total", **labels)
+        elif payload is not None:
+            self.registry.observe(
+                "ale_node_payload_bytes",
+                _payload_size(payload),
+                SIZE_BUCKETS,
+                **labels,
+            )
+        if thread_id:
+            self.registry.add_thread(
+                thread_id, duration_s=elapsed, node_runs=1
+            )
+
+    def on_chain_start(
+        self, serialized, inputs, *, run_id, tags=None, metadata=None,
+        **kwargs,
+    ):
+        self._start(run_id, kwargs.get("name"), tags, metadata)
+
+    def on_tool_start(
+        self, serialized, input_str, *, run_id, tags=None, metadata=None,
+        **kwargs,
+    ):
+        self._start(run_id, kwargs.get("name"), tags, metadata)
+
+    def on_chat_model_start(
+        self, serialized, messages, *, run_id, tags=None, metadata=None,
+        **kwargs,
+    ):
+        self._start(run_id, None, tags, metadata)
+
+    def on_llm_start(
+        self, serialized, prompts, *, run_id, tags=None, metadata=None,
+        **kwargs,
+    ):
+        self._start(run_id, None, tags, metadata)
+
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._end(run_id, outputs)
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        self._end(run_id, output)
+
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=True)
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error=True)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._runs.pop(run_id, None)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        run = self._runs.pop(run_id, None)
+        if run is None:
+            return
+        node, thread_id, _ = run
+        usage = {"input_tokens": 0, "output_tokens": 0}
+        for generations in response.generations:
+            for generation in generations:
+                message = getattr(generation, "message", None)
+                metadata = getattr(message, "usage_metadata", None) or {}
+                for key in usage:
+                    usage[key] += metadata.get(key, 0)
+        for key, value in usage.items():
+            if value:
+                self.registry.increment(
+                    "ale_llm_tokens_total",
+                    value,
+                    graph=self.graph,
+                    node=node,
+                    direction=key.removesuffix("_tokens"),
+                )
+        if thread_id:
+            self.registry.add_thread(thread_id, llm_calls=1, **usage)
+
+    def on_retry(self, retry_state, *, run_id, **kwargs):
+        run = self._runs.get(run_id)
+        if run is not None:
+            self._retry(run[0], run[1])
+
+
+def instrument(
+    graph: CompiledStateGraph,
+    name: str = None,
+    registry: MetricsRegistry = None,
+) -> CompiledStateGraph:
+    """Record node metrics of every run of `graph`.
+
+    Args:
+        graph (CompiledStateGraph): compiled graph to instrument.
+        name (str): `graph` label of its metrics. Default is None, meaning
+            the graph name.
+        registry (MetricsRegistry): where the metrics are recorded. Default
+            is None, meaning the process-wide `metrics`.
+
+    Callbacks passed when invoking the graph replace the bound ones, so
+    callers passing their own should add a `GraphMetrics` to them.
+
+    Returns:
+        CompiledStateGraph: copy of `graph` with the handler attached.
+    """
+    routers = {
+        router
+        for branches in graph.builder.branches.values()
+        for router in branches
+    }
+    handler = GraphMetrics(name or graph.get_name(), routers, registry)
+    return graph.with_config(callbacks=[handler])
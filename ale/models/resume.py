@@ -1,7 +1,15 @@
 """Resume data models"""
+from functools import lru_cache
+from typing import Any
 
 from langgraph.graph import MessagesState
-from pydantic import BaseModel, Field
+from pydantic import (
+    BaseModel,
+    Field,
+    PrivateAttr,
+    TypeAdapter,
+    create_model,
+)
 
 
 class JobExperience(BaseModel):
@@ -32,6 +40,16 @@ class Education(BaseModel):
     description: str | None = Field(default=None, description="Remarks on education")
 
 
+# Sections a resume can be generated without once the user agrees to.
+OPTIONAL_FIELDS = frozenset(
+    ["linkedin", "github", "website", "certifications"]
+)
+# Sections holding several entries, which later turns can add to.
+COLLECTION_FIELDS = frozenset(
+    ["experience", "education", "skills", "certifications"]
+)
+
+
 class ResumeData(BaseModel):
     """Resume data"""
 
@@ -55,7 +73,180 @@ class ResumeData(BaseModel):
         default=None, description="Certifications"
     )
 
+    # JSON of each field as last serialized; a field is dirty when absent.
+    _sections: dict[str, bytes] = PrivateAttr(default_factory=dict)
+    # Names of the fields holding no data, or None until first computed.
+    _missing: set[str] | None = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._touch(name)
+
+    def _touch(self, field: str):
+        """Mark `field` dirty and refresh its missing state."""
+        self._sections.pop(field, None)
+        if self._missing is not None:
+            if _is_missing(getattr(self, field)):
+                self._missing.add(field)
+            else:
+                self._missing.discard(field)
+
+    def model_copy(self, *, update: dict = None, deep: bool = False):
+        copy = super().model_copy(update=update, deep=deep)
+        copy._sections = dict(self._sections)
+        copy._missing = None if self._missing is None else set(self._missing)
+        for field in update or ():
+            if field in type(self).model_fields:
+                copy._touch(field)
+        return copy
+
+    def missing_fields(self) -> list[str]:
+        """Fields that hold no data yet, in schema order."""
+        if self._missing is None:
+            self._missing = {
+                field
+                for field in type(self).model_fields
+                if _is_missing(getattr(self, field))
+            }
+        return [
+            field for field in type(self).model_fields
+            if field in self._missing
+        ]
+
+    def missing_required(self) -> list[str]:
+        """Missing fields outside `OPTIONAL_FIELDS`, in schema order."""
+        return [
+            field for field in self.missing_fields()
+            if field not in OPTIONAL_FIELDS
+        ]
+
+    def apply(self, patch: BaseModel | dict) -> list[str]:
+        """Merge a partial extraction into this data in place.
+
+        Only fields explicitly set on `patch` and not None are applied:
+        scalar fields are replaced, list sections gain the entries they do
+        not already contain and skill categories are unioned, keeping the
+        existing order first. Values are taken as they are, without
+        validation, so a dict patch must hold already typed values.
+
+        Sections are tracked per field, so changes must go through
+        attribute assignment or this method rather than by mutating a
+        list or dict in place.
+
+        Args:
+            patch (BaseModel | dict): partial resume data, e.g. an instance
+                of `partial_resume_model(...)`.
+
+        Returns:
+            list[str]: the fields that changed.
+        """
+        if isinstance(patch, BaseModel):
+            patch = {
+                field: getattr(patch, field)
+                for field in patch.model_fields_set
+            }
+        changed = []
+        for field, new in patch.items():
+            if new is None or field not in type(self).model_fields:
+                continue
+            old = getattr(self, field)
+            if isinstance(new, list) and old:
+                added = [item for item in new if item not in old]
+                if not added:
+                    continue
+                new = old + added
+            elif isinstance(new, dict) and old:
+                merged = {key: list(values) for key, values in old.items()}
+                for key, values in new.items():
+                    current = merged.setdefault(key, [])
+                    current.extend(v for v in values if v not in current)
+                if merged == old:
+                    continue
+                new = merged
+            elif new == old:
+                continue
+            setattr(self, field, new)
+            changed.append(field)
+        return changed
+
+    def merge(self, patch: BaseModel) -> "ResumeData":
+        """Return a copy of this data updated with a partial extraction.
+
+        Follows the semantics of `apply`, leaving this instance untouched.
+
+        Args:
+            patch (BaseModel): partial resume data, e.g. an instance of
+                `partial_resume_model(...)`.
+
+        Returns:
+            ResumeData: merged data.
+        """
+        merged = self.model_copy()
+        merged.apply(patch)
+        return merged
+
+    def to_json(self) -> str:
+        """JSON document of the data, as `model_dump_json` returns it.
+
+        The JSON of each field is kept between calls and only dirty fields
+        are serialized again.
+        """
+        parts = []
+        for field in type(self).model_fields:
+            section = self._sections.get(field)
+            if section is None:
+                section = _field_adapter(field).dump_json(
+                    getattr(self, field)
+                )
+                self._sections[field] = section
+            parts.append(b'"%s":%s' % (field.encode(), section))
+        return (b"{" + b",".join(parts) + b"}").decode()
+
+
+def _is_missing(value: Any) -> bool:
+    return value in (None, "", [], {})
+
+
+@lru_cache(maxsize=None)
+def _field_adapter(field: str) -> TypeAdapter:
+    return TypeAdapter(ResumeData.model_fields[field].annotation)
+
+
+@lru_cache(maxsize=128)
+def _partial_resume_model(fields: tuple[str, ...]) -> type[BaseModel]:
+    return create_model(
+        "ResumeData",
+        __doc__=ResumeData.__doc__,
+        **{name: (ResumeData.model_fields[name].annotation,
+                  ResumeData.model_fields[name])
+           for name in fields},
+    )
+
+
+def partial_resume_model(fields: list[str]) -> type[BaseModel]:
+    """Resume data model narrowed to `fields`.
+
+    The narrowed model keeps the `ResumeData` name and field definitions,
+    so it can be passed to `with_structured_output` to ask the model for a
+    patch covering only those fields. Models are cached per field subset.
+
+    Args:
+        fields (list[str]): names of `ResumeData` fields to keep.
+
+    Returns:
+        type[BaseModel]: the narrowed model class.
+    """
+    return _partial_resume_model(
+        tuple(name for name in ResumeData.model_fields if name in fields)
+    )
+
 
 class ResumeState(MessagesState):
     missing_fields: list[str]
     data: ResumeData
+    # uploaded resume document waiting to be ingested, under the upload dir
+    document: str | None
+    extracted_until: str | None
+    summary: str | None
+    summarized_until: str | None
@@ -1,6 +1,13 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Any
 
-from pydantic import BaseModel, Field, create_model
+from pydantic import BaseModel, Field, TypeAdapter, create_model
+
+from ale.core.config import config as c
 
 
 def map_json_type_to_python(type_str: str, schema: dict = None, **kwargs):
@@ -41,6 +48,138 @@ def map_json_type_to_python(type_str: str, schema: dict = None, **kwargs):
     return Any
 
 
+def schema_key(model_name: str, json_schema: dict[str, Any]) -> str:
+    """Canonical hash of a model name and its schema.
+
+    Two schemas differing only in key order share a key.
+
+    Args:
+        model_name (str): name of the model built from the schema.
+        json_schema (dict): schema in the `create_dynamic_model` format.
+
+    Returns:
+        str: hex encoded sha256 digest.
+    """
+    canonical = json.dumps(
+        [model_name, json_schema],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=repr,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledModel:
+    """A dynamic model with its precompiled validators."""
+
+    key: str
+    model: type[BaseModel]
+    adapter: TypeAdapter
+    list_adapter: TypeAdapter
+
+
+class ModelRegistry:
+    """Thread-safe LRU registry of models built from JSON schemas.
+
+    Models are keyed by `schema_key`, so the same schema is compiled once
+    however often it is requested. Nested object and array item models are
+    registered on their own, named after their parent and field so that
+    nested objects of the same field name never share a model name. The
+    `max_entries` most recently used models are kept.
+
+    Args:
+        max_entries (int): number of models kept, nested ones included.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._models: OrderedDict[str, CompiledModel] = OrderedDict()
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._models)
+
+    def clear(self):
+        """Drop every registered model."""
+        with self._lock:
+            self._models.clear()
+
+    def get(
+        self, model_name: str, json_schema: dict[str, Any]
+    ) -> CompiledModel:
+        """Return the model for `json_schema`, compiling it if needed.
+
+        Args:
+            model_name (str): name of the model.
+            json_schema (dict): schema in the `create_dynamic_model` format.
+
+        Returns:
+            CompiledModel
+        """
+        key = schema_key(model_name, json_schema)
+        with self._lock:
+            compiled = self._models.get(key)
+            if compiled is not None:
+                self._models.move_to_end(key)
+                self.hits += 1
+                return compiled
+            self.misses += 1
+            model = self._build(model_name, json_schema)
+            compiled = CompiledModel(
+                key=key,
+                model=model,
+                adapter=TypeAdapter(model),
+                list_adapter=TypeAdapter(list[model]),
+            )
+            self._models[key] = compiled
+            while len(self._models) > self.max_entries:
+                self._models.popitem(last=False)
+            return compiled
+
+    def _build(
+        self, model_name: str, json_schema: dict[str, Any]
+    ) -> type[BaseModel]:
+        fields = {}
+        for field_name, field_info in json_schema.items():
+            type_str = field_info.get('type', 'string')
+            items_schema = field_info.get('items', {})
+
+            if type_str == 'object' and 'properties' in field_info:
+                field_type = self.get(
+                    f"{model_name}{field_name.capitalize()}",
+                    field_info['properties'],
+                ).model
+            elif (
+                type_str == 'array'
+                and items_schema.get('type') == 'object'
+                and 'properties' in items_schema
+            ):
+                item_model = self.get(
+                    f"{model_name}_{field_name.capitalize()}Item",
+                    items_schema['properties'],
+                ).model
+                field_type = list[item_model]
+            else:
+                field_type = map_json_type_to_python(
+                    type_str, field_info, object_name=model_name
+                )
+
+            fields[field_name] = (
+                field_type,
+                Field(
+                    default=field_info.get('default', ""),
+                    description=field_info.get('description', ''),
+                ),
+            )
+        return create_model(model_name, **fields)
+
+
+registry = ModelRegistry(c.MODEL_REGISTRY_MAX_ENTRIES)
+
+
 def create_dynamic_model(
     model_name: str, json_schema: dict[str, Any]
 ) -> BaseModel:
@@ -79,61 +218,16 @@ def create_dynamic_model(
     }
     `description` is mandatory for LLM returning structured output.
 
+    Models come from the shared `registry`, so calling this again with the
+    same schema returns the same class. Nested models are named after
+    their parent and field, e.g. `ModelNested_field` and
+    `Model_Array_fieldItem`.
+
     Args:
+        model_name (str): name of the model.
         json_schema (dict): A dictionary representing the model's schema
 
     Returns:
         type: A dynamically created Pydantic model
     """
-    # Prepare fields for create_model
-    fields = {}
-    for field_name, field_info in json_schema.items():
-        # Determine field type
-        field_type_str = map_json_type_to_python(
-            field_info.get('type', 'string')
-        )
-
-        # Handle nested objects
-        if field_type_str == 'object' and 'properties' in field_info:
-            # Create a nested model
-            nested_model_name = f"{model_name}{field_name.capitalize()}"
-            field_type = create_dynamic_model(
-                nested_model_name, field_info['properties']
-            )
-            print(field_type)
-        # Handle arrays with nested objects
-        elif field_type_str == 'array' and 'items' in field_info:
-            items_schema = field_info['items']
-            items_type = items_schema.get('type', 'string')
-
-            if items_type == 'object' and 'properties' in items_schema:
-                # Create a model for array items
-                item_model_name = f"{model_name}_{field_name.capitalize()}Item"
-                item_model = create_dynamic_model(
-                    item_model_name, items_schema['properties']
-                )
-                field_type = list[item_model]
-            else:
-                # Simple array type
-                field_type = map_json_type_to_python(
-                    field_type_str, field_info
-                )
-        else:
-            # Regular field type
-            field_type = map_json_type_to_python(
-                field_type_str, field_info, object_name=model_name
-            )
-
-        # Handle description
-        description = field_info.get('description', '')
-        field_value = Field(
-            default=field_info.get('default', ""),
-            description=description
-        )
-
-        # Store the field definition
-        fields[field_name] = (field_type, field_value)
-
-    # Dynamically create the Pydantic model
-    model: BaseModel = create_model(model_name, **fields)
-    return model
+    return registry.get(model_name, json_schema).model
@@ -1,15 +1,55 @@
-"""Base repository layer for BigQuery."""
-from dataclasses import dataclass
+"""Base repository layer for BigQuery.
 
-from google.cloud import bigquery
-from pandas import DataFrame
+`google.cloud.bigquery`, `pandas` and `pyarrow` are imported on first use,
+as they are slow to import and only needed by code actually querying
+BigQuery.
+"""
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import TYPE_CHECKING, Iterator
 
 from ale.core.config import config as c
+from ale.core.metrics import metrics
+from ale.repository.cache import QueryCache, query_key
+
+if TYPE_CHECKING:
+    from google.cloud.bigquery import QueryJob
+    from google.cloud.bigquery.table import RowIterator
+    from pandas import DataFrame
+    from pyarrow import RecordBatch
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=None)
+def shared_query_cache() -> QueryCache:
+    """Process wide result cache configured from settings."""
+    return QueryCache(
+        c.BQ_CACHE_DIR,
+        c.BQ_CACHE_MAX_ENTRIES,
+        c.BQ_CACHE_MAX_BYTES,
+        c.BQ_CACHE_TTL,
+    )
 
 
 @dataclass
 class BigQueryBase:
-    """Base repostitory for BigQuery."""
+    """Base repostitory for BigQuery.
+
+    Results are fetched page by page, `BQ_PAGE_SIZE` rows at a time unless
+    a `page_size` is given. `_iter_pages`, `_iter_batches` and
+    `_iter_frames` hold one page in memory at a time whatever the result
+    size, while `_query` builds a single DataFrame from columnar Arrow
+    pages instead of per-row dicts. With `BQ_STORAGE_API` on, results are
+    read through the BigQuery Storage Read API instead of paged REST
+    calls, which needs the optional `google-cloud-bigquery-storage`
+    package.
+
+    Read-only methods exposed to agents should go through `_read`, which
+    serves repeated queries from the `QueryCache` and dry-runs new ones
+    against the `BQ_MAX_BYTES_PROCESSED` budget first.
+    """
     project_id: str
     dataset: str
 
@@ -21,28 +61,240 @@ class BigQueryBase:
             bigquery.Client: The BigQuery client instance.
         """
         if not hasattr(self, "_client"):
+            from google.cloud import bigquery
+
             setattr(self, "_client", bigquery.Client(
                 project=self.project_id,
                 location=c.BQ_LOCATION
             ))
         return getattr(self, "_client")
 
+    @property
+    def bqstorage_client(self):
+        """Storage Read API client, or None when `BQ_STORAGE_API` is off.
+
+        Returns:
+            bigquery_storage.BigQueryReadClient
+        """
+        if not c.BQ_STORAGE_API:
+            return None
+        if not hasattr(self, "_bqstorage_client"):
+            from google.cloud import bigquery_storage
+
+            setattr(
+                self,
+                "_bqstorage_client",
+                bigquery_storage.BigQueryReadClient(),
+            )
+        return getattr(self, "_bqstorage_client")
+
+    @property
+    def query_cache(self) -> QueryCache | None:
+        """Result cache used by `_read`, None if `BQ_CACHE_ENABLED` is off.
+
+        Returns:
+            QueryCache: shared by every repository unless set per instance.
+        """
+        if not c.BQ_CACHE_ENABLED:
+            return None
+        if not hasattr(self, "_query_cache"):
+            setattr(self, "_query_cache", shared_query_cache())
+        return getattr(self, "_query_cache")
+
+    def _job_config(self, query_params: list = None, dry_run: bool = False):
+        from google.cloud import bigquery
+
+        job_config = bigquery.QueryJobConfig(dry_run=dry_run)
+        job_config.query_parameters = query_params or []
+        return job_config
+
+    def _result(
+        self, query: str, query_params: list = None, page_size: int = None
+    ) -> "RowIterator":
+        """Run `query` and return its rows, fetched lazily page by page.
+
+        Args:
+            query (str): query to run.
+            query_params (List): list of query parameters.
+            page_size (int): rows per page. Default is None, meaning
+                `BQ_PAGE_SIZE`.
+
+        Returns:
+            RowIterator
+        """
+        query_job = self.client.query(
+            query, job_config=self._job_config(query_params)
+        )
+        return query_job.result(page_size=page_size or c.BQ_PAGE_SIZE)
+
+    def _iter_pages(
+        self, query: str, query_params: list = None, page_size: int = None
+    ) -> Iterator[list[dict]]:
+        """Stream the result of `query` as pages of row dicts.
+
+        Args:
+            query (str): query to run.
+            query_params (List): list of query parameters.
+            page_size (int): rows per page. Default is None, meaning
+                `BQ_PAGE_SIZE`.
+
+        Yields:
+            list[dict]: rows of one page.
+        """
+        for page in self._result(query, query_params, page_size).pages:
+            yield [dict(row) for row in page]
+
+    def _iter_batches(
+        self, query: str, query_params: list = None, page_size: int = None
+    ) -> Iterator["RecordBatch"]:
+        """Stream the result of `query` as Arrow record batches.
+
+        Args:
+            query (str): query to run.
+            query_params (List): list of query parameters.
+            page_size (int): rows per page. Default is None, meaning
+                `BQ_PAGE_SIZE`.
+
+        Yields:
+            pyarrow.RecordBatch: columns of one page.
+        """
+        rows = self._result(query, query_params, page_size)
+        yield from rows.to_arrow_iterable(
+            bqstorage_client=self.bqstorage_client
+        )
+
+    def _iter_frames(
+        self, query: str, query_params: list = None, page_size: int = None
+    ) -> Iterator["DataFrame"]:
+        """Stream the result of `query` as one DataFrame per page.
+
+        Args:
+            query (str): query to run.
+            query_params (List): list of query parameters.
+            page_size (int): rows per page. Default is None, meaning
+                `BQ_PAGE_SIZE`.
+
+        Yields:
+            pd.DataFrame
+        """
+        for batch in self._iter_batches(query, query_params, page_size):
+            yield batch.to_pandas()
+
     def _query(
-        self, query: str, query_params: list = None, dry_run: bool = False
-    ) -> DataFrame:
+        self,
+        query: str,
+        query_params: list = None,
+        dry_run: bool = False,
+        page_size: int = None,
+    ) -> "DataFrame":
         """Runs query with the given parameters.
 
+        The result is read as Arrow pages and converted to pandas once,
+        releasing each Arrow column as soon as it is converted.
+
         Args:
             query (str): query to run.
             query_params (List): list of query parameters.
+            dry_run (bool): only validate the query. The returned
+                DataFrame is then empty.
+            page_size (int): rows per page. Default is None, meaning
+                `BQ_PAGE_SIZE`.
 
         Returns:
             pd.DataFrame
         """
-        if not query_params:
-            query_params = []
+        if dry_run:
+            from pandas import DataFrame
 
-        job_config = bigquery.QueryJobConfig(dry_run=dry_run)
-        job_config.query_parameters = query_params
-        query_job = self.client.query(query, job_config=job_config)
-        return DataFrame([dict(row) for row in query_job])
+            self._dry_run(query, query_params)
+            return DataFrame()
+
+        table = self._result(query, query_params, page_size).to_arrow(
+            bqstorage_client=self.bqstorage_client,
+            create_bqstorage_client=False,
+        )
+        return table.to_pandas(split_blocks=True, self_destruct=True)
+
+    def _dry_run(self, query: str, query_params: list = None) -> "QueryJob":
+        """Validate `query` without running it.
+
+        Args:
+            query (str): query to validate.
+            query_params (List): list of query parameters.
+
+        Returns:
+            QueryJob: job carrying the `total_bytes_processed` estimate.
+        """
+        return self.client.query(
+            query, job_config=self._job_config(query_params, True)
+        )
+
+    def _check_cost(
+        self, query: str, query_params: list = None
+    ) -> int | None:
+        """Dry-run `query` and hold it to the `BQ_MAX_BYTES_PROCESSED` budget.
+
+        Depending on `BQ_COST_GATE`, a query over budget raises ("error"),
+        is logged ("warn"), or is not estimated at all ("off").
+
+        Args:
+            query (str): query to check.
+            query_params (List): list of query parameters.
+
+        Returns:
+            int: estimated bytes processed, or None when the gate is off.
+        """
+        if c.BQ_COST_GATE == "off":
+            return None
+        estimate = self._dry_run(query, query_params).total_bytes_processed
+        estimate = estimate or 0
+        if estimate <= c.BQ_MAX_BYTES_PROCESSED:
+            return estimate
+
+        message = (
+            f"Query would process {estimate} bytes, over the budget of "
+            f"{c.BQ_MAX_BYTES_PROCESSED} bytes"
+        )
+        if c.BQ_COST_GATE == "warn":
+            _LOGGER.warning(message)
+            return estimate
+        metrics.increment("ale_bq_queries_refused_total")
+        raise RuntimeError(message)
+
+    def _read(
+        self,
+        query: str,
+        query_params: list = None,
+        use_cache: bool = True,
+        page_size: int = None,
+    ) -> "DataFrame":
+        """Runs a read-only query, served from the result cache if fresh.
+
+        On a miss, the query is checked with `_check_cost` before it runs.
+
+        Args:
+            query (str): query to run.
+            query_params (List): list of query parameters.
+            use_cache (bool): look up and store the result in
+                `query_cache`. Default is True.
+            page_size (int): rows per page. Default is None, meaning
+                `BQ_PAGE_SIZE`.
+
+        Returns:
+            pd.DataFrame: a copy callers are free to modify.
+        """
+        cache = self.query_cache if use_cache else None
+        key = query_key(self.project_id, query, query_params)
+        if cache is not None:
+            frame = cache.get(key)
+            metrics.increment(
+                "ale_bq_cache_total", result="miss" if frame is None else "hit"
+            )
+            if frame is not None:
+                return frame
+
+        self._check_cost(query, query_params)
+        frame = self._query(query, query_params, page_size=page_size)
+        if cache is not None:
+            cache.put(key, frame)
+        return frame
@@ -0,0 +1,212 @@
+"""Result cache for BigQuery queries.
+
+`pandas` is imported on first use, like in `ale.repository.bigquery`.
+"""
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from pandas import DataFrame
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def query_key(project_id: str, query: str, query_params: list = None) -> str:
+    """Key a query by its project, SQL text and parameter values.
+
+    Args:
+        project_id (str): project the query runs in.
+        query (str): SQL text.
+        query_params (List): list of query parameters.
+
+    Returns:
+        str: hex encoded sha256 digest.
+    """
+    params = [param.to_api_repr() for param in query_params or []]
+    canonical = json.dumps(
+        [project_id, query, params],
+        sort_keys=True,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class QueryCache:
+    """Bounded in-memory LRU of query results with a local Parquet spill.
+
+    Results evicted from memory are written as Parquet files under `root`,
+    keeping the time they were stored as modification time, and read back
+    on a later hit. A result older than `ttl` seconds is stale in either
+    tier. The oldest spilled files are dropped once `root` grows past
+    `max_bytes`.
+
+    Args:
+        root (str): spill directory. Default is None, meaning results are
+            only kept in memory.
+        max_entries (int): capacity of the in-memory tier.
+        max_bytes (int): capacity of the spill directory.
+        ttl (float): seconds a result stays valid.
+    """
+
+    def __init__(
+        self,
+        root: str = None,
+        max_entries: int = 64,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl: float = 600,
+    ):
+        self.root = root
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, tuple[float, "DataFrame"]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def path(self, key: str) -> Path:
+        """Location of the spilled result for `key`."""
+        return Path(self.root) / f"{key}.parquet"
+
+    def get(self, key: str) -> "DataFrame | None":
+        """Return the cached result for `key` if it is present and fresh.
+
+        Args:
+            key (str): key from `query_key`.
+
+        Returns:
+            pd.DataFrame: a copy of the cached result, or None.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] <= self.ttl:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1].copy()
+            self._memory.pop(key, None)
+
+            entry = self._load(key, now)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._remember(key, *entry)
+            self.hits += 1
+            self.disk_hits += 1
+            return entry[1].copy()
+
+    def put(self, key: str, frame: "DataFrame"):
+        """Store a copy of `frame` as the result for `key`.
+
+        Args:
+            key (str): key from `query_key`.
+            frame (pd.DataFrame): query result.
+        """
+        with self._lock:
+            self._remember(key, time.time(), frame.copy())
+
+    def clear(self):
+        """Drop every cached result, in memory and spilled."""
+        with self._lock:
+            self._memory.clear()
+            if self.root:
+                for path in Path(self.root).glob("*.parquet"):
+                    path.unlink(missing_ok=True)
+
+    def stats(self) -> dict[str, float]:
+        """Hit and miss counters since the cache was created."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.hits - self.disk_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "memory_entries": len(self._memory),
+        }
+
+    def _remember(self, key: str, stored_at: float, frame: "DataFrame"):
+        self._memory[key] = (stored_at, frame)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            evicted, entry = self._memory.popitem(last=False)
+            self._spill(evicted, *entry)
+
+    def _load(
+        self, key: str, now: float
+    ) -> "tuple[float, DataFrame] | None":
+        if not self.root:
+            return None
+        path = self.path(key)
+        try:
+            stored_at = path.stat().st_mtime
+        except FileNotFoundError:
+            return None
+        if now - stored_at > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+
+        from pandas import read_parquet
+
+        try:
+            frame = read_parquet(path)
+        except (OSError, ValueError):
+            _LOGGER.warning("Dropping unreadable cached result %s", path.name)
+            path.unlink(missing_ok=True)
+            return None
+        return stored_at, frame
+
+    def _spill(self, key: str, stored_at: float, frame: "DataFrame"):
+        if not self.root or time.time() - stored_at > self.ttl:
+            return
+        try:
+            if self.path(key).stat().st_mtime == stored_at:
+                return
+        except FileNotFoundError:
+            pass
+        root = Path(self.root)
+        root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=root, suffix=".part")
+        os.close(fd)
+        try:
+            frame.to_parquet(tmp_path, index=False)
+            os.utime(tmp_path, (stored_at, stored_at))
+            os.replace(tmp_path, self.path(key))
+        except Exception:
+            _LOGGER.warning("Could not spill cached result", exc_info=True)
+            Path(tmp_path).unlink(missing_ok=True)
+            return
+        self._evict()
+
+    def _evict(self):
+        now = time.time()
+        entries = []
+        for path in Path(self.root).glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _LOGGER.info("Evicting cached result %s", path.name)
+            path.unlink(missing_ok=True)
+            total -= size
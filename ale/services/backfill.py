@@ -0,0 +1,162 @@
+"""Offline resume extraction over stored conversation transcripts.
+
+Transcripts are JSON lines of `{"id": ..., "messages": [...]}` where
+messages use the usual `{"role": ..., "content": ...}` shape. Each one is
+run through `ResumeAgent.extract_content` and written out as a JSON line
+of `{"id", "data", "missing_fields"}`:
+
+    python -m ale.services.backfill transcripts.jsonl extracted.jsonl
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+from itertools import islice
+from pathlib import Path
+from typing import Iterator
+
+from langchain_core.messages import convert_to_messages
+from langchain_core.runnables import RunnableLambda
+
+from ale.agents import create_resume_agent
+from ale.agents.resume import ResumeAgent
+from ale.core.config import config as c
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _read_checkpoint(path: str) -> set[str]:
+    if not os.path.exists(path):
+        return set()
+    with open(path, encoding="utf-8") as file:
+        return {line.strip() for line in file if line.strip()}
+
+
+def _iter_transcripts(
+    path: str, done: set[str], stats: dict
+) -> Iterator[dict]:
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                transcript = json.loads(line)
+                transcript_id = str(transcript["id"])
+            except (ValueError, KeyError, TypeError) as exc:
+                _LOGGER.error(
+                    "Skipping corrupt transcript on line %d: %s", number, exc
+                )
+                stats["failed"] += 1
+                continue
+            if transcript_id not in done:
+                yield transcript
+
+
+async def backfill(
+    agent: ResumeAgent,
+    source: str,
+    output: str,
+    checkpoint: str = None,
+    max_concurrency: int = None,
+    retries: int = None,
+) -> dict:
+    """Extract resume data from every transcript in `source`.
+
+    Transcripts are read in chunks of a few times `max_concurrency` and
+    sent through the node's `abatch`, with at most `max_concurrency` calls
+    in flight and each call retried up to `retries` times. After a
+    chunk's results are flushed to `output`, their ids are appended to
+    `checkpoint`. A rerun after a crash skips those ids and appends to the
+    same output, so every transcript is written at least once.
+    Transcripts that still fail, or lines that are not a transcript, are
+    logged and left unchecked for the next run.
+
+    Args:
+        agent (ResumeAgent): agent whose extraction is run.
+        source (str): JSON lines of transcripts.
+        output (str): JSON lines file results are appended to.
+        checkpoint (str): file of completed ids. Default is None, meaning
+            `output` with a `.checkpoint` suffix.
+        max_concurrency (int): concurrent extraction calls. Default is
+            None, meaning `BACKFILL_MAX_CONCURRENCY`.
+        retries (int): extra attempts per transcript. Default is None,
+            meaning `BACKFILL_RETRIES`.
+
+    Returns:
+        dict: counts of extracted, skipped and failed transcripts.
+    """
+    checkpoint = checkpoint or f"{output}.checkpoint"
+    max_concurrency = max_concurrency or c.BACKFILL_MAX_CONCURRENCY
+    retries = c.BACKFILL_RETRIES if retries is None else retries
+    extractor = RunnableLambda(
+        agent.extract_content, afunc=agent.aextract_content
+    ).with_retry(stop_after_attempt=retries + 1)
+
+    done = _read_checkpoint(checkpoint)
+    stats = {"extracted": 0, "skipped": len(done), "failed": 0}
+    transcripts = _iter_transcripts(source, done, stats)
+    Path(output).parent.mkdir(parents=True, exist_ok=True)
+    with (
+        open(output, "a", encoding="utf-8") as out,
+        open(checkpoint, "a", encoding="utf-8") as marks,
+    ):
+        while chunk := list(islice(transcripts, max_concurrency * 4)):
+            states = [
+                {"messages": convert_to_messages(item["messages"])}
+                for item in chunk
+            ]
+            results = await extractor.abatch(
+                states,
+                config={"max_concurrency": max_concurrency},
+                return_exceptions=True,
+            )
+            completed = []
+            for item, result in zip(chunk, results):
+                if isinstance(result, Exception):
+                    _LOGGER.error(
+                        "Extraction failed for %s: %s", item["id"], result
+                    )
+                    stats["failed"] += 1
+                    continue
+                out.write(json.dumps({
+                    "id": item["id"],
+                    "data": result["data"].model_dump(mode="json"),
+                    "missing_fields": result["missing_fields"],
+                }, ensure_ascii=False) + "\n")
+                completed.append(str(item["id"]))
+            out.flush()
+            os.fsync(out.fileno())
+            marks.writelines(f"{item_id}\n" for item_id in completed)
+            marks.flush()
+            stats["extracted"] += len(completed)
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Extract resume data from stored transcripts."
+    )
+    parser.add_argument("source", help="JSON lines of transcripts")
+    parser.add_argument("output", help="JSON lines of extracted data")
+    parser.add_argument("--checkpoint")
+    parser.add_argument(
+        "--max-concurrency", type=int, default=c.BACKFILL_MAX_CONCURRENCY
+    )
+    parser.add_argument("--retries", type=int, default=c.BACKFILL_RETRIES)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    stats = asyncio.run(backfill(
+        create_resume_agent(),
+        args.source,
+        args.output,
+        checkpoint=args.checkpoint,
+        max_concurrency=args.max_concurrency,
+        retries=args.retries,
+    ))
+    print(json.dumps(stats, indent=2))
+
+
+if __name__ == "__main__":
+    main()
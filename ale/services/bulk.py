@@ -0,0 +1,183 @@
+"""Bulk rendering of complete resume payloads.
+
+Reads resume data as JSON lines (or a single JSON document), validates
+each record and renders it through the resume generator with bounded
+concurrency over the shared `BasicServices` pool:
+
+    python -m ale.services.bulk resumes.jsonl --output-dir out/
+"""
+import argparse
+import asyncio
+import json
+import logging
+import math
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterator
+
+from pydantic import ValidationError
+
+from ale.core.config import config as c
+from ale.core.metrics import percentile
+from ale.models.resume import ResumeData
+from ale.tools.resume import arender_resume
+from ale.tools.storage import ResumeStore
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class BulkReport:
+    """Outcome of a bulk rendering run."""
+
+    rendered: dict[int, str] = field(default_factory=dict)
+    failures: dict[int, str] = field(default_factory=dict)
+    latencies: list[float] = field(default_factory=list, repr=False)
+    elapsed: float = 0.0
+
+    def summary(self) -> dict:
+        """Throughput, latency percentiles and failures of the run."""
+        return {
+            "rendered": len(self.rendered),
+            "failed": len(self.failures),
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_per_s": round(
+                len(self.rendered) / self.elapsed if self.elapsed else 0.0, 3
+            ),
+            "latency_s": {
+                f"p{int(q * 100)}": round(percentile(self.latencies, q), 4)
+                for q in (0.5, 0.9, 0.95, 0.99)
+            },
+            "failures": self.failures,
+        }
+
+
+def iter_records(path: str) -> Iterator[tuple[int, dict | str]]:
+    """Stream raw records from a JSON lines or JSON file.
+
+    JSON lines are read one at a time. A `.json` file holds one resume
+    object or a list of them and is loaded whole.
+
+    Yields:
+        tuple: the 1-based record number and the decoded object, or the
+            decoding error message for malformed lines.
+    """
+    if path.endswith(".json"):
+        document = json.loads(Path(path).read_text())
+        records = document if isinstance(document, list) else [document]
+        yield from enumerate(records, start=1)
+        return
+
+    with open(path, encoding="utf-8") as file:
+        for number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield number, json.loads(line)
+            except json.JSONDecodeError as exc:
+                yield number, f"Invalid JSON: {exc}"
+
+
+async def render_bulk(
+    path: str, output_dir: str, concurrency: int = None
+) -> BulkReport:
+    """Render every record of `path` into `output_dir`.
+
+    At most `concurrency` requests are in flight, and input is read only
+    as fast as workers take records, so memory stays flat for any input
+    size. Documents are stored by content hash, so duplicated payloads are
+    rendered once. A record whose render raises is reported as a failure
+    and the run goes on.
+
+    Args:
+        path (str): JSON lines or JSON file of resume data.
+        output_dir (str): directory the PDFs are written to.
+        concurrency (int): maximum in-flight renders. Default is None,
+            meaning `BULK_RENDER_CONCURRENCY`.
+
+    Returns:
+        BulkReport
+    """
+    concurrency = concurrency or c.BULK_RENDER_CONCURRENCY
+    target = ResumeStore(output_dir, max_bytes=math.inf, ttl=math.inf)
+    report = BulkReport()
+    queue: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+
+    async def worker():
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            number, record = item
+            start = time.perf_counter()
+            try:
+                if isinstance(record, str):
+                    raise ValueError(record)
+                data = ResumeData.model_validate(record)
+                result = await arender_resume(data, target)
+            except (ValidationError, ValueError) as exc:
+                _LOGGER.warning("Record %s failed: %s", number, exc)
+                report.failures[number] = str(exc)
+                continue
+            except Exception as exc:
+                _LOGGER.exception("Record %s failed", number)
+                report.failures[number] = f"{type(exc).__name__}: {exc}"
+                continue
+            report.latencies.append(time.perf_counter() - start)
+            report.rendered[number] = str(result)
+
+    async def put(item):
+        """Queue `item`, unless every worker stopped and none can take it."""
+        try:
+            queue.put_nowait(item)
+            return
+        except asyncio.QueueFull:
+            pass
+        putter = asyncio.ensure_future(queue.put(item))
+        while not putter.done():
+            alive = [task for task in workers if not task.done()]
+            if not alive:
+                putter.cancel()
+                # raises what stopped the workers
+                await asyncio.gather(*workers)
+                raise RuntimeError("Every render worker stopped")
+            await asyncio.wait(
+                [putter, *alive], return_when=asyncio.FIRST_COMPLETED
+            )
+
+    start = time.perf_counter()
+    workers = [asyncio.create_task(worker()) for _ in range(concurrency)]
+    try:
+        for item in iter_records(path):
+            await put(item)
+        for _ in workers:
+            await put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for task in workers:
+            task.cancel()
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Render resume payloads in bulk."
+    )
+    parser.add_argument("input", help="JSON lines or JSON resume data")
+    parser.add_argument("--output-dir", default=c.RESUME_STORE_DIR)
+    parser.add_argument(
+        "--concurrency", type=int, default=c.BULK_RENDER_CONCURRENCY
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    report = asyncio.run(
+        render_bulk(args.input, args.output_dir, args.concurrency)
+    )
+    print(json.dumps(report.summary(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
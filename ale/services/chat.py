@@ -1,36 +1,57 @@
 from typing import Annotated, TypedDict
 
 from langchain.chat_models import init_chat_model
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.graph import StateGraph, START, END, MessagesState
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
 
+from ale.agents.history import HistoryWindow
+from ale.agents.streaming import areply_tokens, reply_tokens
+from ale.core.checkpoint import create_checkpointer
+from ale.core.config import config as c
+from ale.core.metrics import instrument
 from ale.tools import multiply
 
+# conversation of callers that do not manage sessions
+DEFAULT_THREAD = "2105"
+
 
 class State(MessagesState):
     document: list[str]
+    summary: str | None
+    summarized_until: str | None
 
 
 class Agent:
-    def __init__(self):
-        self.llm = init_chat_model("gemini-2.0-flash-lite").bind_tools(
-            [multiply]
-        )
-        self.memory = MemorySaver()
+    def __init__(self, checkpointer: BaseCheckpointSaver = None):
+        model = init_chat_model("gemini-2.0-flash-lite")
+        self.llm = model.bind_tools([multiply])
+        self.memory = checkpointer or create_checkpointer("chat")
         self.tool_node = ToolNode([multiply])
+        self.history = None
+        if c.HISTORY_WINDOW_ENABLED:
+            self.history = HistoryWindow(
+                model, c.HISTORY_MAX_TOKENS, c.HISTORY_KEEP_TURNS
+            )
 
         builder = StateGraph(State)
         builder.add_node("chatbot", self.chat)
         builder.add_node("tools", self.tool_node)
-        builder.add_edge(START, "chatbot")
+        if self.history:
+            builder.add_node("summarize_history", self.history.summarize)
+            builder.add_edge(START, "summarize_history")
+            builder.add_edge("summarize_history", "chatbot")
+        else:
+            builder.add_edge(START, "chatbot")
         builder.add_conditional_edges(
             "chatbot", self.is_back_to_chat, ["tools", END]
         )
         builder.add_edge("tools", "chatbot")
         builder.add_edge("chatbot", END)
         self.graph = builder.compile(checkpointer=self.memory)
+        if c.METRICS_ENABLED:
+            self.graph = instrument(self.graph, "chat")
 
     def is_back_to_chat(self,state: State):
         messages = state["messages"]
@@ -40,11 +61,48 @@ class Agent:
         return END
 
     def chat(self, state: State):
-        return {"messages": [self.llm.invoke(state["messages"])]}
+        messages = state["messages"]
+        if self.history:
+            messages = self.history.messages(state)
+        return {"messages": [self.llm.invoke(messages)]}
 
-    def invoke(self, query: str):
+    def invoke(self, query: str, thread_id: str = DEFAULT_THREAD):
         resp = self.graph.invoke(
             {"messages": [{"role": "user", "content": query}]},
-            {"configurable": {"thread_id": "2105"}},
+            {"configurable": {"thread_id": thread_id}},
         )
         return resp
+
+    async def ainvoke(self, query: str, thread_id: str = DEFAULT_THREAD):
+        """Async counterpart of `invoke`."""
+        return await self.graph.ainvoke(
+            {"messages": [{"role": "user", "content": query}]},
+            {"configurable": {"thread_id": thread_id}},
+        )
+
+    def stream(self, query: str, thread_id: str = DEFAULT_THREAD):
+        """Like `invoke`, but yields the reply text as it is generated."""
+        yield from reply_tokens(
+            self.graph.stream(
+                {"messages": [{"role": "user", "content": query}]},
+                {"configurable": {"thread_id": thread_id}},
+                stream_mode="messages",
+            ),
+            ["chatbot"],
+        )
+
+    async def astream(self, query: str, thread_id: str = DEFAULT_THREAD):
+        """Async counterpart of `stream`."""
+        async for text in areply_tokens(
+            self.graph.astream(
+                {"messages": [{"role": "user", "content": query}]},
+                {"configurable": {"thread_id": thread_id}},
+                stream_mode="messages",
+            ),
+            ["chatbot"],
+        ):
+            yield text
+
+    def forget(self, thread_id: str):
+        """Delete the checkpoints of a conversation."""
+        self.memory.delete_thread(thread_id)
@@ -0,0 +1,249 @@
+"""Per-user conversations with the chat `Agent`.
+
+`SessionManager` issues a thread id per session and serializes the turns
+of each session, while different sessions run concurrently. Sessions idle
+for longer than `ttl`, and the least recently used ones once there are
+more than `max_sessions` or their history takes more than `max_bytes`,
+are evicted along with their checkpoints.
+"""
+import asyncio
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from dataclasses import dataclass, field
+
+from langchain_core.messages import get_buffer_string
+
+from ale.core.config import config as c
+from ale.services.chat import Agent
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class SessionNotFoundError(LookupError):
+    """Raised for a session that was never issued or has been evicted."""
+
+
+@dataclass
+class Session:
+    """A conversation of one user with the agent."""
+
+    thread_id: str
+    user_id: str | None = None
+    created: float = field(default_factory=time.monotonic)
+    last_used: float = field(default_factory=time.monotonic)
+    size: int = 0
+    lock: threading.Lock = field(
+        default_factory=threading.Lock, repr=False
+    )
+
+
+class SessionManager:
+    """Run concurrent chat sessions over one `Agent`.
+
+    Turns of a session hold its lock, so a session never runs two turns
+    at once, and a busy session is never evicted. The size of a session
+    is approximated by the text of its conversation after each turn.
+
+    Args:
+        agent (Agent): agent serving every session.
+        max_sessions (int): sessions kept at once.
+        max_bytes (int): total approximate size of the kept sessions.
+        ttl (float): idle seconds before a session expires.
+
+    Example:
+        >>> sessions = SessionManager(Agent())
+        >>> thread_id = sessions.create(user_id="alice")
+        >>> sessions.invoke(thread_id, "What is two times three?")
+    """
+
+    def __init__(
+        self,
+        agent: Agent,
+        max_sessions: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 1800,
+    ):
+        self.agent = agent
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.evicted = 0
+        self._sessions: OrderedDict[str, Session] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def create(self, user_id: str = None) -> str:
+        """Start a session and return its thread id.
+
+        Args:
+            user_id (str): owner of the session, used as the thread id
+                prefix. Default is None, meaning an anonymous session.
+
+        Returns:
+            str
+        """
+        thread_id = uuid.uuid4().hex
+        if user_id:
+            thread_id = f"{user_id}:{thread_id}"
+        with self._lock:
+            self._sessions[thread_id] = Session(thread_id, user_id)
+        self.evict()
+        return thread_id
+
+    def get(self, thread_id: str) -> Session:
+        """Session of `thread_id`, raising `SessionNotFoundError`."""
+        with self._lock:
+            session = self._sessions.get(thread_id)
+        if session is None:
+            raise SessionNotFoundError(f"No session {thread_id!r}")
+        return session
+
+    def close(self, thread_id: str):
+        """End a session and delete its checkpoints."""
+        session = self.get(thread_id)
+        with session.lock:
+            self._drop(session)
+
+    def invoke(self, thread_id: str, query: str) -> dict:
+        """Run a turn of a session, see `Agent.invoke`."""
+        with self._turn(thread_id) as session:
+            state = self.agent.invoke(query, thread_id)
+            self._resize(session, state)
+        return state
+
+    async def ainvoke(self, thread_id: str, query: str) -> dict:
+        """Async counterpart of `invoke`."""
+        async with self._aturn(thread_id) as session:
+            state = await self.agent.ainvoke(query, thread_id)
+            self._resize(session, state)
+        return state
+
+    def stream(self, thread_id: str, query: str):
+        """Run a turn of a session, yielding the reply as it is generated."""
+        with self._turn(thread_id) as session:
+            yield from self.agent.stream(query, thread_id)
+            self._resize(session, self._state(thread_id))
+
+    async def astream(self, thread_id: str, query: str):
+        """Async counterpart of `stream`."""
+        async with self._aturn(thread_id) as session:
+            async for text in self.agent.astream(query, thread_id):
+                yield text
+            self._resize(session, self._state(thread_id))
+
+    def evict(self) -> int:
+        """Drop expired sessions, then idle ones over the limits.
+
+        Returns:
+            int: number of sessions evicted.
+        """
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            over = len(self._sessions) - self.max_sessions
+            excess = self._bytes - self.max_bytes
+            for session in list(self._sessions.values()):
+                expired = now - session.last_used > self.ttl
+                if not (expired or over > 0 or excess > 0):
+                    break
+                if not session.lock.acquire(blocking=False):
+                    continue
+                self._unregister(session)
+                evicted.append(session)
+                over -= 1
+                excess -= session.size
+        for session in evicted:
+            try:
+                self.agent.forget(session.thread_id)
+            finally:
+                session.lock.release()
+        if evicted:
+            self.evicted += len(evicted)
+            _LOGGER.info("Evicted %d chat sessions", len(evicted))
+        return len(evicted)
+
+    def stats(self) -> dict[str, int]:
+        """Kept and evicted sessions and their approximate size."""
+        return {
+            "sessions": len(self._sessions),
+            "bytes": self._bytes,
+            "evicted": self.evicted,
+        }
+
+    @contextmanager
+    def _turn(self, thread_id: str):
+        session = self.get(thread_id)
+        with session.lock:
+            self._touch(session)
+            yield session
+        self.evict()
+
+    @asynccontextmanager
+    async def _aturn(self, thread_id: str):
+        session = self.get(thread_id)
+        if not session.lock.acquire(blocking=False):
+            acquire = asyncio.ensure_future(
+                asyncio.to_thread(session.lock.acquire)
+            )
+            try:
+                await asyncio.shield(acquire)
+            except asyncio.CancelledError:
+                # the worker thread still takes the lock, hand it back
+                acquire.add_done_callback(lambda _: session.lock.release())
+                raise
+        try:
+            self._touch(session)
+            yield session
+        finally:
+            session.lock.release()
+        self.evict()
+
+    def _touch(self, session: Session):
+        with self._lock:
+            if self._sessions.get(session.thread_id) is not session:
+                raise SessionNotFoundError(
+                    f"No session {session.thread_id!r}"
+                )
+            session.last_used = time.monotonic()
+            self._sessions.move_to_end(session.thread_id)
+
+    def _state(self, thread_id: str) -> dict:
+        return self.agent.graph.get_state(
+            {"configurable": {"thread_id": thread_id}}
+        ).values
+
+    def _resize(self, session: Session, state: dict):
+        size = len(get_buffer_string(state.get("messages", [])).encode())
+        size += len((state.get("summary") or "").encode())
+        with self._lock:
+            if self._sessions.get(session.thread_id) is session:
+                self._bytes += size - session.size
+            session.size = size
+
+    def _unregister(self, session: Session):
+        """Forget a session; must be called with the manager lock held."""
+        if self._sessions.get(session.thread_id) is session:
+            del self._sessions[session.thread_id]
+            self._bytes -= session.size
+
+    def _drop(self, session: Session):
+        with self._lock:
+            self._unregister(session)
+        self.agent.forget(session.thread_id)
+
+
+def create_session_manager(agent: Agent = None) -> SessionManager:
+    """Session manager configured from `CHAT_SESSION_*` settings."""
+    return SessionManager(
+        agent or Agent(),
+        max_sessions=c.CHAT_SESSION_MAX,
+        max_bytes=c.CHAT_SESSION_MAX_BYTES,
+        ttl=c.CHAT_SESSION_TTL,
+    )
@@ -1,19 +1,36 @@
 """Base module for services."""
-import os
+import asyncio
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from http import HTTPStatus
 
+import httpx
 import requests
-from requests.adapters import HTTPAdapter
+from langchain_core.tools import tool
 from urllib3 import Retry
 
+from ale.core.config import config as c
+from ale.core.metrics import metrics
+from ale.tools.http import clients
+from ale.tools.resilience import Upstream, upstream
+
 
 class BasicServices:
-    """Basic external service interface."""
+    """Basic external service interface.
+
+    `request` and `arequest` guard calls with the circuit breaker of the
+    upstream, shared by every client of the same host, and fail once
+    `deadline` seconds have passed. Idempotent calls are hedged: when no
+    answer came within the upstream's recent p95 latency, or the first
+    attempt failed, a second one is sent and the first answer wins.
+    """
     def __init__(self, url,
                  max_retry=10,
                  backoff_factor=0.1,
                  method_whitelist=None,
-                 adapter=None):
+                 adapter=None,
+                 deadline=None,
+                 hedge=None):
         self.url = url
         self.max_retry = max_retry
         self.backoff_factor = backoff_factor
@@ -23,6 +40,27 @@ class BasicServices:
             ])
         self.method_whitelist = method_whitelist
         self.adapter = adapter
+        self.deadline = deadline or c.HTTP_DEADLINE
+        self.hedge = c.HTTP_HEDGE_ENABLED if hedge is None else hedge
+
+    @property
+    def upstream(self) -> Upstream:
+        """Breaker and latency window of the host behind `url`."""
+        return upstream(self.url)
+
+    @property
+    def executor(self):
+        """Threads running sync attempts, so they can be hedged and timed.
+
+        Returns:
+            ThreadPoolExecutor
+        """
+        if not hasattr(self, "_executor"):
+            setattr(self, "_executor", ThreadPoolExecutor(
+                max_workers=c.HTTP_POOL_MAXSIZE,
+                thread_name_prefix="ale-http",
+            ))
+        return getattr(self, "_executor")
 
     @property
     def session(self):
@@ -45,12 +83,232 @@ class BasicServices:
             )
             adapter = self.adapter
             if not adapter:
-                adapter = HTTPAdapter(
-                    pool_connections=(os.cpu_count() or 1) * 5,
-                    pool_maxsize=(os.cpu_count() or 1) * 5,
-                    max_retries=retries
-                )
+                adapter = clients.adapter(max_retries=retries)
             session.mount("http://", adapter)
             session.mount("https://", adapter)
             setattr(self, "_session", session)
         return getattr(self, "_session")
+
+    @property
+    def async_session(self):
+        """Pooled keep-alive client for async callers.
+
+        The client is bound to the running event loop and shared with the
+        other services using it.
+
+        Returns:
+            httpx.AsyncClient
+        """
+        return clients.async_client(retries=self.max_retry)
+
+    def _hedged(self, method: str, idempotent: bool = None) -> bool:
+        if idempotent is None:
+            idempotent = method.upper() in self.method_whitelist
+        return self.hedge and idempotent
+
+    def _send(self, method: str, url: str, kwargs: dict):
+        start = time.monotonic()
+        response = self.session.request(method, url, **kwargs)
+        if response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR:
+            self.upstream.latency.observe(time.monotonic() - start)
+        return response
+
+    def request(self, method, path, deadline=None, idempotent=None,
+                **kwargs):
+        """Send a request to `path` under the service URL.
+
+        Args:
+            method (str): HTTP method.
+            path (str): path appended to `url`.
+            deadline (float): seconds to wait for a response, attempts and
+                retries included. Default is None, meaning `self.deadline`.
+            idempotent (bool): whether the call may be sent twice. Default
+                is None, meaning whether `method` is in `method_whitelist`.
+            **kwargs: passed to `requests.Session.request`.
+
+        Returns:
+            requests.Response: the first response that is not a server
+                error, or the last one.
+
+        Raises:
+            CircuitOpenError: the upstream failed too often recently.
+            requests.Timeout: no response came within the deadline.
+        """
+        url = f"{self.url}{path}"
+        state = self.upstream
+        state.breaker.before_call()
+        deadline = deadline or self.deadline
+        kwargs.setdefault("timeout", deadline)
+        start = time.monotonic()
+        expires = start + deadline
+        hedge_at = start + state.latency.hedge_delay()
+        attempts = 2 if self._hedged(method, idempotent) else 1
+        pending, sent, error = set(), 0, None
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= expires:
+                    raise requests.Timeout(
+                        f"No response from {url} within {deadline}s"
+                    )
+                if sent < attempts and (not pending or now >= hedge_at):
+                    if sent:
+                        metrics.increment(
+                            "ale_http_hedges_total",
+                            upstream=state.breaker.name,
+                        )
+                    pending.add(self.executor.submit(
+                        self._send, method, url, kwargs
+                    ))
+                    sent += 1
+                until = hedge_at if sent < attempts else expires
+                done, pending = wait(
+                    pending,
+                    timeout=max(min(until, expires) - now, 0),
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    try:
+                        response = future.result()
+                    except requests.RequestException as exc:
+                        error = exc
+                        continue
+                    failed = (
+                        response.status_code
+                        >= HTTPStatus.INTERNAL_SERVER_ERROR
+                    )
+                    if failed and (pending or sent < attempts):
+                        response.close()
+                        continue
+                    if failed:
+                        state.breaker.record_failure()
+                    else:
+                        state.breaker.record_success()
+                    return response
+                if not pending and sent == attempts:
+                    raise error
+        except requests.RequestException:
+            state.breaker.record_failure()
+            raise
+        finally:
+            for future in pending:
+                if not future.cancel():
+                    future.add_done_callback(_close_response)
+
+    async def _asend(self, method: str, url: str, kwargs: dict):
+        start = time.monotonic()
+        client = self.async_session
+        response = await client.send(
+            client.build_request(method, url, **kwargs), stream=True
+        )
+        if response.status_code < HTTPStatus.INTERNAL_SERVER_ERROR:
+            self.upstream.latency.observe(time.monotonic() - start)
+        return response
+
+    async def arequest(self, method, path, deadline=None, idempotent=None,
+                       **kwargs):
+        """Async counterpart of `request` on the pooled async client.
+
+        The response is streamed; close it with `aclose` once read.
+
+        Args:
+            method (str): HTTP method.
+            path (str): path appended to `url`.
+            deadline (float): seconds to wait for a response, attempts and
+                retries included. Default is None, meaning `self.deadline`.
+            idempotent (bool): whether the call may be sent twice. Default
+                is None, meaning whether `method` is in `method_whitelist`.
+            **kwargs: passed to `httpx.AsyncClient.build_request`.
+
+        Returns:
+            httpx.Response: the first response that is not a server
+                error, or the last one.
+
+        Raises:
+            CircuitOpenError: the upstream failed too often recently.
+            httpx.TimeoutException: no response came within the deadline.
+        """
+        url = f"{self.url}{path}"
+        state = self.upstream
+        state.breaker.before_call()
+        deadline = deadline or self.deadline
+        kwargs.setdefault("timeout", deadline)
+        start = time.monotonic()
+        expires = start + deadline
+        hedge_at = start + state.latency.hedge_delay()
+        attempts = 2 if self._hedged(method, idempotent) else 1
+        pending, sent, error = set(), 0, None
+        try:
+            while True:
+                now = time.monotonic()
+                if now >= expires:
+                    raise httpx.TimeoutException(
+                        f"No response from {url} within {deadline}s"
+                    )
+                if sent < attempts and (not pending or now >= hedge_at):
+                    if sent:
+                        metrics.increment(
+                            "ale_http_hedges_total",
+                            upstream=state.breaker.name,
+                        )
+                    pending.add(asyncio.ensure_future(
+                        self._asend(method, url, kwargs)
+                    ))
+                    sent += 1
+                until = hedge_at if sent < attempts else expires
+                done, pending = await asyncio.wait(
+                    pending,
+                    timeout=max(min(until, expires) - now, 0),
+                    return_when=asyncio.FIRST_COMPLETED,
+                )
+                for task in done:
+                    try:
+                        response = task.result()
+                    except httpx.HTTPError as exc:
+                        error = exc
+                        continue
+                    failed = (
+                        response.status_code
+                        >= HTTPStatus.INTERNAL_SERVER_ERROR
+                    )
+                    if failed and (pending or sent < attempts):
+                        await response.aclose()
+                        continue
+                    if failed:
+                        state.breaker.record_failure()
+                    else:
+                        state.breaker.record_success()
+                    return response
+                if not pending and sent == attempts:
+                    raise error
+        except httpx.HTTPError:
+            state.breaker.record_failure()
+            raise
+        finally:
+            for task in pending:
+                task.cancel()
+                task.add_done_callback(_aclose_response)
+
+    async def aclose(self):
+        """Close the async clients of the running loop.
+
+        Every service on the loop shares them, so this is meant for the end
+        of a run.
+        """
+        await clients.aclose()
+
+
+def _close_response(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def _aclose_response(task):
+    if not task.cancelled() and task.exception() is None:
+        asyncio.ensure_future(task.result().aclose())
+
+
+@tool
+def multiply(a: int, b: int) -> int:
+    """Multiply two integers."""
+    return a * b
@@ -0,0 +1,410 @@
+"""Process-wide HTTP connection pools shared by every service.
+
+Sync callers get a `requests` adapter backed by one shared urllib3
+`PoolManager`, async callers one `httpx.AsyncClient` per event loop, so
+services talking to the same host reuse each other's connections. The
+clients of a loop are closed when it shuts down its async generators, as
+`asyncio.run` does, because they cannot be once the loop is closed. Both
+report the time to acquire a connection, how often an existing one is
+reused and how many are in use or idle, to the `ale.core.metrics`
+registry.
+"""
+import asyncio
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+
+import httpx
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool, PoolManager
+from urllib3.connection import HTTPConnection, HTTPSConnection
+
+from ale.core.config import config as c
+from ale.core.metrics import LATENCY_BUCKETS, metrics
+
+# first trace events of a request once httpcore handed it a connection
+_ACQUIRED_EVENTS = frozenset([
+    "connection.connect_tcp.started",
+    "http11.send_request_headers.started",
+    "http2.send_request_headers.started",
+])
+
+
+@dataclass
+class PoolStats:
+    """Connection pool activity towards one host from one kind of client.
+
+    `in_use` is only tracked for sync pools; async pools report it from
+    the live connections of their transports.
+    """
+
+    client: str
+    host: str
+    checkouts: int = 0
+    opened: int = 0
+    in_use: int = 0
+    wait_seconds: float = 0.0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    @property
+    def reuse_ratio(self) -> float:
+        """Share of checkouts served by an already open connection."""
+        if not self.checkouts:
+            return 0.0
+        return max(self.checkouts - self.opened, 0) / self.checkouts
+
+    def checkout(self, wait: float, opened: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.opened += opened
+            self.in_use += 1
+            self.wait_seconds += wait
+        labels = {"client": self.client, "host": self.host}
+        metrics.observe(
+            "ale_http_pool_wait_seconds", wait, LATENCY_BUCKETS, **labels
+        )
+        metrics.increment("ale_http_pool_checkouts_total", **labels)
+        if opened:
+            metrics.increment("ale_http_pool_opened_total", **labels)
+
+    def opened_connection(self):
+        with self._lock:
+            self.opened += 1
+        metrics.increment(
+            "ale_http_pool_opened_total", client=self.client, host=self.host
+        )
+
+    def release(self):
+        with self._lock:
+            self.in_use = max(self.in_use - 1, 0)
+
+
+class _CountedConnection:
+    """Counts the sockets a urllib3 connection opens, reconnects included."""
+
+    stats: PoolStats = None
+
+    def connect(self):
+        if self.stats is not None:
+            self.stats.opened_connection()
+        super().connect()
+
+
+class _HTTPConnection(_CountedConnection, HTTPConnection):
+    pass
+
+
+class _HTTPSConnection(_CountedConnection, HTTPSConnection):
+    pass
+
+
+class _InstrumentedPool:
+    """Records checkouts, waits and new connections of a urllib3 pool."""
+
+    stats: PoolStats
+
+    def _new_conn(self):
+        conn = super()._new_conn()
+        conn.stats = self.stats
+        return conn
+
+    def _get_conn(self, timeout=None):
+        start = time.monotonic()
+        conn = super()._get_conn(timeout)
+        self.stats.checkout(time.monotonic() - start)
+        return conn
+
+    def _put_conn(self, conn):
+        self.stats.release()
+        super()._put_conn(conn)
+
+    def idle(self) -> int:
+        return sum(conn is not None for conn in list(self.pool.queue))
+
+
+class _HTTPPool(_InstrumentedPool, HTTPConnectionPool):
+    ConnectionCls = _HTTPConnection
+
+
+class _HTTPSPool(_InstrumentedPool, HTTPSConnectionPool):
+    ConnectionCls = _HTTPSConnection
+
+
+class _PoolManager(PoolManager):
+    def __init__(self, registry: "ClientRegistry", **kwargs):
+        super().__init__(**kwargs)
+        self.registry = registry
+        self.pool_classes_by_scheme = {"http": _HTTPPool, "https": _HTTPSPool}
+
+    def _new_pool(self, scheme, host, port, request_context=None):
+        pool = super()._new_pool(scheme, host, port, request_context)
+        pool.stats = self.registry.stats("sync", f"{host}:{port}")
+        self.registry._pools.add(pool)
+        return pool
+
+
+class _SharedPoolAdapter(HTTPAdapter):
+    """`HTTPAdapter` sending through the registry's pools.
+
+    Closing the adapter leaves the shared pools open.
+    """
+
+    def __init__(self, pool_manager: PoolManager, **kwargs):
+        self._shared_pool_manager = pool_manager
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        self.poolmanager = self._shared_pool_manager
+
+    def close(self):
+        for proxy in self.proxy_manager.values():
+            proxy.clear()
+
+
+class _InstrumentedTransport(httpx.AsyncHTTPTransport):
+    """Records checkouts and waits from the httpcore trace events."""
+
+    def __init__(self, registry: "ClientRegistry", **kwargs):
+        super().__init__(**kwargs)
+        self.registry = registry
+
+    async def handle_async_request(self, request):
+        port = request.url.port or _port(request)
+        stats = self.registry.stats("async", f"{request.url.host}:{port}")
+        start = time.monotonic()
+        parent = request.extensions.get("trace")
+        acquired = False
+
+        async def trace(event_name, info):
+            nonlocal acquired
+            if not acquired and event_name in _ACQUIRED_EVENTS:
+                acquired = True
+                stats.checkout(
+                    time.monotonic() - start,
+                    opened=event_name == "connection.connect_tcp.started",
+                )
+                # in-use async connections are read from the pool instead
+                stats.release()
+            if parent is not None:
+                await parent(event_name, info)
+
+        request.extensions["trace"] = trace
+        return await super().handle_async_request(request)
+
+    def connections(self) -> tuple[dict[str, int], dict[str, int]]:
+        """Idle and in-use connections of the transport, per host."""
+        idle, in_use = {}, {}
+        for connection in list(self._pool.connections):
+            if connection.is_closed():
+                continue
+            origin = connection._origin
+            host = f"{origin.host.decode()}:{origin.port}"
+            target = idle if connection.is_idle() else in_use
+            target[host] = target.get(host, 0) + 1
+        return idle, in_use
+
+
+def _close_with_loop(clients: dict):
+    """Close `clients` when the running loop shuts down.
+
+    The loop finalizes the async generators it started before closing, so
+    the generator is started here and closes the clients once finalized.
+    """
+
+    async def closer():
+        try:
+            yield
+        finally:
+            for client in list(clients.values()):
+                await client.aclose()
+
+    generator = closer()
+    asyncio.ensure_future(generator.__anext__())
+    return generator
+
+
+def _port(request) -> int:
+    return 443 if request.url.scheme == "https" else 80
+
+
+class ClientRegistry:
+    """Pooled HTTP clients shared by every service of the process.
+
+    Args:
+        pool_connections (int): hosts to keep a sync pool for.
+        pool_maxsize (int): connections kept open per host by sync pools.
+            Async clients keep `pool_connections * pool_maxsize` in total.
+        pool_block (bool): make sync callers wait for a free connection
+            instead of opening one that is discarded after use.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 10,
+        pool_maxsize: int = 32,
+        pool_block: bool = True,
+    ):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self._stats: dict[tuple[str, str], PoolStats] = {}
+        self._pools: weakref.WeakSet = weakref.WeakSet()
+        self._async_clients: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )
+        self._closers: weakref.WeakKeyDictionary = (
+            weakref.WeakKeyDictionary()
+        )
+        self._lock = threading.Lock()
+        metrics.add_collector(self._collect)
+
+    @property
+    def pool_manager(self) -> PoolManager:
+        """urllib3 pools behind every adapter from `adapter`."""
+        if not hasattr(self, "_pool_manager"):
+            with self._lock:
+                if not hasattr(self, "_pool_manager"):
+                    setattr(self, "_pool_manager", _PoolManager(
+                        self,
+                        num_pools=self.pool_connections,
+                        maxsize=self.pool_maxsize,
+                        block=self.pool_block,
+                    ))
+        return getattr(self, "_pool_manager")
+
+    def adapter(self, max_retries=0) -> HTTPAdapter:
+        """Adapter with its own retry policy over the shared pools.
+
+        Args:
+            max_retries (int | Retry): retry policy of the adapter.
+
+        Returns:
+            HTTPAdapter
+        """
+        return _SharedPoolAdapter(
+            self.pool_manager,
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            pool_block=self.pool_block,
+            max_retries=max_retries,
+        )
+
+    def async_client(self, retries: int = 0) -> httpx.AsyncClient:
+        """Client of the running event loop, shared by its services.
+
+        Args:
+            retries (int): connection retries of the client transport.
+
+        Returns:
+            httpx.AsyncClient
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.get(loop)
+            if clients is None:
+                clients = self._async_clients[loop] = {}
+                self._closers[loop] = _close_with_loop(clients)
+            client = clients.get(retries)
+            if client is None or client.is_closed:
+                pool_size = self.pool_connections * self.pool_maxsize
+                client = clients[retries] = httpx.AsyncClient(
+                    transport=_InstrumentedTransport(
+                        self,
+                        limits=httpx.Limits(
+                            max_connections=pool_size,
+                            max_keepalive_connections=pool_size,
+                        ),
+                        retries=retries,
+                    ),
+                    timeout=None,
+                )
+            return client
+
+    async def aclose(self):
+        """Close the async clients of the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.pop(loop, {})
+            self._closers.pop(loop, None)
+        for client in list(clients.values()):
+            await client.aclose()
+
+    def stats(self, client: str, host: str) -> PoolStats:
+        """Activity of `client` ("sync" or "async") pools towards `host`."""
+        with self._lock:
+            stats = self._stats.get((client, host))
+            if stats is None:
+                stats = self._stats[(client, host)] = PoolStats(client, host)
+            return stats
+
+    def snapshot(self) -> dict[str, dict[str, dict]]:
+        """Current pool activity per kind of client and host.
+
+        Returns:
+            dict: `{client: {host: {...}}}` with the idle and in-use
+                connections, checkouts, opened connections, reuse ratio
+                and mean wait to acquire a connection in seconds.
+        """
+        idle, in_use = self._connections()
+        with self._lock:
+            stats = list(self._stats.values())
+        report = {}
+        for item in stats:
+            key = (item.client, item.host)
+            report.setdefault(item.client, {})[item.host] = {
+                "in_use": in_use.get(key, 0),
+                "idle": idle.get(key, 0),
+                "checkouts": item.checkouts,
+                "opened": item.opened,
+                "reuse_ratio": item.reuse_ratio,
+                "mean_wait_s": (
+                    item.wait_seconds / item.checkouts if item.checkouts
+                    else 0.0
+                ),
+            }
+        return report
+
+    def _connections(self) -> tuple[dict, dict]:
+        idle, in_use = {}, {}
+        for pool in list(self._pools):
+            key = ("sync", f"{pool.host}:{pool.port}")
+            idle[key] = idle.get(key, 0) + pool.idle()
+        with self._lock:
+            for item in self._stats.values():
+                if item.client == "sync":
+                    in_use[(item.client, item.host)] = item.in_use
+            clients = [
+                client
+                for loop_clients in self._async_clients.values()
+                for client in loop_clients.values()
+                if not client.is_closed
+            ]
+        for client in clients:
+            transport_idle, transport_in_use = client._transport.connections()
+            for source, target in (
+                (transport_idle, idle), (transport_in_use, in_use)
+            ):
+                for host, count in source.items():
+                    key = ("async", host)
+                    target[key] = target.get(key, 0) + count
+        return idle, in_use
+
+    def _collect(self):
+        for client, hosts in self.snapshot().items():
+            for host, values in hosts.items():
+                labels = {"client": client, "host": host}
+                for state in ("in_use", "idle"):
+                    yield (
+                        "ale_http_pool_connections",
+                        {**labels, "state": state},
+                        values[state],
+                    )
+                yield (
+                    "ale_http_pool_reuse_ratio", labels, values["reuse_ratio"]
+                )
+
+
+clients = ClientRegistry(
+    c.HTTP_POOL_CONNECTIONS, c.HTTP_POOL_MAXSIZE, c.HTTP_POOL_BLOCK
+)
@@ -0,0 +1,159 @@
+"""Circuit breaking and latency tracking for upstream services."""
+import logging
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from urllib.parse import urlsplit
+
+from ale.core.config import config as c
+from ale.core.metrics import percentile
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Stop calling an upstream after consecutive failures.
+
+    After `failure_threshold` failures in a row the circuit opens and calls
+    are refused for `reset_timeout` seconds. A single trial call is then let
+    through: its success closes the circuit, its failure opens it again.
+
+    Args:
+        name (str): upstream the breaker guards, used in messages.
+        failure_threshold (int): consecutive failures that open the circuit.
+        reset_timeout (float): seconds the circuit stays open.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self, name: str, failure_threshold: int = 5, reset_timeout: float = 30
+    ):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def before_call(self):
+        """Reserve a call, raising `CircuitOpenError` if none is allowed."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            now = time.monotonic()
+            retry_in = self._opened_at + self.reset_timeout - now
+            if retry_in <= 0:
+                # a trial that never reports back frees another slot later
+                self.state = self.HALF_OPEN
+                self._opened_at = now
+                return
+        raise CircuitOpenError(
+            f"Circuit for {self.name} is open, "
+            f"retry in {max(retry_in, 0):.1f}s"
+        )
+
+    def record_success(self):
+        with self._lock:
+            if self.state != self.CLOSED:
+                _LOGGER.info("Closing circuit for %s", self.name)
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if (
+                self.state == self.HALF_OPEN
+                or self.failures >= self.failure_threshold
+            ):
+                if self.state != self.OPEN:
+                    _LOGGER.warning(
+                        "Opening circuit for %s after %d failures",
+                        self.name,
+                        self.failures,
+                    )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+@dataclass
+class LatencyWindow:
+    """Latencies of the latest successful calls to an upstream.
+
+    `hedge_delay` is the `quantile` of the window, floored at `min_delay`,
+    or `initial_delay` until `min_samples` calls have been seen.
+    """
+
+    size: int = 200
+    quantile: float = 0.95
+    min_samples: int = 50
+    min_delay: float = 0.1
+    initial_delay: float = 1.0
+    samples: deque = field(default_factory=deque)
+
+    def __post_init__(self):
+        self.samples = deque(self.samples, maxlen=self.size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float):
+        with self._lock:
+            self.samples.append(seconds)
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait for a call before sending a second one."""
+        with self._lock:
+            if len(self.samples) < self.min_samples:
+                return self.initial_delay
+            values = list(self.samples)
+        return max(percentile(values, self.quantile), self.min_delay)
+
+
+@dataclass
+class Upstream:
+    """Breaker and latency window shared by every client of one upstream."""
+
+    breaker: CircuitBreaker
+    latency: LatencyWindow
+
+
+_upstreams: dict[str, Upstream] = {}
+_upstreams_lock = threading.Lock()
+
+
+def upstream(url: str) -> Upstream:
+    """Shared state of the upstream serving `url`, keyed by scheme and host.
+
+    Args:
+        url (str): any URL of the upstream.
+
+    Returns:
+        Upstream
+    """
+    parts = urlsplit(url)
+    name = f"{parts.scheme}://{parts.netloc}"
+    with _upstreams_lock:
+        state = _upstreams.get(name)
+        if state is None:
+            state = _upstreams[name] = Upstream(
+                breaker=CircuitBreaker(
+                    name,
+                    failure_threshold=c.HTTP_BREAKER_THRESHOLD,
+                    reset_timeout=c.HTTP_BREAKER_RESET_TIMEOUT,
+                ),
+                latency=LatencyWindow(
+                    quantile=c.HTTP_HEDGE_QUANTILE,
+                    min_samples=c.HTTP_HEDGE_MIN_SAMPLES,
+                    min_delay=c.HTTP_HEDGE_MIN_DELAY,
+                    initial_delay=c.HTTP_HEDGE_INITIAL_DELAY,
+                ),
+            )
+        return state
@@ -1,30 +1,66 @@
 """Tools to generate resume and download it in a PDF format."""
 import logging
+from pathlib import Path
 
-from langchain_core.tools import tool
+import httpx
+from langchain_core.tools import StructuredTool
 from requests.exceptions import HTTPError, RequestException
 
 from ale.core.config import config as c
 from ale.models.resume import ResumeData
 from ale.tools import BasicServices
+from ale.tools.storage import ResumeStore, content_key
 
 _LOGGER = logging.getLogger(__name__)
-service = BasicServices(c.RESUME_GENERATOR_URL)
+# Built on first use by `_service` and `_store`; assign them to override.
+service: BasicServices = None
+store: ResumeStore = None
 
 
-@tool
-def tool_generate_resume(data: ResumeData) -> dict[str, str]:
-    """Tool to generate resume and download it in a PDF format.
+def _service() -> BasicServices:
+    global service
+    if service is None:
+        service = BasicServices(c.RESUME_GENERATOR_URL)
+    return service
+
+
+def _store() -> ResumeStore:
+    global store
+    if store is None:
+        store = ResumeStore(
+            root=c.RESUME_STORE_DIR,
+            max_bytes=c.RESUME_STORE_MAX_BYTES,
+            ttl=c.RESUME_STORE_TTL,
+        )
+    return store
+
+
+def render_resume(data: ResumeData, target: ResumeStore = None) -> Path:
+    """Render a resume through the generator into a content-addressed store.
 
     Args:
         data (ResumeData): Content of the resume.
+        target (ResumeStore): store to render into. Default is None,
+            meaning the module `store`.
+
+    Returns:
+        Path: stored PDF, reused without a request if already present.
     """
-    url = f"{service.url}/sylab/api/v1/resume/generate"
+    target = target or _store()
+    key = content_key(data)
+    cached = target.get(key)
+    if cached:
+        _LOGGER.info("Reusing stored resume %s", cached)
+        return cached
+
+    client = _service()
 
     try:
-        response = service.session.post(
-            url, json=data.model_dump(),
+        response = client.request(
+            "POST", "/sylab/api/v1/resume/generate",
+            json=data.model_dump(),
             stream=True,
+            idempotent=c.RESUME_HEDGE_RENDER,
         )
 
         try:
@@ -41,14 +77,106 @@ def tool_generate_resume(data: ResumeData) -> dict[str, str]:
         ) from exc
 
     try:
-        content_disposition = response.headers.get("Content-Disposition")
-        filename = content_disposition.split("filename=")[1] + ".pdf"
-        with open(filename, "wb") as file:
-            file.write(response.content)
+        with response, target.writer(key) as file:
+            for chunk in response.iter_content(
+                chunk_size=c.RESUME_DOWNLOAD_CHUNK_SIZE
+            ):
+                file.write(chunk)
     except Exception as exc:
         _LOGGER.error("Unexpected error while saving resume: %s", exc)
         raise RuntimeError(
             f"Unexpected error while saving resume: {exc}"
         ) from exc
 
-    return {"resume": filename}
+    return target.path(key)
+
+
+async def arender_resume(
+    data: ResumeData, target: ResumeStore = None
+) -> Path:
+    """Async counterpart of `render_resume` on the pooled async client.
+
+    Args:
+        data (ResumeData): Content of the resume.
+        target (ResumeStore): store to render into. Default is None,
+            meaning the module `store`.
+
+    Returns:
+        Path: stored PDF, reused without a request if already present.
+    """
+    target = target or _store()
+    key = content_key(data)
+    cached = target.get(key)
+    if cached:
+        _LOGGER.info("Reusing stored resume %s", cached)
+        return cached
+
+    client = _service()
+
+    try:
+        response = await client.arequest(
+            "POST", "/sylab/api/v1/resume/generate",
+            json=data.model_dump(),
+            idempotent=c.RESUME_HEDGE_RENDER,
+        )
+        try:
+            try:
+                response.raise_for_status()
+            except httpx.HTTPStatusError as http_error:
+                raise HTTPError(
+                    f"Failed to generate resume ({response.status_code}): "
+                    f"{http_error}"
+                ) from http_error
+
+            try:
+                with target.writer(key) as file:
+                    async for chunk in response.aiter_bytes(
+                        chunk_size=c.RESUME_DOWNLOAD_CHUNK_SIZE
+                    ):
+                        file.write(chunk)
+            except httpx.HTTPError:
+                raise
+            except Exception as exc:
+                _LOGGER.error(
+                    "Unexpected error while saving resume: %s", exc
+                )
+                raise RuntimeError(
+                    f"Unexpected error while saving resume: {exc}"
+                ) from exc
+        finally:
+            await response.aclose()
+    except (httpx.HTTPError, HTTPError) as exc:
+        _LOGGER.error("Error generating resume: %s", exc)
+        raise RuntimeError(
+            f"Error making request to resume generator: {exc}"
+        ) from exc
+
+    return target.path(key)
+
+
+def generate_resume(data: ResumeData) -> dict[str, str]:
+    """Tool to generate resume and download it in a PDF format.
+
+    Rendered documents are kept in the content-addressed `store`, so
+    generating the same data again returns the stored file right away.
+
+    Args:
+        data (ResumeData): Content of the resume.
+    """
+    return {"resume": str(render_resume(data))}
+
+
+async def agenerate_resume(data: ResumeData) -> dict[str, str]:
+    """Async counterpart of `generate_resume` on the pooled async client.
+
+    Args:
+        data (ResumeData): Content of the resume.
+    """
+    return {"resume": str(await arender_resume(data))}
+
+
+tool_generate_resume = StructuredTool.from_function(
+    func=generate_resume,
+    coroutine=agenerate_resume,
+    name="tool_generate_resume",
+)
@@ -0,0 +1,115 @@
+"""Content-addressed storage for generated resume documents."""
+import hashlib
+import json
+import logging
+import math
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+
+from pydantic import BaseModel
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def content_key(data: BaseModel) -> str:
+    """Canonical hash of a model's content.
+
+    Two models dumping to the same data share a key regardless of field
+    order, so the key can address any artifact rendered from that data.
+
+    Args:
+        data (BaseModel): model instance to hash.
+
+    Returns:
+        str: hex encoded sha256 digest.
+    """
+    canonical = json.dumps(
+        data.model_dump(mode="json"),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class ResumeStore:
+    """Directory of rendered resumes keyed by `content_key`.
+
+    Entries are written through a temporary file and atomically renamed, so
+    readers never observe a partially downloaded document. An entry's
+    modification time is refreshed on every hit; entries idle for longer
+    than `ttl` seconds are dropped, and the least recently used ones are
+    evicted once the directory grows past `max_bytes`.
+    """
+
+    root: str
+    max_bytes: int
+    ttl: float
+    suffix: str = ".pdf"
+
+    def path(self, key: str) -> Path:
+        """Location of the entry for `key`."""
+        return Path(self.root) / f"{key}{self.suffix}"
+
+    def get(self, key: str) -> Path | None:
+        """Return the stored entry for `key` if it is present and fresh."""
+        path = self.path(key)
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        if time.time() - stat.st_mtime > self.ttl:
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)
+        return path
+
+    @contextmanager
+    def writer(self, key: str):
+        """Open a temporary file that becomes the entry for `key` on exit.
+
+        The temporary file is discarded if the block raises.
+
+        Yields:
+            BinaryIO: file object to stream the content into.
+        """
+        root = Path(self.root)
+        root.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=root, suffix=".part")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                yield file
+            os.replace(tmp_path, self.path(key))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Drop expired entries, then the oldest ones above `max_bytes`."""
+        if self.ttl == math.inf and self.max_bytes == math.inf:
+            return
+        now = time.time()
+        entries = []
+        for path in Path(self.root).glob(f"*{self.suffix}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                path.unlink(missing_ok=True)
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            _LOGGER.info("Evicting stored resume %s", path.name)
+            path.unlink(missing_ok=True)
+            total -= size
@@ -0,0 +1,232 @@
+"""End-to-end ResumeAgent benchmark without Vertex or the generator.
+
+Each fixture resume is given to the agent over a few user turns, with a
+deterministic fake chat model extracting only what the user said so far
+and a local stub server rendering the completed resume. Conversations run
+on separate threads at each concurrency level, and the report holds, per
+level, per-turn latency percentiles, throughput, per-node timings and the
+peak RSS of the process. Save it with `--output` and pass an earlier report as
+`--baseline` to print the relative change of every number.
+
+Run with `python -m benchmarks.bench_agent --output bench.json`.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+from ale.agents.resume import ResumeAgent
+from ale.core.config import config as c
+from ale.core.metrics import metrics, percentile
+from ale.tools import BasicServices
+from ale.tools import resume as resume_tools
+from ale.tools.storage import ResumeStore
+from benchmarks.fakes import FakeChatModel, stub_generator
+
+SAMPLE = Path(__file__).parents[1] / "data" / "resume_sample.json"
+
+
+def load_fixtures(paths: list[str]) -> list[dict]:
+    """Resumes from JSON files holding one resume or a list of them."""
+    fixtures = []
+    for path in paths:
+        document = json.loads(Path(path).read_text())
+        if not isinstance(document, list):
+            document = [document]
+        fixtures.extend(document)
+    return fixtures
+
+
+def conversation(sample: dict, turns: int) -> list[str]:
+    """User turns giving the fields of `sample` in `turns` messages.
+
+    Values are quoted verbatim, so a grounded `FakeChatModel` extracts a
+    field once the turn giving it has been sent.
+    """
+    fields = list(sample.items())
+    size = -(-len(fields) // turns)
+    return [
+        "\n".join(
+            f"My {key}: "
+            + (value if isinstance(value, str) else json.dumps(value))
+            for key, value in fields[start:start + size]
+        )
+        for start in range(0, len(fields), size)
+    ]
+
+
+def _peak_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    unit = 1024 ** 2 if platform.system() == "Darwin" else 1024
+    return round(peak / unit, 1)
+
+
+def _node_timings() -> dict:
+    return {
+        item["labels"]["node"]: {
+            "runs": item["count"],
+            "mean_ms": round(item["sum"] / item["count"] * 1000, 3),
+        }
+        for item in metrics.to_json()["histograms"]
+        if item["name"] == "ale_node_duration_seconds" and item["count"]
+    }
+
+
+async def run_level(
+    fixtures: list[dict], threads: int, conversations: int, args
+) -> dict:
+    """Run `conversations` conversations, `threads` at a time."""
+    model = FakeChatModel(
+        extractions=fixtures,
+        grounded=True,
+        record=False,
+        latency=args.llm_latency,
+    )
+    agent = ResumeAgent(
+        model=model,
+        incremental=args.incremental,
+        pre_extraction=args.pre_extraction,
+    )
+    queue: asyncio.Queue = asyncio.Queue()
+    for number in range(conversations):
+        queue.put_nowait(number)
+    latencies: list[float] = []
+    completed = 0
+
+    async def worker():
+        nonlocal completed
+        while not queue.empty():
+            number = queue.get_nowait()
+            config = {"configurable": {"thread_id": f"bench-{number}"}}
+            sample = fixtures[number % len(fixtures)]
+            state = None
+            for turn in conversation(sample, args.turns):
+                start = time.perf_counter()
+                state = await agent.agent.ainvoke(
+                    {"messages": [{"role": "user", "content": turn}]},
+                    config,
+                )
+                latencies.append(time.perf_counter() - start)
+            completed += not state["missing_fields"]
+
+    metrics.reset()
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(threads)))
+    elapsed = time.perf_counter() - start
+    return {
+        "conversations": conversations,
+        "completed": completed,
+        "turns": len(latencies),
+        "elapsed_s": round(elapsed, 3),
+        "turns_per_s": round(len(latencies) / elapsed, 2),
+        "conversations_per_s": round(conversations / elapsed, 2),
+        "turn_latency_ms": {
+            f"p{int(q * 100)}": round(percentile(latencies, q) * 1000, 3)
+            for q in (0.5, 0.95, 0.99)
+        },
+        "nodes": _node_timings(),
+        "peak_rss_mib": _peak_rss_mib(),
+    }
+
+
+def _revision() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline, path="") -> dict:
+    """Relative change of every number of `report` against `baseline`."""
+    if isinstance(report, dict) and isinstance(baseline, dict):
+        changes = {}
+        for key in sorted(report.keys() & baseline.keys()):
+            changes.update(
+                compare(report[key], baseline[key], f"{path}.{key}")
+            )
+        return changes
+    numeric = all(
+        isinstance(value, (int, float)) and not isinstance(value, bool)
+        for value in (report, baseline)
+    )
+    if numeric and baseline:
+        return {path.lstrip("."): f"{report / baseline - 1:+.1%}"}
+    return {}
+
+
+async def run(args) -> dict:
+    fixtures = load_fixtures(args.fixture or [str(SAMPLE)])
+    c.ENV = "prod"
+    with (
+        stub_generator(delay=args.generator_delay) as server,
+        tempfile.TemporaryDirectory() as store_dir,
+    ):
+        resume_tools.service = BasicServices(server.url)
+        resume_tools.store = ResumeStore(store_dir, 512 * 1024 ** 2, 3600)
+        levels = {
+            str(threads): await run_level(
+                fixtures, threads, max(threads, args.conversations), args
+            )
+            for threads in args.threads
+        }
+        generator_requests = len(server.requests)
+    return {
+        "revision": _revision(),
+        "python": platform.python_version(),
+        "params": {
+            "fixtures": len(fixtures),
+            "turns": args.turns,
+            "llm_latency_s": args.llm_latency,
+            "generator_delay_s": args.generator_delay,
+            "incremental": args.incremental,
+            "pre_extraction": args.pre_extraction,
+        },
+        "generator_requests": generator_requests,
+        "levels": levels,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--fixture", action="append",
+        help="resume JSON file, repeatable (default: data sample)",
+    )
+    parser.add_argument(
+        "--threads", type=int, nargs="+", default=[1, 8, 32],
+        help="concurrent conversation threads per level",
+    )
+    parser.add_argument(
+        "--conversations", type=int, default=64,
+        help="conversations per level, at least the thread count",
+    )
+    parser.add_argument("--turns", type=int, default=4)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    parser.add_argument("--generator-delay", type=float, default=0.0)
+    parser.add_argument("--incremental", action="store_true")
+    parser.add_argument("--pre-extraction", action="store_true")
+    parser.add_argument("--output", help="write the report to this file")
+    parser.add_argument("--baseline", help="earlier report to compare to")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        print(json.dumps(compare(report, baseline), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""Per-turn prompt and schema overhead of ResumeAgent, before and after
+precompiling artifacts.
+
+Run with `python -m benchmarks.bench_artifacts`.
+"""
+import argparse
+import json
+import timeit
+
+from ale.agents.artifacts import AgentArtifacts
+from ale.models.resume import ResumeData
+from ale.tools.utils import get_pydantic_schema
+from benchmarks.fakes import FakeChatModel
+
+SYSTEM_PROMPT = (
+    "A complete resume data must have these schema:\n{resume_schema}\n"
+    "You already have the following data:\n{current_data}"
+)
+
+
+def turn_uncached(model, data: ResumeData):
+    """Per-turn work as done before precompilation."""
+    model.with_structured_output(ResumeData, include_raw=True)
+    SYSTEM_PROMPT.format(
+        current_data=json.dumps(data.model_dump()),
+        resume_schema=get_pydantic_schema(ResumeData),
+    )
+
+
+def turn_precompiled(artifacts: AgentArtifacts, data: ResumeData):
+    """Per-turn work served from `AgentArtifacts`."""
+    artifacts.structured(ResumeData)
+    artifacts.template(
+        SYSTEM_PROMPT, resume_schema=artifacts.schema(ResumeData)
+    ).format(current_data=json.dumps(data.model_dump()))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=2000)
+    args = parser.parse_args()
+
+    model = FakeChatModel()
+    artifacts = AgentArtifacts(model)
+    data = ResumeData(name="John Doe", email="john.doe@example.com")
+
+    results = {}
+    for name, turn in (
+        ("uncached", lambda: turn_uncached(model, data)),
+        ("precompiled", lambda: turn_precompiled(artifacts, data)),
+    ):
+        seconds = min(timeit.repeat(turn, number=args.number, repeat=5))
+        results[name] = seconds / args.number * 1e6
+
+    print(json.dumps({"per_turn_us": results}, indent=2))
+    print(f"speedup: {results['uncached'] / results['precompiled']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
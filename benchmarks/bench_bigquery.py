@@ -0,0 +1,87 @@
+"""Time and peak memory of reading a large BigQuery result.
+
+Rows are served by `FakeBigQueryClient` through the real `RowIterator`
+paging and Arrow conversion, so only the network is left out. Each mode
+runs in its own interpreter so peak RSS is not shared between them:
+
+- `rows`: the former `_query`, a DataFrame built from a list of row dicts.
+- `arrow`: the current `_query`, a DataFrame built from Arrow pages.
+- `stream`: `_iter_batches`, one Arrow page in memory at a time.
+
+Run with `python -m benchmarks.bench_bigquery`.
+"""
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+MODES = ("rows", "arrow", "stream")
+
+
+def run(mode: str, rows: int, page_size: int) -> dict:
+    import pandas as pd
+
+    from ale.repository.bigquery import BigQueryBase
+    from benchmarks.fakes import FakeBigQueryClient
+
+    repository = BigQueryBase(project_id="project", dataset="dataset")
+    setattr(repository, "_client", FakeBigQueryClient(rows))
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    if mode == "rows":
+        result = repository._result("SELECT 1", page_size=page_size)
+        count = len(pd.DataFrame([dict(row) for row in result]))
+    elif mode == "arrow":
+        count = len(repository._query("SELECT 1", page_size=page_size))
+    else:
+        count = sum(
+            batch.num_rows
+            for batch in repository._iter_batches(
+                "SELECT 1", page_size=page_size
+            )
+        )
+    seconds = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {
+        "rows": count,
+        "seconds": round(seconds, 2),
+        "peak_rss_mb": round((peak - baseline) / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--page-size", type=int, default=10_000)
+    parser.add_argument("--mode", choices=MODES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode:
+        print(json.dumps(run(args.mode, args.rows, args.page_size)))
+        return
+
+    report = {}
+    for mode in MODES:
+        result = subprocess.run(
+            [
+                sys.executable, "-W", "ignore", "-m", __spec__.name,
+                "--mode", mode,
+                "--rows", str(args.rows),
+                "--page-size", str(args.page_size),
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=Path(__file__).parents[1],
+        )
+        report[mode] = json.loads(result.stdout)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Memory soak of ResumeAgent checkpointers over thousands of threads.
+
+Drives short conversations on fresh threads and samples traced Python
+memory as threads accumulate, for `MemorySaver` and `BoundedSqliteSaver`.
+
+Run with `python -m benchmarks.bench_checkpointer --threads 5000`.
+"""
+import argparse
+import gc
+import json
+import sqlite3
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from ale.agents.resume import ResumeAgent
+from ale.core.checkpoint import BoundedSqliteSaver
+from ale.core.config import config as c
+from benchmarks.fakes import FakeChatModel
+
+
+def soak(checkpointer, threads: int, turns: int, samples: int) -> list:
+    agent = ResumeAgent(
+        model=FakeChatModel(extractions=[{"name": "Alice"}], record=False),
+        checkpointer=checkpointer,
+    )
+    series = []
+    tracemalloc.start()
+    for index in range(threads):
+        config = {"configurable": {"thread_id": f"thread-{index}"}}
+        for turn in range(turns):
+            agent.agent.invoke(
+                {"messages": [{"role": "user", "content": f"turn {turn}"}]},
+                config,
+            )
+        if (index + 1) % max(1, threads // samples) == 0:
+            if isinstance(checkpointer, BoundedSqliteSaver):
+                checkpointer.compact()
+            gc.collect()
+            current, _ = tracemalloc.get_traced_memory()
+            series.append({"threads": index + 1, "mib": current / 2**20})
+    tracemalloc.stop()
+    return series
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=1000)
+    parser.add_argument("--turns", type=int, default=2)
+    parser.add_argument("--samples", type=int, default=5)
+    args = parser.parse_args()
+    c.ENV = "prod"
+
+    with tempfile.TemporaryDirectory() as tmp:
+        saver = BoundedSqliteSaver(
+            sqlite3.connect(
+                str(Path(tmp) / "checkpoints.sqlite"),
+                check_same_thread=False,
+            ),
+            keep_last=2,
+            ttl=0,
+        )
+        report = {
+            "memory_saver": soak(
+                MemorySaver(), args.threads, args.turns, args.samples
+            ),
+            "bounded_sqlite": soak(
+                saver, args.threads, args.turns, args.samples
+            ),
+        }
+        saver.close()
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
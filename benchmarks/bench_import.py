@@ -0,0 +1,96 @@
+"""Import time of the package entry points, from `python -X importtime`.
+
+Each module is imported in a fresh interpreter a few times and the best
+cumulative time is kept, along with the slowest dependencies it pulls in.
+With `--budget-ms`, exits non-zero when a module takes longer, so it can
+guard cold start in CI.
+
+Run with `python -m benchmarks.bench_import`.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+MODULES = (
+    "ale.agents",
+    "ale.tools.resume",
+    "ale.services.chat",
+    "ale.repository.bigquery",
+)
+
+
+def import_times(module: str) -> dict[str, int]:
+    """Cumulative import time in microseconds of every module loaded."""
+    env = {**os.environ, "PYTHONWARNINGS": "ignore"}
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parents[1],
+        env=env,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if cumulative.strip().isdigit():
+            times[name.strip()] = int(cumulative)
+    return times
+
+
+def measure(module: str, repeat: int, top: int) -> dict:
+    runs = [import_times(module) for _ in range(repeat)]
+    best = min(runs, key=lambda times: times[module])
+    slowest = sorted(
+        (
+            (name, micros)
+            for name, micros in best.items()
+            if name != module
+            and "." not in name
+            and name not in ("site", "encodings")
+        ),
+        key=lambda item: item[1],
+        reverse=True,
+    )[:top]
+    return {
+        "ms": round(best[module] / 1000, 1),
+        "modules_loaded": len(best),
+        "slowest_ms": {name: round(us / 1000, 1) for name, us in slowest},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("modules", nargs="*", default=list(MODULES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float)
+    parser.add_argument("--output", help="write the report to this file")
+    args = parser.parse_args()
+
+    report = {
+        module: measure(module, args.repeat, args.top)
+        for module in args.modules
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+    if args.budget_ms is not None:
+        over = [
+            module
+            for module, result in report.items()
+            if result["ms"] > args.budget_ms
+        ]
+        if over:
+            sys.exit(f"over the {args.budget_ms}ms budget: {over}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Non-LLM CPU time per turn spent folding an extraction into ResumeData.
+
+Compares the dump/re-validate/json.dumps round trip ResumeAgent used to do
+with the in-place `apply` and cached `to_json`, for a resume with long
+experience, certification and skill sections.
+
+Run with `python -m benchmarks.bench_merge`.
+"""
+import argparse
+import json
+import timeit
+
+from ale.models.resume import ResumeData, partial_resume_model
+
+FOUND = {"email": "alice@example.com"}
+
+
+def large_resume(entries: int) -> ResumeData:
+    return ResumeData(
+        name="Alice",
+        summary="Engineer. " * 50,
+        experience=[
+            {
+                "title": f"Engineer {index}",
+                "company": f"Company {index}",
+                "date": "2020 - 2021",
+                "description": [f"Shipped project {n}" for n in range(8)],
+            }
+            for index in range(entries)
+        ],
+        certifications=[
+            {"name": f"Cert {index}", "organization": "Org", "date": "2022"}
+            for index in range(entries)
+        ],
+        skills={
+            f"category {index}": [f"skill {n}" for n in range(10)]
+            for index in range(entries // 4)
+        },
+    )
+
+
+def full_before(parsed: ResumeData) -> str:
+    resume_data = parsed.model_dump()
+    resume_data.update(FOUND)
+    data = ResumeData(**resume_data)
+    return json.dumps(data.model_dump())
+
+
+def full_after(parsed: ResumeData) -> str:
+    data = parsed.model_copy()
+    data.apply(FOUND)
+    return data.to_json()
+
+
+def delta_before(data: ResumeData, patch) -> str:
+    found = partial_resume_model(list(FOUND))(**FOUND)
+    data = data.merge(found).merge(patch)
+    data.missing_fields()
+    data.missing_fields()
+    return json.dumps(data.model_dump())
+
+
+def delta_after(data: ResumeData, patch) -> str:
+    data = data.model_copy()
+    data.apply(FOUND)
+    data.apply(patch)
+    data.missing_fields()
+    data.missing_fields()
+    return data.to_json()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    data = large_resume(args.entries)
+    patch = partial_resume_model(["phone", "skills"])(
+        phone="+62 812 3456 7890", skills={"new": ["rust"]}
+    )
+    cases = {
+        "full": (lambda: full_before(data), lambda: full_after(data)),
+        "incremental": (
+            lambda: delta_before(data, patch),
+            lambda: delta_after(data, patch),
+        ),
+    }
+    report = {}
+    for name, (before, after) in cases.items():
+        timings = {
+            label: min(timeit.repeat(turn, number=args.number, repeat=5))
+            / args.number * 1e6
+            for label, turn in (("before", before), ("after", after))
+        }
+        timings["speedup"] = timings["before"] / timings["after"]
+        report[name] = {key: round(value, 1) for key, value in timings.items()}
+
+    print(json.dumps({"per_turn_us": report}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
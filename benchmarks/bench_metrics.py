@@ -0,0 +1,51 @@
+"""Per-turn overhead of graph node instrumentation on ResumeAgent.
+
+Runs the same turns through an agent with and without `GraphMetrics`,
+using a fake model so the graph itself dominates the turn time.
+
+Run with `python -m benchmarks.bench_metrics`.
+"""
+import argparse
+import json
+import timeit
+
+from ale.agents.resume import ResumeAgent
+from ale.core import metrics as node_metrics
+from benchmarks.fakes import FakeChatModel
+
+
+def agent(instrumented: bool):
+    node_metrics.c.METRICS_ENABLED = instrumented
+    try:
+        return ResumeAgent(model=FakeChatModel(record=False))
+    finally:
+        node_metrics.c.METRICS_ENABLED = True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    query = {"messages": [{"role": "user", "content": "Hi, I'm John"}]}
+    graphs = {"plain": agent(False).agent, "instrumented": agent(True).agent}
+    results = dict.fromkeys(graphs, float("inf"))
+    # Alternate the variants so machine noise affects both alike.
+    for _ in range(args.repeat):
+        for name, graph in graphs.items():
+            seconds = timeit.timeit(
+                lambda: graph.invoke(query), number=args.number
+            )
+            results[name] = min(results[name], seconds / args.number * 1e6)
+
+    overhead = results["instrumented"] - results["plain"]
+    print(json.dumps({"per_turn_us": results}, indent=2))
+    print(
+        f"overhead: {overhead:.0f}us per turn "
+        f"({overhead / results['plain']:.1%} of a fake-model turn)"
+    )
+
+
+if __name__ == "__main__":
+    main()
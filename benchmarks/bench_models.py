@@ -0,0 +1,80 @@
+"""Cold and warm `create_dynamic_model` cost for a resume-sized schema.
+
+Cold builds go through an empty `ModelRegistry` every time, the way every
+call compiled the schema before the registry existed. Warm builds hit the
+shared registry, paying only for the schema hash.
+
+Run with `python -m benchmarks.bench_models`.
+"""
+import argparse
+import json
+import timeit
+
+from ale.models.utils import ModelRegistry, create_dynamic_model
+
+
+def _text(description: str) -> dict:
+    return {"type": "string", "description": description}
+
+
+def _items(description: str, properties: dict) -> dict:
+    return {
+        "type": "array",
+        "description": description,
+        "items": {"type": "object", "properties": properties},
+    }
+
+
+SCHEMA = {
+    "name": _text("Name of the resource"),
+    "title": _text("Title of the resource"),
+    "email": _text("Email address"),
+    "phone": _text("Phone number"),
+    "summary": _text("Executive summary"),
+    "address": {
+        "type": "object",
+        "description": "Home address",
+        "properties": {"city": _text("City"), "country": _text("Country")},
+    },
+    "experience": _items("Job experience", {
+        "title": _text("Job title"),
+        "company": _text("Company name"),
+        "date": _text("Date of employment"),
+        "description": {
+            "type": "array",
+            "description": "Responsibilities",
+            "items": {"type": "string"},
+        },
+    }),
+    "education": _items("Education", {
+        "degree": _text("Degree"),
+        "institution": _text("Institution"),
+        "year": _text("Year of graduation"),
+    }),
+    "certifications": _items("Certifications", {
+        "name": _text("Certification"),
+        "organization": _text("Provider"),
+        "date": _text("Date"),
+    }),
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+
+    results = {}
+    for name, build in (
+        ("cold", lambda: ModelRegistry().get("Resume", SCHEMA)),
+        ("warm", lambda: create_dynamic_model("Resume", SCHEMA)),
+    ):
+        seconds = min(timeit.repeat(build, number=args.number, repeat=5))
+        results[name] = seconds / args.number * 1e6
+
+    print(json.dumps({"per_call_us": results}, indent=2))
+    print(f"speedup: {results['cold'] / results['warm']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
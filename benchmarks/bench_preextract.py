@@ -0,0 +1,83 @@
+"""LLM extraction calls and tokens saved by rule-based pre-extraction.
+
+Replays a scripted conversation built from `data/resume_sample.json`
+against ResumeAgent with and without `pre_extraction`, counting the
+structured extraction calls and their approximate prompt tokens (messages
+plus tool schema).
+
+Run with `python -m benchmarks.bench_preextract`.
+"""
+import argparse
+import json
+from pathlib import Path
+
+from langchain_core.messages.utils import count_tokens_approximately
+
+from ale.agents.resume import ResumeAgent
+from ale.core.config import config as c
+from benchmarks.fakes import FakeChatModel
+
+SAMPLE = Path(__file__).parents[1] / "data" / "resume_sample.json"
+
+
+def conversation(sample: dict) -> list[str]:
+    """User turns giving the sample resume piece by piece."""
+    return [
+        f"Hi, I'm {sample['name']}, a {sample['title']}.",
+        f"My email is {sample['email']}",
+        f"Phone number: {sample['phone']}",
+        f"{sample['linkedin']} and {sample['github']}",
+        f"My website is {sample['website']}",
+        sample["summary"],
+        "Experience: " + json.dumps(sample["experience"]),
+    ]
+
+
+def run(sample: dict, incremental: bool, pre_extraction: bool) -> dict:
+    model = FakeChatModel(extractions=[sample], grounded=True)
+    agent = ResumeAgent(
+        model=model, incremental=incremental, pre_extraction=pre_extraction
+    )
+    config = {"configurable": {"thread_id": "bench"}}
+    for turn in conversation(sample):
+        agent.agent.invoke(
+            {"messages": [{"role": "user", "content": turn}]}, config
+        )
+
+    tokens = 0
+    calls = 0
+    for prompt, tools in zip(model.prompts, model.schemas):
+        if tools:
+            calls += 1
+            tokens += count_tokens_approximately(prompt)
+            tokens += len(json.dumps(tools)) // 4
+    return {"extraction_calls": calls, "extraction_tokens": tokens}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sample", default=str(SAMPLE))
+    args = parser.parse_args()
+    sample = json.loads(Path(args.sample).read_text())
+    c.ENV = "prod"
+
+    report = {}
+    for incremental in (False, True):
+        mode = "incremental" if incremental else "full"
+        baseline = run(sample, incremental, pre_extraction=False)
+        pre = run(sample, incremental, pre_extraction=True)
+        report[mode] = {
+            "baseline": baseline,
+            "pre_extraction": pre,
+            "calls_saved": (
+                baseline["extraction_calls"] - pre["extraction_calls"]
+            ),
+            "tokens_saved": (
+                baseline["extraction_tokens"] - pre["extraction_tokens"]
+            ),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Wall time of per-section extraction against one whole-schema call.
+
+A fake chat model extracts the sample resume from a pasted CV, taking
+`--latency` seconds per call plus `--per-token` for every word of the
+arguments it generates, so a call's duration grows with its output like a
+real model's does. Each run extracts the CV once with the single-call
+path and once with `section_extraction`, sync and async. The report
+holds latency percentiles of each path, the speedup of sections at the
+median and the number of model calls per extraction.
+
+Run with `python -m benchmarks.bench_sections`.
+"""
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from langchain_core.messages import HumanMessage
+
+from ale.agents.resume import ResumeAgent
+from ale.core.metrics import percentile
+from benchmarks.fakes import FakeChatModel
+
+SAMPLE = json.loads(
+    (Path(__file__).parents[1] / "data" / "resume_sample.json").read_text()
+)
+
+
+def _summary(values: list[float]) -> dict:
+    return {
+        f"p{int(q * 100)}_ms": round(percentile(values, q) * 1000, 1)
+        for q in (0.5, 0.95)
+    }
+
+
+def _agent(args, sections: bool) -> ResumeAgent:
+    model = FakeChatModel(
+        extractions=[SAMPLE],
+        latency=args.latency,
+        token_latency=args.per_token,
+        record=False,
+    )
+    return ResumeAgent(
+        model=model, section_extraction=sections, section_min_tokens=0
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.2)
+    parser.add_argument("--per-token", type=float, default=0.002)
+    args = parser.parse_args()
+
+    state = {
+        "messages": [
+            HumanMessage(content=json.dumps(SAMPLE, indent=2), id="cv")
+        ]
+    }
+    report = {}
+    for mode in ("sync", "async"):
+        for sections in (False, True):
+            agent = _agent(args, sections)
+            timings = []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                if mode == "sync":
+                    agent.extract_content(state)
+                else:
+                    asyncio.run(agent.aextract_content(state))
+                timings.append(time.perf_counter() - start)
+            name = f"{mode}_{'sections' if sections else 'single'}"
+            report[name] = {
+                **_summary(timings),
+                "calls": agent.model.calls // args.runs,
+            }
+        report[f"{mode}_speedup"] = round(
+            report[f"{mode}_single"]["p50_ms"]
+            / report[f"{mode}_sections"]["p50_ms"],
+            2,
+        )
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Memory of the chat agent across many short sessions.
+
+Each session is created through a `SessionManager`, runs `--turns` turns
+against a fake chat model, and is then left idle, the way abandoned
+browser tabs are. Traced Python memory is sampled every `--every`
+sessions with the manager limited to `--max-sessions` sessions, and with
+`--compare` once more with eviction off. With eviction, memory stays flat
+once the limit is reached; without it, it grows with every session.
+
+Run with `python -m benchmarks.bench_sessions`.
+"""
+import argparse
+import gc
+import json
+import math
+import time
+import tracemalloc
+from unittest import mock
+
+from ale.services.chat import Agent
+from ale.services.sessions import SessionManager
+from benchmarks.fakes import FakeChatModel
+
+MIB = 1024 * 1024
+
+
+def _agent() -> Agent:
+    with mock.patch(
+        "ale.services.chat.init_chat_model", lambda name: FakeChatModel()
+    ):
+        agent = Agent()
+    agent.llm = FakeChatModel(replies=["Noted, anything else?"], record=False)
+    return agent
+
+
+def _run(args, max_sessions: float) -> dict:
+    sessions = SessionManager(
+        _agent(), max_sessions=max_sessions, max_bytes=math.inf
+    )
+    samples = []
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    for index in range(1, args.sessions + 1):
+        thread_id = sessions.create(f"user{index}")
+        for turn in range(args.turns):
+            sessions.invoke(thread_id, f"Message {turn} of session {index}")
+        if index % args.every == 0:
+            gc.collect()
+            samples.append(
+                round(tracemalloc.get_traced_memory()[0] / MIB, 2)
+            )
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+    return {
+        "memory_mib": samples,
+        "growth_mib": round(samples[-1] - samples[0], 2),
+        "sessions_kept": len(sessions),
+        "checkpointed_threads": len(sessions.agent.memory.storage),
+        "sessions_per_s": round(args.sessions / elapsed, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=10_000)
+    parser.add_argument("--turns", type=int, default=2)
+    parser.add_argument("--max-sessions", type=int, default=256)
+    parser.add_argument("--every", type=int, default=1000)
+    parser.add_argument("--compare", action="store_true")
+    args = parser.parse_args()
+
+    report = {
+        "sessions": args.sessions,
+        "evicting": _run(args, args.max_sessions),
+    }
+    if args.compare:
+        report["unbounded"] = _run(args, math.inf)
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
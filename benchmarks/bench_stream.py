@@ -0,0 +1,83 @@
+"""Time to first token of streamed replies against full-response latency.
+
+A fake chat model answers every turn with the same follow-up question,
+taking `--first-token` seconds before its first word and `--per-token`
+for every further one; the extraction call ahead of it takes
+`--first-token` too. Each turn runs once through `invoke`, where the
+user sees nothing until the whole reply is generated, and once through
+`stream_reply`. The report holds latency percentiles of both, the time to
+first token of the streamed run, and the time the streamed run takes
+over `invoke` to finish.
+
+Run with `python -m benchmarks.bench_stream`.
+"""
+import argparse
+import json
+import time
+
+from ale.agents.resume import ResumeAgent
+from ale.core.metrics import percentile
+from benchmarks.fakes import FakeChatModel
+
+REPLY = (
+    "Thanks, I have your name and email. To complete your resume I still "
+    "need your phone number, a short professional summary, your work "
+    "experience with titles, companies and dates, your education, and "
+    "any certifications or skills you would like to highlight. Could you "
+    "start with your most recent role?"
+)
+
+
+def _query(turn: int) -> dict:
+    return {"messages": [{"role": "user", "content": f"Turn {turn}"}]}
+
+
+def _summary(values: list[float]) -> dict:
+    return {
+        f"p{int(q * 100)}_ms": round(percentile(values, q) * 1000, 1)
+        for q in (0.5, 0.95)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--first-token", type=float, default=0.3)
+    parser.add_argument("--per-token", type=float, default=0.02)
+    args = parser.parse_args()
+
+    agent = ResumeAgent(
+        model=FakeChatModel(
+            replies=[REPLY],
+            latency=args.first_token,
+            token_latency=args.per_token,
+            record=False,
+        )
+    )
+    full, first, streamed = [], [], []
+    for turn in range(args.turns):
+        start = time.perf_counter()
+        agent.agent.invoke(_query(turn))
+        full.append(time.perf_counter() - start)
+
+        start, arrival = time.perf_counter(), None
+        for _ in agent.stream_reply(_query(turn)):
+            if arrival is None:
+                arrival = time.perf_counter() - start
+        first.append(arrival)
+        streamed.append(time.perf_counter() - start)
+
+    report = {
+        "tokens": len(REPLY.split()),
+        "invoke": _summary(full),
+        "stream_first_token": _summary(first),
+        "stream_complete": _summary(streamed),
+        "stream_overhead_ms": round(
+            (percentile(streamed, 0.5) - percentile(full, 0.5)) * 1000, 1
+        ),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,13 @@
+"""Offline fakes for the benchmarks.
+
+They are the fakes of the unit tests, imported from here so the
+benchmarks depend on this one module rather than on the test package
+layout.
+"""
+from tests.fakes import FakeBigQueryClient, FakeChatModel, stub_generator
+
+__all__ = [
+    "FakeBigQueryClient",
+    "FakeChatModel",
+    "stub_generator",
+]
@@ -0,0 +1,309 @@
+"""Deterministic stand-ins for Vertex, BigQuery and the resume generator."""
+import asyncio
+import itertools
+import json
+import re
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.outputs import (
+    ChatGeneration,
+    ChatGenerationChunk,
+    ChatResult,
+)
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import PrivateAttr
+
+PDF_BYTES = b"%PDF-1.4\n% fake resume\n%%EOF\n"
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model replaying scripted replies and structured extractions.
+
+    Plain calls cycle through `replies`. Calls with bound tools (i.e.
+    `with_structured_output`) answer with a tool call whose arguments are
+    the next entry of `extractions`, narrowed to the bound schema fields.
+    With `grounded`, only values quoted verbatim in the prompt are kept,
+    mimicking an extractor that reads the conversation. Prompts and bound
+    schemas are kept in `prompts` and `schemas` unless `record` is off.
+
+    Plain replies can be streamed word by word: `latency` is then the time
+    to the first token, and every further token takes `token_latency`.
+    Unstreamed calls take the sum of both, counting the words of tool
+    call arguments as tokens too.
+    """
+
+    replies: list[str] = ["Could you tell me more about yourself?"]
+    extractions: list[dict[str, Any]] = [{}]
+    latency: float = 0.0
+    token_latency: float = 0.0
+    disable_streaming: bool | str = "tool_calling"
+    grounded: bool = False
+    record: bool = True
+    calls: int = 0
+    prompts: list[list[Any]] = []
+    schemas: list[list[dict] | None] = []
+
+    _replies: Any = PrivateAttr(default=None)
+    _extractions: Any = PrivateAttr(default=None)
+    _lock: Any = PrivateAttr(default_factory=threading.Lock)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat-model"
+
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(
+            tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs
+        )
+
+    def _next_message(self, messages, tools: list[dict] | None):
+        with self._lock:
+            self.calls += 1
+            if self.record:
+                self.prompts.append(list(messages))
+                self.schemas.append(tools)
+            if self._replies is None:
+                self._replies = itertools.cycle(self.replies)
+                self._extractions = itertools.cycle(self.extractions)
+            if not tools:
+                return AIMessage(content=next(self._replies))
+            function = tools[0]["function"]
+            fields = function["parameters"].get("properties", {})
+            args = {
+                key: value
+                for key, value in next(self._extractions).items()
+                if key in fields
+            }
+            if self.grounded:
+                text = "\n".join(str(m.content) for m in messages)
+                args = {
+                    key: value
+                    for key, value in args.items()
+                    if (value if isinstance(value, str)
+                        else json.dumps(value)) in text
+                }
+        return AIMessage(
+            content="",
+            tool_calls=[
+                {"name": function["name"], "args": args, "id": "call-0"}
+            ],
+        )
+
+    def _result(self, messages, tools) -> ChatResult:
+        message = self._next_message(messages, tools)
+        input_tokens = count_tokens_approximately(messages)
+        output_tokens = count_tokens_approximately([message])
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, messages) -> list[ChatGenerationChunk]:
+        message = self._result(messages, None).generations[0].message
+        words = re.findall(r"\s*\S+", message.content) or [""]
+        return [
+            ChatGenerationChunk(
+                message=AIMessageChunk(
+                    content=word,
+                    usage_metadata=(
+                        message.usage_metadata
+                        if index == len(words) - 1
+                        else None
+                    ),
+                )
+            )
+            for index, word in enumerate(words)
+        ]
+
+    def _duration(self, result: ChatResult) -> float:
+        message = result.generations[0].message
+        content = message.content or "".join(
+            json.dumps(call["args"]) for call in message.tool_calls
+        )
+        tokens = len(re.findall(r"\S+", content)) if content else 0
+        return self.latency + self.token_latency * max(tokens - 1, 0)
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        result = self._result(messages, kwargs.get("tools"))
+        if self._duration(result):
+            time.sleep(self._duration(result))
+        return result
+
+    async def _agenerate(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ):
+        result = self._result(messages, kwargs.get("tools"))
+        if self._duration(result):
+            await asyncio.sleep(self._duration(result))
+        return result
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        for index, chunk in enumerate(self._chunks(messages)):
+            delay = self.token_latency if index else self.latency
+            if delay:
+                time.sleep(delay)
+            yield chunk
+
+    async def _astream(
+        self, messages, stop=None, run_manager=None, **kwargs
+    ):
+        for index, chunk in enumerate(self._chunks(messages)):
+            delay = self.token_latency if index else self.latency
+            if delay:
+                await asyncio.sleep(delay)
+            yield chunk
+
+
+class _GeneratorHandler(BaseHTTPRequestHandler):
+    server: "StubGenerator"
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):  # noqa: N802
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        self.server.requests.append(payload)
+        fault = self.server.next_fault()
+        if fault == "drop":
+            self.close_connection = True
+            return
+        if isinstance(fault, int):
+            self.send_response(fault)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if isinstance(fault, float):
+            time.sleep(fault)
+        if self.server.delay:
+            time.sleep(self.server.delay)
+        name = (payload.get("name") or "resume").replace(" ", "_")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header(
+            "Content-Disposition", f"attachment; filename={name}"
+        )
+        self.send_header("Content-Length", str(len(PDF_BYTES)))
+        self.end_headers()
+        self.wfile.write(PDF_BYTES)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubGenerator(ThreadingHTTPServer):
+    """Local HTTP server standing in for `RESUME_GENERATOR_URL`.
+
+    Each request first takes the next entry of `faults`, if any: a status
+    code is answered with an empty response, a float is slept before
+    answering, and "drop" closes the connection without a response.
+    """
+
+    daemon_threads = True
+    # Concurrent clients overflow the default backlog of 5, and dropped
+    # connections are only retried by the kernel after a second.
+    request_queue_size = 128
+
+    def __init__(self, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _GeneratorHandler)
+        self.delay = delay
+        self.requests: list[dict] = []
+        self.faults: deque = deque()
+        self._faults_lock = threading.Lock()
+
+    def handle_error(self, request, client_address):
+        # hedged and timed out calls hang up before the response is sent
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+    def next_fault(self):
+        with self._faults_lock:
+            return self.faults.popleft() if self.faults else None
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+@contextmanager
+def stub_generator(delay: float = 0.0):
+    """Run a `StubGenerator` in a background thread."""
+    server = StubGenerator(delay=delay)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class _FakeQueryJob:
+    def __init__(self, client: "FakeBigQueryClient", job_config):
+        self.client = client
+        self.job_config = job_config
+        self.total_bytes_processed = client.rows * client.bytes_per_row
+
+    def result(self, page_size=None, **kwargs):
+        from google.cloud.bigquery.table import RowIterator
+
+        return RowIterator(
+            client=None,
+            api_request=self.client.api_request,
+            path="/fake/queries/results",
+            schema=self.client.schema,
+            page_size=page_size,
+        )
+
+
+class FakeBigQueryClient:
+    """BigQuery client serving generated rows over the REST paging protocol.
+
+    `query` returns a job whose `result` is a real `RowIterator` reading
+    pages from `api_request`, so the library's own paging and Arrow
+    conversion run against it. Rows are only generated when their page is
+    requested; `pages_served` counts the requests.
+    """
+
+    def __init__(self, rows: int, bytes_per_row: int = 64):
+        from google.cloud.bigquery import SchemaField
+
+        self.rows = rows
+        self.bytes_per_row = bytes_per_row
+        self.schema = [
+            SchemaField("id", "INTEGER"),
+            SchemaField("name", "STRING"),
+            SchemaField("score", "FLOAT"),
+        ]
+        self.queries: list[tuple] = []
+        self.pages_served = 0
+
+    def query(self, query, job_config=None):
+        self.queries.append((query, job_config))
+        return _FakeQueryJob(self, job_config)
+
+    def api_request(self, method, path, query_params=None, **kwargs):
+        query_params = query_params or {}
+        start = int(query_params.get("pageToken") or 0)
+        end = min(self.rows, start + (query_params.get("maxResults") or 100))
+        self.pages_served += 1
+        response = {
+            "totalRows": str(self.rows),
+            "rows": [
+                {"f": [{"v": str(i)}, {"v": f"user {i}"}, {"v": str(i / 2)}]}
+                for i in range(start, end)
+            ],
+        }
+        if end < self.rows:
+            response["pageToken"] = str(end)
+        return response
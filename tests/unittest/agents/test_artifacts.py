@@ -0,0 +1,44 @@
+import gc
+
+from pydantic import BaseModel
+
+from ale.agents.artifacts import AgentArtifacts
+from ale.models.resume import ResumeData
+from ale.tools.utils import get_pydantic_schema
+from tests.fakes import FakeChatModel
+
+
+def test_artifacts_are_memoized():
+    "Runnables, schemas and templates are built once per key."
+    artifacts = AgentArtifacts(FakeChatModel())
+
+    assert artifacts.structured(ResumeData) is artifacts.structured(
+        ResumeData
+    )
+    assert artifacts.schema(ResumeData, ["name", "email"]) == (
+        get_pydantic_schema(ResumeData, ["email", "name"])
+    )
+    assert artifacts.schema(ResumeData) != artifacts.schema(
+        ResumeData, ["name"]
+    )
+    template = artifacts.template("{a} {b}", a="x")
+    assert template is artifacts.template("{a} {b}", a="x")
+    assert template.format(b="y") == "x y"
+
+
+def test_artifacts_invalidation():
+    "Swapping the model or dropping a class discards its entries."
+    artifacts = AgentArtifacts(FakeChatModel())
+    runnable = artifacts.structured(ResumeData)
+
+    artifacts.model = FakeChatModel()
+    assert artifacts.structured(ResumeData) is not runnable
+
+    class Temporary(BaseModel):
+        value: str
+
+    artifacts.schema(Temporary)
+    assert len(artifacts._schemas) == 1
+    del Temporary
+    gc.collect()
+    assert len(artifacts._schemas) == 0
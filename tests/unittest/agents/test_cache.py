@@ -0,0 +1,45 @@
+from langchain_core.messages import HumanMessage
+
+from ale.agents.cache import TieredLLMCache
+from ale.models.resume import ResumeData
+from tests.fakes import FakeChatModel
+
+
+def test_replayed_prompts_hit_cache(tmp_path):
+    "Identical prompts differing only in message ids are served cached."
+    cache = TieredLLMCache(str(tmp_path / "cache.sqlite"), max_entries=8)
+    model = FakeChatModel(
+        replies=["first", "second"],
+        extractions=[{"name": "Alice"}],
+        cache=cache,
+    )
+
+    first = model.invoke([HumanMessage(content="hi", id="a")])
+    replay = model.invoke([HumanMessage(content="hi", id="b")])
+    other = model.invoke([HumanMessage(content="hello")])
+    structured = model.with_structured_output(ResumeData)
+    assert structured.invoke("I'm Alice") == structured.invoke("I'm Alice")
+
+    assert first.content == replay.content == "first"
+    assert replay.id != first.id
+    assert other.content == "second"
+    assert model.calls == 3
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 3
+
+
+def test_disk_tier_outlives_memory(tmp_path):
+    "Entries evicted from the LRU or lost on restart come from SQLite."
+    path = str(tmp_path / "cache.sqlite")
+    model = FakeChatModel(cache=TieredLLMCache(path, max_entries=1))
+    model.invoke("one")
+    model.invoke("two")
+    assert model.cache.stats()["memory_entries"] == 1
+
+    model.invoke("one")
+    assert model.cache.stats()["disk_hits"] == 1
+
+    restarted = FakeChatModel(cache=TieredLLMCache(path, max_entries=1))
+    restarted.invoke("two")
+    assert restarted.calls == 0
+    assert restarted.cache.stats()["disk_hits"] == 1
@@ -0,0 +1,69 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from ale.agents.history import HistoryWindow
+from ale.agents.resume import ResumeAgent
+from tests.fakes import FakeChatModel
+
+
+def _conversation(turns: int) -> list:
+    messages = []
+    for turn in range(turns):
+        messages.append(HumanMessage(f"fact {turn} " * 20, id=f"h{turn}"))
+        messages.append(AIMessage(f"noted {turn}", id=f"a{turn}"))
+    return messages
+
+
+def _apply(state: dict, update: dict) -> dict:
+    return {**state, **update}
+
+
+def test_summary_only_moves_with_the_window():
+    "The summary is recomputed only when messages leave the window."
+    model = FakeChatModel(replies=["summary"])
+    window = HistoryWindow(model, max_tokens=200, keep_turns=2)
+
+    state = {"messages": _conversation(2)}
+    assert window.summarize(state) == {}
+    assert window.messages(state) == state["messages"]
+
+    state = _apply(state, {"messages": _conversation(8)})
+    state = _apply(state, window.summarize(state))
+    assert model.calls == 1
+    assert state["summary"] == "summary"
+    recent = window.messages(state)
+    assert recent[0].content.endswith("summary")
+    assert window.token_counter(recent[1:]) <= 200
+    assert [m.id for m in recent[-4:]] == ["h6", "a6", "h7", "a7"]
+
+    assert window.summarize(state) == {}
+    assert model.calls == 1
+
+    folded = model.prompts[0][-1].content
+    assert "fact 0" in folded and "fact 7" not in folded
+
+
+def test_agent_extracts_from_bounded_window(monkeypatch):
+    "Extraction prompts stay bounded as the conversation grows."
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    model = FakeChatModel(replies=["Tell me more."], extractions=[{}])
+    window = HistoryWindow(model, max_tokens=300, keep_turns=2)
+    agent = ResumeAgent(model=model, history=window)
+    config = {"configurable": {"thread_id": "history"}}
+
+    sizes = []
+    for turn in range(12):
+        query = {"messages": [{"role": "user", "content": "fact " * 40}]}
+        asyncio.run(agent.agent.ainvoke(query, config))
+        extraction = next(
+            prompt for prompt, tools in zip(
+                reversed(model.prompts), reversed(model.schemas)
+            ) if tools
+        )
+        sizes.append(window.token_counter(extraction))
+
+    state = agent.agent.get_state(config).values
+    assert state["summary"]
+    assert len(state["messages"]) == 24
+    assert max(sizes[6:]) < 2 * 300
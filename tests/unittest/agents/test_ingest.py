@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from ale.agents.ingest import iter_chunks, merge_resume_data
+from ale.agents.resume import ResumeAgent
+from ale.models.resume import ResumeData
+from tests.fakes import FakeChatModel
+
+JOB = {
+    "title": "Data Engineer",
+    "company": "Acme",
+    "date": "2019 - 2022",
+    "description": ["Built pipelines"],
+}
+HEAD = {"name": "John Doe", "email": "john@example.com", "experience": [JOB]}
+TAIL = {
+    "phone": "+62 812 3456 7890",
+    "experience": [
+        {
+            **JOB,
+            "company": "ACME",
+            "title": "data engineer",
+            "description": ["Built pipelines", "Ran the on-call rota"],
+        },
+        {**JOB, "company": "Globex", "description": ["Led the team"]},
+    ],
+}
+
+
+@pytest.fixture
+def document(tmp_path):
+    path = tmp_path / "resume.txt"
+    path.write_text("\n".join(f"line {i} " + "x" * 40 for i in range(100)))
+    return path
+
+
+def test_chunks_are_bounded_and_overlap(document):
+    chunks = list(iter_chunks(str(document), max_chars=500, overlap_lines=2))
+
+    assert len(chunks) > 1
+    assert all(len(chunk) <= 500 for chunk in chunks)
+    for previous, chunk in zip(chunks, chunks[1:]):
+        assert chunk.splitlines()[:2] == previous.splitlines()[-2:]
+    assert chunks[-1].endswith(document.read_text().splitlines()[-1])
+
+
+def test_merge_dedupes_entries_across_chunks():
+    data = merge_resume_data([ResumeData(**HEAD), ResumeData(**TAIL)])
+
+    assert (data.name, data.phone) == (HEAD["name"], TAIL["phone"])
+    assert [job.company for job in data.experience] == ["Acme", "Globex"]
+    assert data.experience[0].description == [
+        "Built pipelines", "Ran the on-call rota"
+    ]
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_uploaded_document_is_ingested(document, use_async):
+    "Only the merged data of the document reaches state."
+    model = FakeChatModel(extractions=[HEAD, TAIL])
+    agent = ResumeAgent(
+        model=model,
+        document_ingestion=True,
+        upload_dir=str(document.parent),
+        ingest_chunk_chars=2000,
+    )
+    inputs = {"messages": [], "document": document.name}
+
+    result = (
+        asyncio.run(agent.agent.ainvoke(inputs)) if use_async
+        else agent.agent.invoke(inputs)
+    )
+
+    assert len([schema for schema in model.schemas if schema]) == 3
+    assert result["document"] is None
+    assert result["data"].email == HEAD["email"]
+    assert {job.company.casefold() for job in result["data"].experience} == {
+        "acme", "globex"
+    }
+    assert "email" not in result["missing_fields"]
+    # the follow-up question is the only message
+    assert len(result["messages"]) == 1
+
+
+@pytest.mark.parametrize(
+    "path", ["../secret.txt", "uploads/../../secret.txt", "/etc/passwd"]
+)
+def test_documents_outside_upload_dir_are_rejected(tmp_path, path):
+    "Paths from the graph input never reach files outside the upload dir."
+    (tmp_path / "secret.txt").write_text("API_KEY=hunter2")
+    (tmp_path / "uploads").mkdir()
+    model = FakeChatModel(extractions=[HEAD])
+    agent = ResumeAgent(
+        model=model,
+        document_ingestion=True,
+        upload_dir=str(tmp_path / "uploads"),
+    )
+
+    with pytest.raises(ValueError, match="No uploaded document"):
+        agent.agent.invoke({"messages": [], "document": path})
+    assert model.calls == 0
+
+
+def _pdf(pages: list[list[str]]) -> bytes:
+    """Minimal PDF with one text line per entry of each page."""
+    kids = " ".join(f"{3 + 2 * i} 0 R" for i in range(len(pages)))
+    font = 3 + 2 * len(pages)
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>",
+    ]
+    for index, lines in enumerate(pages):
+        text = " T* ".join(f"({line}) Tj" for line in lines)
+        stream = f"BT /F1 12 Tf 14 TL 72 720 Td {text} ET"
+        objects += [
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> "
+            f"/Contents {4 + 2 * index} 0 R >>",
+            f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream",
+        ]
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+    body, offsets = b"%PDF-1.4\n", []
+    for number, content in enumerate(objects, start=1):
+        offsets.append(len(body))
+        body += f"{number} 0 obj\n{content}\nendobj\n".encode()
+    xref = len(body)
+    body += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    body += "".join(f"{offset:010} 00000 n \n" for offset in offsets).encode()
+    body += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return body
+
+
+def test_pdf_pages_are_read(tmp_path):
+    path = tmp_path / "resume.pdf"
+    path.write_bytes(
+        _pdf([["John Doe", "john@example.com"], ["Data Engineer at Acme"]])
+    )
+
+    assert list(iter_chunks(str(path))) == [
+        "John Doe\njohn@example.com\nData Engineer at Acme"
+    ]
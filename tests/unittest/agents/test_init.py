@@ -0,0 +1,55 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import ale.agents
+from ale.agents.resume import ResumeAgent
+from tests.fakes import FakeChatModel
+
+HEAVY = ("langchain_google_vertexai", "google.cloud.bigquery", "pandas")
+CREDENTIALS = ("GOOGLE_APPLICATION_CREDENTIALS", "RESUME_GENERATOR_URL")
+
+
+def test_import_is_light_and_needs_no_credentials():
+    "Importing the package loads no SDK and needs no configuration."
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if key not in CREDENTIALS
+    }
+    code = (
+        "import json, sys\n"
+        "import ale.agents, ale.tools.resume, ale.repository.bigquery\n"
+        f"print(json.dumps([m for m in {HEAVY!r} if m in sys.modules]))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-W", "ignore", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=Path(__file__).parents[3],
+        env=env,
+    )
+
+    assert json.loads(result.stdout) == []
+
+
+def test_resume_agent_is_built_once_on_first_access(monkeypatch):
+    "The served graph is created lazily and shared afterwards."
+    created = []
+
+    def create():
+        created.append(ResumeAgent(model=FakeChatModel()))
+        return created[-1]
+
+    monkeypatch.setattr(ale.agents, "create_resume_agent", create)
+    ale.agents.get_resume_agent.cache_clear()
+    try:
+        graph = ale.agents.resume_agent
+        assert ale.agents.resume_graph() is graph
+        assert len(created) == 1
+        assert graph is created[0].agent
+    finally:
+        ale.agents.get_resume_agent.cache_clear()
@@ -0,0 +1,80 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+from ale.agents.preextract import pre_extract, pre_extract_messages
+
+
+def test_contact_fields_are_extracted():
+    "Contact fields are matched without one pattern eating another."
+    result = pre_extract(
+        "Reach me at john.doe@example.com or (123) 456-7890. "
+        "linkedin.com/in/johndoe, https://github.com/johndoe and my "
+        "website is johndoe.ai"
+    )
+
+    assert result.fields == {
+        "email": "john.doe@example.com",
+        "phone": "(123) 456-7890",
+        "linkedin": "linkedin.com/in/johndoe",
+        "github": "https://github.com/johndoe",
+        "website": "johndoe.ai",
+    }
+    assert result.complete
+
+
+def test_other_content_needs_the_llm():
+    "Dates and frameworks are not contacts, and real content is flagged."
+    result = pre_extract("I joined on 12.05.2020 and mostly wrote Node.js")
+    assert result.fields == {}
+    assert not result.complete
+
+    result = pre_extract("My email is a@b.io, I'm a data scientist")
+    assert result.fields == {"email": "a@b.io"}
+    assert not result.complete
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        "I was at Google 2015-2019",
+        "Salary 120 000 000 IDR",
+        "The server was at 192.168.10.10",
+    ],
+)
+def test_year_ranges_amounts_and_ips_are_not_phones(text):
+    assert "phone" not in pre_extract(text).fields
+
+
+def test_cued_phone_wins_over_earlier_numbers():
+    "A number after a phone keyword is taken, even if it looks like one."
+    assert pre_extract("Call me at 812 345 678").fields == {
+        "phone": "812 345 678"
+    }
+    result = pre_extract("Ref 555 123 4567, my phone is +62 812 3456 7890")
+    assert result.fields == {"phone": "+62 812 3456 7890"}
+    assert not result.weak
+
+
+@pytest.mark.parametrize(
+    "reply", ["My number is 0812 3456 7890", "Reach me at 0812 3456 7890"]
+)
+def test_phone_replaces_an_earlier_id(reply):
+    "A bare ID is only a weak phone, replaced by the real number."
+    messages = [HumanMessage("My employee ID was 1234 5678 90")]
+    assert pre_extract_messages(messages).weak == {"phone"}
+
+    messages.append(HumanMessage(reply))
+    result = pre_extract_messages(messages)
+
+    assert result.fields == {"phone": "0812 3456 7890"}
+    assert not result.weak
+
+
+def test_later_weak_match_keeps_cued_phone():
+    messages = [
+        HumanMessage("My phone is (123) 456-7890"),
+        HumanMessage("I was at Acme 2019-2021, order ref 555 123 4567"),
+    ]
+    assert pre_extract_messages(messages).fields == {
+        "phone": "(123) 456-7890"
+    }
@@ -0,0 +1,171 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+import pytest
+
+from ale.agents.resume import ResumeAgent
+from ale.tools import BasicServices
+from ale.tools.storage import ResumeStore
+from tests.fakes import FakeChatModel, stub_generator
+
+SAMPLE = json.loads(
+    (Path(__file__).parents[3] / "data" / "resume_sample.json").read_text()
+)
+PARTIAL = {"name": SAMPLE["name"], "email": SAMPLE["email"]}
+
+
+@pytest.fixture
+def generator(monkeypatch, tmp_path):
+    monkeypatch.chdir(tmp_path)
+    with stub_generator() as server:
+        monkeypatch.setattr(
+            "ale.tools.resume.service", BasicServices(server.url)
+        )
+        monkeypatch.setattr(
+            "ale.tools.resume.store",
+            ResumeStore(str(tmp_path / "resumes"), 1024 * 1024, 60),
+        )
+        yield server
+
+
+def _query(text="Hi, I'm John"):
+    return {"messages": [{"role": "user", "content": text}]}
+
+
+def _strip(result):
+    return {
+        "missing_fields": result["missing_fields"],
+        "data": result["data"].model_dump(),
+        "messages": [message.content for message in result["messages"]],
+    }
+
+
+@pytest.mark.parametrize("extraction", [PARTIAL, SAMPLE])
+def test_sync_async_parity(generator, extraction):
+    "Sync and async graph runs produce the same state."
+    sync_agent = ResumeAgent(model=FakeChatModel(extractions=[extraction]))
+    async_agent = ResumeAgent(model=FakeChatModel(extractions=[extraction]))
+
+    sync_result = sync_agent.agent.invoke(_query())
+    async_result = asyncio.run(async_agent.agent.ainvoke(_query()))
+
+    assert _strip(sync_result) == _strip(async_result)
+    if extraction is SAMPLE:
+        assert sync_result["missing_fields"] == []
+        assert len(generator.requests) == 1
+        assert len(list(Path("resumes").glob("*.pdf"))) == 1
+    else:
+        assert "phone" in sync_result["missing_fields"]
+        assert len(sync_result["messages"]) == 2
+
+
+@pytest.mark.asyncio
+async def test_concurrent_conversations_share_worker(generator):
+    "Async nodes let one event loop serve overlapping conversations."
+    latency = 0.2
+    agent = ResumeAgent(
+        model=FakeChatModel(extractions=[SAMPLE], latency=latency)
+    )
+
+    start = time.perf_counter()
+    results = await asyncio.gather(
+        *(agent.agent.ainvoke(_query()) for _ in range(10))
+    )
+    elapsed = time.perf_counter() - start
+
+    assert all(not result["missing_fields"] for result in results)
+    assert elapsed < 10 * latency / 2
+
+
+def test_incremental_extraction_sends_only_new_messages(monkeypatch):
+    "Each turn sends the latest exchange and the still-missing fields."
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    model = FakeChatModel(
+        extractions=[
+            {"name": "Alice"},
+            {"email": "alice@example.com", "name": "Ignored"},
+        ]
+    )
+    agent = ResumeAgent(model=model, incremental=True)
+    config = {"configurable": {"thread_id": "incremental"}}
+
+    agent.agent.invoke(_query("I'm Alice"), config)
+    result = agent.agent.invoke(_query("alice@example.com"), config)
+
+    first, _, second, _ = model.prompts
+    assert [m.content for m in first[1:]] == ["I'm Alice"]
+    assert [m.content for m in second[1:]] == [
+        model.replies[0], "alice@example.com"
+    ]
+    assert result["data"].name == "Alice"
+    assert result["data"].email == "alice@example.com"
+    assert "name" not in result["missing_fields"]
+    assert "email" not in result["missing_fields"]
+
+
+def test_incremental_extraction_adds_entries_and_corrections(
+    generator, monkeypatch
+):
+    "Later jobs are appended, and mentioned fields can still be corrected."
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    first_job, second_job = SAMPLE["experience"][:2]
+    model = FakeChatModel(
+        extractions=[
+            {**SAMPLE, "experience": [first_job]},
+            {"experience": [second_job], "email": "ignored@example.com"},
+            {"email": "new@example.com"},
+        ]
+    )
+    agent = ResumeAgent(model=model, incremental=True)
+    config = {"configurable": {"thread_id": "incremental-entries"}}
+
+    agent.agent.invoke(_query("Here is my CV"), config)
+    result = agent.agent.invoke(_query("I also worked at Globex"), config)
+
+    jobs = [job.model_dump() for job in result["data"].experience]
+    assert jobs == [first_job, second_job]
+    assert result["data"].email == SAMPLE["email"]
+
+    result = agent.agent.invoke(
+        _query("Actually my email is new@example.com"), config
+    )
+
+    assert result["data"].email == "new@example.com"
+    assert len(result["data"].experience) == 2
+
+
+def test_pre_extraction_skips_llm_for_contact_turns(monkeypatch):
+    "Contact-only turns are merged locally and narrow the LLM schema."
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    model = FakeChatModel(extractions=[{"name": "Alice", "phone": "1"}])
+    agent = ResumeAgent(model=model, pre_extraction=True)
+    config = {"configurable": {"thread_id": "pre-extraction"}}
+
+    agent.agent.invoke(_query("I'm Alice, phone +1 555 123 4567"), config)
+    calls = model.calls
+    result = agent.agent.invoke(_query("alice@example.com"), config)
+
+    extraction_schema = model.schemas[0][0]["function"]["parameters"]
+    assert "phone" not in extraction_schema["properties"]
+    assert model.calls == calls + 1
+    assert result["data"].phone == "+1 555 123 4567"
+    assert result["data"].email == "alice@example.com"
+    assert "email" not in result["missing_fields"]
+
+
+def test_weak_phone_is_left_to_the_llm(monkeypatch):
+    "A bare number is not pre-extracted, so the LLM can still correct it."
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    model = FakeChatModel(extractions=[{"name": "Alice"}])
+    agent = ResumeAgent(model=model, pre_extraction=True)
+    config = {"configurable": {"thread_id": "weak-phone"}}
+
+    result = agent.agent.invoke(
+        _query("I'm Alice, my employee ID was 1234 5678 90"), config
+    )
+
+    extraction_schema = model.schemas[0][0]["function"]["parameters"]
+    assert "phone" in extraction_schema["properties"]
+    assert result["data"].phone is None
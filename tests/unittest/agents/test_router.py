@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from ale.agents.resume import ResumeAgent
+from ale.agents.router import FAST, FULL, ModelRouter
+from ale.core.metrics import metrics
+from ale.models.resume import ResumeData
+from tests.fakes import FakeChatModel
+
+EMAIL = {"email": "john@example.com"}
+CV = "\n".join(f"2015-2020 Engineer at Company {i}" for i in range(20))
+
+
+def _routes() -> dict[tuple, float]:
+    return {
+        (item["labels"]["tier"], item["labels"]["reason"]): item["value"]
+        for item in metrics.to_json()["counters"]
+        if item["name"] == "ale_llm_route_total"
+    }
+
+
+def _prompt(text: str) -> list:
+    return [SystemMessage(content="Extract"), HumanMessage(content=text)]
+
+
+@pytest.mark.parametrize(
+    "text, tier, reason",
+    [
+        ("my email is john@example.com", FAST, "simple"),
+        (CV, FULL, "lines"),
+        ("word " * 2000, FULL, "tokens"),
+    ],
+)
+def test_turn_size_picks_tier(text, tier, reason):
+    router = ModelRouter(fast=FakeChatModel(), full=FakeChatModel())
+
+    assert router.tier(_prompt(text)) == (tier, reason)
+
+
+def test_long_history_goes_to_full_model():
+    "A short turn still escalates when the whole prompt is large."
+    router = ModelRouter(
+        fast=FakeChatModel(), full=FakeChatModel(), max_prompt_tokens=256
+    )
+    prompt = [
+        SystemMessage(content="Extract"),
+        HumanMessage(content="word " * 200),
+        AIMessage(content="Thanks, anything else?"),
+        HumanMessage(content=CV),
+        AIMessage(content="What is your email?"),
+        HumanMessage(content="john@example.com"),
+    ]
+
+    assert router.tier(prompt[:1] + prompt[-1:]) == (FAST, "simple")
+    assert router.tier(prompt) == (FULL, "prompt_tokens")
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_parse_failure_escalates_to_full_model(use_async):
+    "An unparseable fast answer is retried on the full model."
+    metrics.reset()
+    fast = FakeChatModel(extractions=[{"experience": "not a list"}])
+    full = FakeChatModel(extractions=[EMAIL])
+    runnable = ModelRouter(fast=fast, full=full).structured(ResumeData)
+    prompt = _prompt("my email is john@example.com")
+
+    response = (
+        asyncio.run(runnable.ainvoke(prompt)) if use_async
+        else runnable.invoke(prompt)
+    )
+
+    assert response["parsed"].email == EMAIL["email"]
+    assert (fast.calls, full.calls) == (1, 1)
+    assert _routes() == {(FAST, "simple"): 1, (FULL, "escalated"): 1}
+
+
+def test_agent_extracts_short_turns_on_fast_model():
+    fast = FakeChatModel(extractions=[EMAIL])
+    full = FakeChatModel(extractions=[EMAIL])
+    agent = ResumeAgent(
+        model=full, router=ModelRouter(fast=fast, full=full)
+    )
+
+    result = agent.agent.invoke(
+        {"messages": [{"role": "user", "content": "I'm john@example.com"}]}
+    )
+
+    assert result["data"].email == EMAIL["email"]
+    # extraction on the fast model, the follow-up question on the full one
+    assert fast.calls == 1
+    assert full.calls == 1 and full.schemas == [None]
@@ -0,0 +1,68 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from ale.agents.resume import ResumeAgent
+from ale.agents.sections import SECTION_GROUPS
+from tests.fakes import FakeChatModel
+
+SAMPLE = json.loads(
+    (Path(__file__).parents[3] / "data" / "resume_sample.json").read_text()
+)
+CV = json.dumps(SAMPLE, indent=2)
+
+
+def _state(text: str = CV) -> dict:
+    return {"messages": [HumanMessage(content=text, id="m1")]}
+
+
+def _agent(model: FakeChatModel, **kwargs) -> ResumeAgent:
+    return ResumeAgent(
+        model=model, section_extraction=True, section_min_tokens=100, **kwargs
+    )
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_sections_merge_like_single_call(incremental):
+    "Per-section calls produce the data of one whole-schema call."
+    single = ResumeAgent(
+        model=FakeChatModel(extractions=[SAMPLE]), incremental=incremental
+    )
+    model = FakeChatModel(extractions=[SAMPLE])
+
+    expected = single.extract_content(_state())
+    result = _agent(model, incremental=incremental).extract_content(_state())
+
+    assert result["data"].model_dump() == expected["data"].model_dump()
+    assert result["missing_fields"] == expected["missing_fields"]
+    assert model.calls == len(SECTION_GROUPS)
+    requested = [
+        set(schema[0]["function"]["parameters"]["properties"])
+        for schema in model.schemas
+    ]
+    assert sorted(map(sorted, requested)) == sorted(
+        sorted(group) for group in SECTION_GROUPS
+    )
+
+
+def test_failed_section_is_left_out():
+    model = FakeChatModel(extractions=[{**SAMPLE, "experience": "n/a"}])
+
+    result = asyncio.run(
+        _agent(model, incremental=True).aextract_content(_state())
+    )
+
+    assert result["data"].email == SAMPLE["email"]
+    assert result["data"].experience is None
+    assert "experience" in result["missing_fields"]
+
+
+def test_short_turn_is_not_split():
+    model = FakeChatModel(extractions=[{"email": SAMPLE["email"]}])
+
+    _agent(model).extract_content(_state(f"I'm {SAMPLE['email']}"))
+
+    assert model.calls == 1
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import time
+from concurrent.futures import wait
+from pathlib import Path
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from ale.agents.resume import ResumeAgent
+from ale.agents.speculative import SpeculativeRenderer
+from ale.core.metrics import metrics
+from ale.models.resume import OPTIONAL_FIELDS, ResumeData
+from ale.tools import BasicServices
+from ale.tools.storage import ResumeStore
+from tests.fakes import FakeChatModel, stub_generator
+
+SAMPLE = json.loads(
+    (Path(__file__).parents[3] / "data" / "resume_sample.json").read_text()
+)
+REQUIRED = {
+    key: value for key, value in SAMPLE.items() if key not in OPTIONAL_FIELDS
+}
+DELAY = 0.3
+
+
+@pytest.fixture
+def generator(monkeypatch, tmp_path):
+    metrics.reset()
+    with stub_generator(delay=DELAY) as server:
+        monkeypatch.setattr(
+            "ale.tools.resume.service", BasicServices(server.url)
+        )
+        monkeypatch.setattr(
+            "ale.tools.resume.store",
+            ResumeStore(str(tmp_path / "resumes"), 1024 * 1024, 60),
+        )
+        yield server
+
+
+def _outcomes() -> dict[str, float]:
+    return {
+        item["labels"]["outcome"]: item["value"]
+        for item in metrics.to_json()["counters"]
+        if item["name"] == "ale_speculative_renders_total"
+    }
+
+
+def _settle(renderer: SpeculativeRenderer):
+    wait([entry.future for entry in list(renderer._renders.values())])
+
+
+def test_generate_turn_reuses_speculative_render(generator):
+    "The render started while asking for optional fields is reused."
+    renderer = SpeculativeRenderer()
+    agent = ResumeAgent(
+        model=FakeChatModel(extractions=[REQUIRED]), speculative=renderer
+    )
+    config = {"configurable": {"thread_id": "alice"}}
+    messages = [{"role": "user", "content": "Here is my CV"}]
+
+    result = agent.agent.invoke({"messages": messages}, config)
+    assert set(result["missing_fields"]) <= OPTIONAL_FIELDS
+    _settle(renderer)
+    assert len(generator.requests) == 1
+
+    messages.append({"role": "user", "content": "That's fine, generate it"})
+    start = time.monotonic()
+    agent.agent.invoke({"messages": messages}, config)
+
+    assert time.monotonic() - start < DELAY
+    assert len(generator.requests) == 1
+    assert _outcomes() == {"started": 1, "used": 1}
+    [saved] = [
+        item
+        for item in metrics.to_json()["histograms"]
+        if item["name"] == "ale_speculative_saved_seconds"
+    ]
+    assert saved["sum"] >= DELAY
+
+
+@pytest.mark.parametrize(
+    "text,speculative,route",
+    [
+        ("That's fine, generate it", True, "complete"),
+        ("That's fine, generate it", False, "missing"),
+        ("Please don't generate the resume until I send my LinkedIn", True,
+         "missing"),
+        ("Don't generate it yet", True, "missing"),
+        ("I generate reports in my job", True, "missing"),
+    ],
+)
+def test_generate_shortcut_needs_a_plain_request(text, speculative, route):
+    "Only an undeferred request skips optional fields, and only if enabled."
+    agent = ResumeAgent(
+        model=FakeChatModel(),
+        speculative=SpeculativeRenderer() if speculative else None,
+    )
+    state = {
+        "messages": [HumanMessage(text)],
+        "missing_fields": ["linkedin", "certifications"],
+    }
+
+    assert agent.validate_content(state) == route
+
+
+def test_stale_speculations_are_discarded(generator):
+    "Newer data cancels a queued speculation and wastes a running one."
+    renderer = SpeculativeRenderer(workers=1)
+    versions = [
+        ResumeData(**{**REQUIRED, "title": title})
+        for title in ("Engineer", "Lead", "Manager")
+    ]
+
+    renderer.speculate("alice", versions[0])
+    time.sleep(DELAY / 3)
+    renderer.speculate("alice", versions[1])
+    renderer.speculate("alice", versions[2])
+    path = renderer.render("alice", versions[2])
+
+    assert path.exists()
+    assert len(generator.requests) == 2
+    assert _outcomes() == {
+        "started": 3, "wasted": 1, "cancelled": 1, "used": 1
+    }
+
+
+def test_concurrent_renders_share_one_request(generator):
+    renderer = SpeculativeRenderer()
+    data = ResumeData(**REQUIRED)
+
+    async def run():
+        return await asyncio.gather(
+            *(renderer.arender(f"user-{i}", data) for i in range(5))
+        )
+
+    paths = asyncio.run(run())
+
+    assert len(set(paths)) == 1
+    assert len(generator.requests) == 1
+    assert _outcomes() == {}
+
+
+def test_cancelled_speculation_falls_back_to_a_render(generator):
+    "A caller waiting on a speculation that gets superseded renders itself."
+    renderer = SpeculativeRenderer(workers=1)
+    busy, wanted, newer = (
+        ResumeData(**{**REQUIRED, "title": title})
+        for title in ("Engineer", "Lead", "Manager")
+    )
+
+    async def run():
+        renderer.speculate("bob", busy)
+        await asyncio.sleep(DELAY / 3)
+        renderer.speculate("alice", wanted)
+        waiting = asyncio.create_task(renderer.arender("carol", wanted))
+        await asyncio.sleep(0.01)
+        renderer.speculate("alice", newer)
+        return await waiting
+
+    path = asyncio.run(run())
+
+    assert path.exists()
+    assert _outcomes()["cancelled"] == 1
@@ -0,0 +1,60 @@
+import asyncio
+import time
+
+from ale.agents.resume import ResumeAgent
+from ale.services.chat import Agent
+from tests.fakes import FakeChatModel
+
+REPLY = "Could you share your email and phone number?"
+
+
+def _query(text="Hi, I'm Alice"):
+    return {"messages": [{"role": "user", "content": text}]}
+
+
+def test_reply_is_streamed_and_checkpointed(monkeypatch):
+    "Only the follow-up question streams, and the turn is saved whole."
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    model = FakeChatModel(replies=[REPLY], extractions=[{"name": "Alice"}])
+    agent = ResumeAgent(model=model)
+    config = {"configurable": {"thread_id": "streaming"}}
+
+    tokens = list(agent.stream_reply(_query(), config))
+
+    assert "".join(tokens) == REPLY
+    assert len(tokens) == len(REPLY.split())
+    state = agent.agent.get_state(config).values
+    assert state["messages"][-1].content == REPLY
+    assert state["data"].name == "Alice"
+
+
+def test_first_token_arrives_before_the_full_reply():
+    model = FakeChatModel(replies=[REPLY], latency=0.05, token_latency=0.02)
+    agent = ResumeAgent(model=model)
+
+    async def run():
+        start, arrivals = time.perf_counter(), []
+        async for _ in agent.astream_reply(_query()):
+            arrivals.append(time.perf_counter() - start)
+        return arrivals
+
+    arrivals = asyncio.run(run())
+
+    assert len(arrivals) == len(REPLY.split())
+    assert arrivals[-1] - arrivals[0] >= 0.02 * (len(arrivals) - 1) * 0.8
+
+
+def test_chat_agent_streams_reply(monkeypatch):
+    monkeypatch.setattr(
+        "ale.services.chat.init_chat_model", lambda name: FakeChatModel()
+    )
+    agent = Agent()
+    # answer in plain text rather than calling the bound tool
+    agent.llm = FakeChatModel(replies=["Two times three is six."])
+
+    tokens = list(agent.stream("What is two times three?"))
+
+    assert "".join(tokens) == "Two times three is six."
+    assert agent.graph.get_state(
+        {"configurable": {"thread_id": "2105"}}
+    ).values["messages"][-1].content == "".join(tokens)
@@ -0,0 +1,95 @@
+import asyncio
+import sqlite3
+import time
+
+from ale.agents.resume import ResumeAgent
+from ale.core.checkpoint import BoundedSqliteSaver, create_checkpointer
+from tests.fakes import FakeChatModel
+
+
+def _saver(**kwargs):
+    return BoundedSqliteSaver(
+        sqlite3.connect(":memory:", check_same_thread=False), **kwargs
+    )
+
+
+def _count(saver, table, thread_id):
+    with saver.cursor(transaction=False) as cur:
+        cur.execute(
+            f"SELECT COUNT(*) FROM {table} WHERE thread_id = ?", (thread_id,)
+        )
+        return cur.fetchone()[0]
+
+
+def test_keeps_last_checkpoints_and_expires_threads(monkeypatch):
+    "History is capped per thread and idle threads are compacted away."
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    saver = _saver(keep_last=2, ttl=60)
+    agent = ResumeAgent(model=FakeChatModel(), checkpointer=saver)
+
+    for thread_id in ("old", "new"):
+        config = {"configurable": {"thread_id": thread_id}}
+        for turn in range(3):
+            agent.agent.invoke(
+                {"messages": [{"role": "user", "content": f"turn {turn}"}]},
+                config,
+            )
+        state = agent.agent.get_state(config)
+        assert len(state.values["messages"]) == 6
+        assert _count(saver, "checkpoints", thread_id) == 2
+
+    with saver.cursor() as cur:
+        cur.execute(
+            "UPDATE thread_activity SET updated = ? WHERE thread_id = 'old'",
+            (time.time() - 120,),
+        )
+    assert saver.compact() == 1
+    assert _count(saver, "checkpoints", "old") == 0
+    assert _count(saver, "writes", "old") == 0
+    assert _count(saver, "checkpoints", "new") == 2
+
+
+def test_async_graph_runs(monkeypatch):
+    "The saver backs graphs invoked through the async API."
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    saver = _saver(keep_last=1)
+    agent = ResumeAgent(model=FakeChatModel(), checkpointer=saver)
+    config = {"configurable": {"thread_id": "async"}}
+
+    async def converse():
+        for turn in range(2):
+            await agent.agent.ainvoke(
+                {"messages": [{"role": "user", "content": f"turn {turn}"}]},
+                config,
+            )
+        return await agent.agent.aget_state(config)
+
+    state = asyncio.run(converse())
+    assert len(state.values["messages"]) == 4
+    assert _count(saver, "checkpoints", "async") == 1
+
+
+def test_graphs_do_not_share_a_database(monkeypatch, tmp_path):
+    "The same thread id in two graphs is two separate conversations."
+    monkeypatch.setattr("ale.core.checkpoint.c.CHECKPOINTER", "sqlite")
+    monkeypatch.setattr(
+        "ale.core.checkpoint.c.CHECKPOINT_SQLITE_PATH",
+        str(tmp_path / "checkpoints.sqlite"),
+    )
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    resume, other = create_checkpointer("resume"), create_checkpointer("chat")
+
+    assert create_checkpointer("resume") is resume
+    assert other is not resume
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "checkpoints-chat.sqlite", "checkpoints-resume.sqlite"
+    ]
+
+    agent = ResumeAgent(model=FakeChatModel())
+    config = {"configurable": {"thread_id": "2105"}}
+    agent.agent.invoke(
+        {"messages": [{"role": "user", "content": "hi"}]}, config
+    )
+    assert agent.checkpointer is resume
+    assert _count(resume, "checkpoints", "2105") > 0
+    assert _count(other, "checkpoints", "2105") == 0
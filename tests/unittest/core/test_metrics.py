@@ -0,0 +1,112 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from ale.agents.resume import ResumeAgent
+from ale.core.metrics import MetricsRegistry, instrument, metrics
+from tests.fakes import FakeChatModel
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    metrics.reset()
+    yield
+    metrics.reset()
+
+
+def _series(name, **labels):
+    return [
+        item
+        for item in metrics.to_json()["histograms"]
+        + metrics.to_json()["counters"]
+        if item["name"] == name
+        and all(item["labels"].get(k) == v for k, v in labels.items())
+    ]
+
+
+def test_records_node_latency_and_tokens(monkeypatch):
+    "Every node and router of a turn is timed and tokens are counted."
+    monkeypatch.setattr("ale.agents.resume.c.ENV", "prod")
+    agent = ResumeAgent(model=FakeChatModel())
+    config = {"configurable": {"thread_id": "metrics"}}
+
+    asyncio.run(agent.agent.ainvoke(
+        {"messages": [{"role": "user", "content": "Hi, I'm John"}]}, config
+    ))
+    agent.agent.invoke(
+        {"messages": [{"role": "user", "content": "john@doe.com"}]}, config
+    )
+
+    for node in ("extract_content", "validate_content", "ask_more"):
+        (duration,) = _series("ale_node_duration_seconds", node=node)
+        assert duration["count"] == 2
+        assert duration["labels"]["graph"] == "resume_agent"
+    (payload,) = _series("ale_node_payload_bytes", node="ask_more")
+    assert payload["sum"] > 0
+    (tokens,) = _series(
+        "ale_llm_tokens_total", node="extract_content", direction="input"
+    )
+    assert tokens["value"] > 0
+
+    totals = metrics.thread("metrics")
+    assert totals["llm_calls"] == 4
+    assert totals["node_runs"] == 6
+    assert totals["input_tokens"] > totals["output_tokens"] > 0
+    json.dumps(metrics.to_json())
+
+    text = metrics.to_prometheus()
+    assert "# TYPE ale_node_duration_seconds histogram" in text
+    assert (
+        'ale_node_duration_seconds_count{graph="resume_agent",'
+        'node="ask_more"} 2'
+    ) in text
+    assert "# TYPE ale_llm_tokens_total counter" in text
+
+
+def test_records_retries_and_errors():
+    "Retries within a node and failing nodes are counted."
+    attempts, broken = [], []
+
+    def flaky(state):
+        attempts.append(state)
+        if broken or len(attempts) < 3:
+            raise ValueError("flaky")
+        return {}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node(
+        "flaky",
+        RunnableLambda(flaky).with_retry(
+            wait_exponential_jitter=False, stop_after_attempt=3
+        ),
+    )
+    builder.add_edge(START, "flaky")
+    builder.add_edge("flaky", END)
+    graph = instrument(builder.compile(), "test")
+
+    graph.invoke({"messages": []})
+    (retries,) = _series("ale_node_retries_total", node="flaky")
+    assert retries["value"] == 2
+
+    broken.append(True)
+    with pytest.raises(ValueError):
+        graph.invoke({"messages": []})
+    (retries,) = _series("ale_node_retries_total", node="flaky")
+    assert retries["value"] == 4
+    (errors,) = _series("ale_node_errors_total", node="flaky")
+    assert errors["value"] == 1
+    (duration,) = _series("ale_node_duration_seconds", node="flaky")
+    assert duration["count"] == 2
+
+
+def test_thread_totals_are_bounded():
+    "Only the most recently active threads keep totals."
+    registry = MetricsRegistry(max_threads=2)
+    for thread_id in ("a", "b", "a", "c"):
+        registry.add_thread(thread_id, llm_calls=1)
+
+    assert set(registry.to_json()["threads"]) == {"a", "c"}
+    assert registry.thread("a") == {"llm_calls": 2}
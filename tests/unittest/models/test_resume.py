@@ -0,0 +1,74 @@
+from ale.models.resume import ResumeData, partial_resume_model
+
+
+def test_partial_model_narrows_schema():
+    "Partial models keep only the requested fields, in schema order."
+    Patch = partial_resume_model(["skills", "email", "unknown"])
+
+    assert list(Patch.model_fields) == ["email", "skills"]
+    assert Patch.__name__ == "ResumeData"
+    assert partial_resume_model(["email", "skills"]) is Patch
+
+
+def test_merge_semantics():
+    "Scalars are replaced, lists appended without duplicates, dicts unioned."
+    data = ResumeData(
+        name="Alice",
+        email="old@example.com",
+        certifications=[
+            {"name": "GCP", "organization": "Google", "date": "2021"}
+        ],
+        skills={"ml": ["nlp"]},
+    )
+    Patch = partial_resume_model(["email", "certifications", "skills"])
+    patch = Patch(
+        email="new@example.com",
+        certifications=[
+            {"name": "GCP", "organization": "Google", "date": "2021"},
+            {"name": "AWS", "organization": "Amazon", "date": "2022"},
+        ],
+        skills={"ml": ["nlp", "cv"], "web": ["js"]},
+    )
+
+    merged = data.merge(patch)
+
+    assert merged.name == "Alice"
+    assert merged.email == "new@example.com"
+    assert [cert.name for cert in merged.certifications] == ["GCP", "AWS"]
+    assert merged.skills == {"ml": ["nlp", "cv"], "web": ["js"]}
+    assert data.skills == {"ml": ["nlp"]}
+    assert "email" not in merged.missing_fields()
+    assert "phone" in merged.missing_fields()
+
+
+def test_apply_tracks_dirty_sections():
+    "In-place merges re-serialize and re-check only the changed fields."
+    data = ResumeData(
+        name="Alice",
+        certifications=[
+            {"name": "GCP", "organization": "Google", "date": "2021"}
+        ],
+    )
+    assert data.to_json() == data.model_dump_json()
+    assert "email" in data.missing_fields()
+
+    Patch = partial_resume_model(["email", "certifications"])
+    changed = data.apply(Patch(
+        email="alice@example.com",
+        certifications=[
+            {"name": "GCP", "organization": "Google", "date": "2021"}
+        ],
+    ))
+
+    assert changed == ["email"]
+    assert set(data._sections) == set(ResumeData.model_fields) - {"email"}
+    assert data.to_json() == data.model_dump_json()
+    assert "email" not in data.missing_fields()
+
+    copy = data.model_copy(update={"phone": "+62 812 3456 7890"})
+    data.title = "Engineer"
+    assert "phone" not in copy.missing_fields()
+    assert "phone" in data.missing_fields()
+    assert "title" in copy.missing_fields()
+    assert copy.to_json() == copy.model_dump_json()
+    assert data.to_json() == data.model_dump_json()
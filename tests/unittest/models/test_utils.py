@@ -1,7 +1,9 @@
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 from pydantic import ValidationError
 
-from app.models.utils import create_dynamic_model
+from ale.models.utils import ModelRegistry, create_dynamic_model
 
 
 def test_simple_model_creation():
@@ -98,3 +100,97 @@ def test_nested_model_creation():
     assert customer.address.street == "456 Elm St"
     assert customer.address.city == "Semarang"
     assert customer.address.state == "Central Java"
+
+
+EXPERIENCE = {
+    "type": "array",
+    "description": "Jobs",
+    "items": {
+        "type": "object",
+        "properties": {
+            "company": {"type": "string", "description": "Company name"},
+            "years": {"type": "integer", "description": "Years spent"},
+        },
+    },
+}
+
+
+def test_registry_reuses_models():
+    "Equal schemas share a model, nested ones named after their parent."
+    registry = ModelRegistry()
+    schema = {
+        "name": {"type": "string", "description": "Name"},
+        "experience": EXPERIENCE,
+    }
+    reordered = dict(reversed(schema.items()))
+
+    first = registry.get("Resume", schema)
+    assert registry.get("Resume", reordered) is first
+    other = registry.get("Profile", {"experience": EXPERIENCE})
+    assert other.model is not first.model
+    (item,) = other.model.model_fields["experience"].annotation.__args__
+    assert item.__name__ == "Profile_ExperienceItem"
+    assert (registry.hits, registry.misses) == (1, 4)
+
+    records = first.list_adapter.validate_json(
+        '[{"name": "Alice", "experience": [{"company": "ACME", '
+        '"years": "3"}]}]'
+    )
+    assert records[0].experience[0].years == 3
+    with pytest.raises(ValidationError):
+        first.adapter.validate_python({"experience": [{"years": "many"}]})
+
+
+def test_nested_models_of_the_same_field_do_not_collide():
+    "Equally named nested fields get distinct models and schema names."
+    def address(*fields):
+        return {
+            "type": "object",
+            "description": "Address",
+            "properties": {
+                name: {"type": "string", "description": name}
+                for name in fields
+            },
+        }
+
+    schema = {
+        "home": {
+            "type": "object",
+            "description": "Home",
+            "properties": {"address": address("street", "city")},
+        },
+        "work": {
+            "type": "object",
+            "description": "Office",
+            "properties": {"address": address("building", "floor")},
+        },
+    }
+
+    Customer = create_dynamic_model("Customer", schema)
+
+    assert set(Customer.model_json_schema()["$defs"]) == {
+        "CustomerHome", "CustomerHomeAddress",
+        "CustomerWork", "CustomerWorkAddress",
+    }
+    customer = Customer(
+        home={"address": {"street": "Elm St", "city": "Bandung"}},
+        work={"address": {"building": "Tower A", "floor": "3"}},
+    )
+    assert customer.home.address.city == "Bandung"
+    assert customer.work.address.floor == "3"
+
+
+def test_registry_is_bounded_and_thread_safe():
+    "Concurrent callers get one model and old entries are evicted."
+    registry = ModelRegistry(max_entries=2)
+    schema = {"name": {"type": "string", "description": "Name"}}
+    with ThreadPoolExecutor(8) as pool:
+        models = set(pool.map(
+            lambda _: registry.get("Customer", schema).model, range(32)
+        ))
+    assert len(models) == 1
+
+    for name in ("A", "B", "C"):
+        registry.get(name, schema)
+    assert len(registry) == 2
+    assert registry.get("Customer", schema).model not in models
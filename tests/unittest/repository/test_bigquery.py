@@ -0,0 +1,129 @@
+import logging
+import os
+import time
+
+import pytest
+from google.cloud.bigquery import ScalarQueryParameter
+
+from ale.repository.bigquery import BigQueryBase
+from ale.repository.cache import QueryCache
+from tests.fakes import FakeBigQueryClient
+
+
+def _repository(
+    rows: int, cache: QueryCache = None
+) -> tuple[BigQueryBase, FakeBigQueryClient]:
+    repository = BigQueryBase(project_id="project", dataset="dataset")
+    client = FakeBigQueryClient(rows)
+    setattr(repository, "_client", client)
+    setattr(repository, "_query_cache", cache or QueryCache())
+    return repository, client
+
+
+def _runs(client: FakeBigQueryClient) -> list[bool]:
+    "Whether each query sent to the client was a dry run."
+    return [job_config.dry_run for _, job_config in client.queries]
+
+
+def test_iter_pages_fetches_lazily():
+    "Pages are requested one at a time as the caller consumes them."
+    repository, client = _repository(1050)
+
+    pages = repository._iter_pages("SELECT 1", page_size=100)
+    first = next(pages)
+
+    assert len(first) == 100
+    assert first[0] == {"id": 0, "name": "user 0", "score": 0.0}
+    assert client.pages_served == 1
+    assert sum(len(page) for page in pages) == 950
+    assert client.pages_served == 11
+
+
+def test_iter_batches_and_frames_cover_all_rows():
+    repository, _ = _repository(250)
+
+    batches = list(repository._iter_batches("SELECT 1", page_size=100))
+    frames = list(repository._iter_frames("SELECT 1", page_size=100))
+
+    assert [batch.num_rows for batch in batches] == [100, 100, 50]
+    assert [len(frame) for frame in frames] == [100, 100, 50]
+    assert frames[-1]["id"].iloc[-1] == 249
+
+
+def test_query_builds_dataframe_from_arrow(monkeypatch):
+    monkeypatch.setattr("ale.repository.bigquery.c.BQ_PAGE_SIZE", 40)
+    repository, client = _repository(100)
+
+    frame = repository._query("SELECT 1")
+
+    assert len(frame) == 100
+    assert client.pages_served == 3
+    assert str(frame["id"].dtype) == "int64"
+    assert str(frame["score"].dtype) == "float64"
+    assert frame["name"].iloc[99] == "user 99"
+
+
+def test_dry_run_returns_empty_dataframe():
+    repository, client = _repository(100)
+
+    frame = repository._query("SELECT 1", dry_run=True)
+
+    assert frame.empty
+    assert client.pages_served == 0
+    assert client.queries[0][1].dry_run
+
+
+def test_read_serves_repeated_queries_from_cache():
+    "Identical SQL and parameters run once; new parameters run again."
+    repository, client = _repository(10)
+    params = [ScalarQueryParameter("id", "INT64", 1)]
+
+    first = repository._read("SELECT @id", params)
+    first.loc[0, "name"] = "changed"
+    second = repository._read("SELECT @id", params)
+    repository._read("SELECT @id", [ScalarQueryParameter("id", "INT64", 2)])
+
+    assert second["name"].iloc[0] == "user 0"
+    assert _runs(client) == [True, False, True, False]
+    assert repository.query_cache.stats()["hits"] == 1
+
+
+def test_cache_spills_to_parquet_and_expires(tmp_path):
+    cache = QueryCache(str(tmp_path), max_entries=1, ttl=60)
+    repository, client = _repository(10, cache)
+
+    repository._read("SELECT 1")
+    repository._read("SELECT 2")
+    assert len(list(tmp_path.glob("*.parquet"))) == 1
+
+    frame = repository._read("SELECT 1")
+    assert len(frame) == 10
+    assert cache.stats()["disk_hits"] == 1
+    assert _runs(client).count(False) == 2
+
+    for path in tmp_path.glob("*.parquet"):
+        os.utime(path, (time.time() - 120, time.time() - 120))
+    cache._memory.clear()
+    repository._read("SELECT 2")
+    assert _runs(client).count(False) == 3
+
+
+def test_cost_gate_refuses_or_warns(monkeypatch, caplog):
+    "Queries estimated over budget are refused before they run."
+    monkeypatch.setattr(
+        "ale.repository.bigquery.c.BQ_MAX_BYTES_PROCESSED", 100
+    )
+    repository, client = _repository(10)
+
+    with pytest.raises(RuntimeError, match="over the budget"):
+        repository._read("SELECT 1")
+    assert _runs(client) == [True]
+
+    monkeypatch.setattr("ale.repository.bigquery.c.BQ_COST_GATE", "warn")
+    with caplog.at_level(logging.WARNING):
+        assert len(repository._read("SELECT 1")) == 10
+    assert "over the budget" in caplog.text
+
+    monkeypatch.setattr("ale.repository.bigquery.c.BQ_COST_GATE", "off")
+    repository._read("SELECT 2")
+    assert _runs(client) == [True, True, False, False]
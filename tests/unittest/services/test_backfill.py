@@ -0,0 +1,74 @@
+import json
+
+import pytest
+
+from ale.agents.resume import ResumeAgent
+from ale.services.backfill import backfill
+from tests.fakes import FakeChatModel
+
+
+class FlakyChatModel(FakeChatModel):
+    """Fails the first call for a transcript asking to fail."""
+
+    failures: int = 0
+
+    async def _agenerate(self, messages, *args, **kwargs):
+        if "fail" in messages[-1].content and self.failures < 1:
+            self.failures += 1
+            raise ConnectionError("Vertex unavailable")
+        return await super()._agenerate(messages, *args, **kwargs)
+
+
+def _write_transcripts(path, count):
+    with path.open("w") as file:
+        for index in range(count):
+            content = f"I'm user {index}" if index != 3 else "fail once"
+            file.write(json.dumps({
+                "id": index,
+                "messages": [{"role": "user", "content": content}],
+            }) + "\n")
+
+
+@pytest.mark.asyncio
+async def test_backfill_retries_and_resumes(tmp_path):
+    "Failed calls are retried and reruns skip checkpointed transcripts."
+    source = tmp_path / "transcripts.jsonl"
+    output = tmp_path / "extracted.jsonl"
+    _write_transcripts(source, 10)
+    model = FlakyChatModel(extractions=[{"name": "Alice"}])
+    agent = ResumeAgent(model=model)
+
+    stats = await backfill(
+        agent, str(source), str(output), max_concurrency=3, retries=1
+    )
+
+    assert stats == {"extracted": 10, "skipped": 0, "failed": 0}
+    assert model.failures == 1
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(row["id"] for row in rows) == list(range(10))
+    assert rows[0]["data"]["name"] == "Alice"
+    assert "email" in rows[0]["missing_fields"]
+
+    _write_transcripts(source, 12)
+    stats = await backfill(agent, str(source), str(output), retries=0)
+
+    assert stats == {"extracted": 2, "skipped": 10, "failed": 0}
+    assert len(output.read_text().splitlines()) == 12
+
+
+@pytest.mark.asyncio
+async def test_corrupt_lines_are_counted_and_skipped(tmp_path, caplog):
+    source = tmp_path / "transcripts.jsonl"
+    output = tmp_path / "extracted.jsonl"
+    _write_transcripts(source, 3)
+    lines = source.read_text().splitlines(keepends=True)
+    lines[1:1] = ['{"id": 9, "messages": [\n', "42\n"]
+    source.write_text("".join(lines))
+    agent = ResumeAgent(model=FakeChatModel(extractions=[{"name": "Alice"}]))
+
+    stats = await backfill(agent, str(source), str(output))
+
+    assert stats == {"extracted": 3, "skipped": 0, "failed": 2}
+    rows = [json.loads(line) for line in output.read_text().splitlines()]
+    assert sorted(row["id"] for row in rows) == [0, 1, 2]
+    assert "line 2" in caplog.text and "line 3" in caplog.text
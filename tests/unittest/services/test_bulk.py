@@ -0,0 +1,74 @@
+import asyncio
+import json
+from pathlib import Path
+
+import pytest
+
+from ale.services.bulk import render_bulk
+from ale.tools import BasicServices
+from tests.fakes import stub_generator
+
+SAMPLE = json.loads(
+    (Path(__file__).parents[3] / "data" / "resume_sample.json").read_text()
+)
+
+
+@pytest.mark.asyncio
+async def test_render_bulk_reports_results(monkeypatch, tmp_path):
+    "Valid records are rendered concurrently and bad ones reported."
+    source = tmp_path / "resumes.jsonl"
+    with source.open("w") as file:
+        for index in range(20):
+            file.write(json.dumps({**SAMPLE, "name": f"John {index}"}) + "\n")
+        file.write("{not json\n")
+        file.write(json.dumps({"experience": "not a list"}) + "\n")
+
+    with stub_generator(delay=0.05) as server:
+        monkeypatch.setattr(
+            "ale.tools.resume.service", BasicServices(server.url)
+        )
+        report = await render_bulk(
+            str(source), str(tmp_path / "out"), concurrency=5
+        )
+
+    summary = report.summary()
+    assert summary["rendered"] == 20
+    assert sorted(report.failures) == [21, 22]
+    assert len(server.requests) == 20
+    assert len(list((tmp_path / "out").glob("*.pdf"))) == 20
+    assert summary["latency_s"]["p50"] >= 0.05
+    assert summary["elapsed_s"] < 20 * 0.05
+
+
+class _Unprintable:
+    def __str__(self):
+        raise LookupError("no path")
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("result", [OSError, _Unprintable])
+async def test_render_errors_never_stall_the_run(
+    monkeypatch, tmp_path, result
+):
+    "Render errors are failed records, and stopped workers end the run."
+    source = tmp_path / "resumes.jsonl"
+    source.write_text(
+        "".join(json.dumps(SAMPLE) + "\n" for _ in range(10))
+    )
+
+    async def render(data, store):
+        if result is OSError:
+            raise OSError("generator unreachable")
+        return result()
+
+    monkeypatch.setattr("ale.services.bulk.arender_resume", render)
+    run = render_bulk(str(source), str(tmp_path / "out"), concurrency=2)
+
+    if result is OSError:
+        report = await asyncio.wait_for(run, timeout=5)
+        assert sorted(report.failures) == list(range(1, 11))
+        assert report.failures[1] == "OSError: generator unreachable"
+    else:
+        # workers die outside the render, the producer must not wait
+        with pytest.raises(LookupError):
+            await asyncio.wait_for(run, timeout=5)
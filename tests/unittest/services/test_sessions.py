@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+from ale.services.chat import Agent
+from ale.services.sessions import SessionManager, SessionNotFoundError
+from tests.fakes import FakeChatModel
+
+
+@pytest.fixture
+def agent(monkeypatch):
+    monkeypatch.setattr(
+        "ale.services.chat.init_chat_model", lambda name: FakeChatModel()
+    )
+    agent = Agent()
+    # answer in plain text rather than calling the bound tool
+    agent.llm = FakeChatModel(replies=["Noted."], latency=0.05)
+    return agent
+
+
+def _messages(agent: Agent, thread_id: str) -> list:
+    return agent.graph.get_state(
+        {"configurable": {"thread_id": thread_id}}
+    ).values.get("messages", [])
+
+
+def test_sessions_keep_separate_histories(agent):
+    sessions = SessionManager(agent)
+    alice, bob = sessions.create("alice"), sessions.create("bob")
+
+    sessions.invoke(alice, "Hi, I'm Alice")
+    sessions.invoke(alice, "I like tea")
+    assert "".join(sessions.stream(bob, "Hi, I'm Bob")) == "Noted."
+
+    assert alice.startswith("alice:") and bob.startswith("bob:")
+    assert len(_messages(agent, alice)) == 4
+    assert len(_messages(agent, bob)) == 2
+
+
+def test_turns_of_a_session_are_serialized(agent):
+    "Sessions run concurrently, but one session runs a turn at a time."
+    sessions = SessionManager(agent)
+    threads = [sessions.create() for _ in range(4)]
+
+    async def run():
+        start = time.perf_counter()
+        await asyncio.gather(*(
+            sessions.ainvoke(thread_id, f"turn {turn}")
+            for thread_id in threads
+            for turn in range(2)
+        ))
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+
+    assert 2 * 0.05 <= elapsed < 8 * 0.05
+    for thread_id in threads:
+        contents = [m.content for m in _messages(agent, thread_id)]
+        assert contents == ["turn 0", "Noted.", "turn 1", "Noted."]
+
+
+def test_idle_sessions_are_evicted(agent):
+    sessions = SessionManager(agent, max_sessions=3, max_bytes=200, ttl=0.2)
+    first = sessions.create()
+    sessions.invoke(first, "x" * 300)
+    # over the size limit once the turn is done
+    assert len(sessions) == 0
+
+    for _ in range(5):
+        sessions.invoke(sessions.create(), "hi")
+    assert len(sessions) == 3
+    time.sleep(0.25)
+    assert sessions.evict() == 3
+
+    with pytest.raises(SessionNotFoundError):
+        sessions.invoke(first, "still there?")
+    assert sessions.stats() == {"sessions": 0, "bytes": 0, "evicted": 6}
+    assert not agent.memory.storage
@@ -0,0 +1,84 @@
+import asyncio
+import threading
+
+import requests
+
+from ale.core.metrics import metrics
+from ale.tools import BasicServices
+from ale.tools.http import ClientRegistry, clients
+from tests.fakes import stub_generator
+
+
+def _host(server) -> str:
+    return server.url.removeprefix("http://")
+
+
+def _stats(client: str, server) -> dict:
+    return clients.snapshot()[client][_host(server)]
+
+
+def test_services_share_sync_connections():
+    "Services calling the same host reuse one pooled connection."
+    with stub_generator() as server:
+        first, second = BasicServices(server.url), BasicServices(server.url)
+        for service in (first, second, first, second):
+            response = service.request("POST", "/", json={})
+            response.close()
+
+        stats = _stats("sync", server)
+
+    assert stats["checkouts"] == 4
+    assert stats["opened"] == 1
+    assert stats["reuse_ratio"] == 0.75
+    assert (stats["in_use"], stats["idle"]) == (0, 1)
+
+
+def test_blocked_checkouts_report_wait():
+    "A saturated pool makes callers wait instead of opening connections."
+    registry = ClientRegistry(pool_connections=1, pool_maxsize=1)
+    with stub_generator(delay=0.2) as server:
+        session = requests.Session()
+        session.mount("http://", registry.adapter())
+        threads = [
+            threading.Thread(
+                target=lambda: session.post(server.url, json={})
+            )
+            for _ in range(2)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    stats = registry.snapshot()["sync"][_host(server)]
+    assert stats["opened"] == 1
+    assert stats["mean_wait_s"] >= 0.05
+
+
+def test_async_services_share_client_per_loop():
+    with stub_generator() as server:
+        first, second = BasicServices(server.url), BasicServices(server.url)
+
+        async def run():
+            assert first.async_session is second.async_session
+            for service in (first, second):
+                response = await service.arequest("POST", "/", json={})
+                await response.aread()
+                await response.aclose()
+            stats = _stats("async", server)
+            await first.aclose()
+            return stats
+
+        stats = asyncio.run(run())
+
+    assert stats["checkouts"] == 2
+    assert stats["opened"] == 1
+    assert stats["idle"] == 1
+    gauges = [
+        item
+        for item in metrics.to_json()["gauges"]
+        if item["labels"].get("host") == _host(server)
+    ]
+    assert {item["name"] for item in gauges} == {
+        "ale_http_pool_connections", "ale_http_pool_reuse_ratio"
+    }
@@ -0,0 +1,101 @@
+import asyncio
+import time
+
+import pytest
+
+from ale.models.resume import ResumeData
+from ale.tools import BasicServices
+from ale.tools.resilience import CircuitOpenError
+from ale.tools.resume import arender_resume, render_resume
+from ale.tools.storage import ResumeStore
+from tests.fakes import stub_generator
+
+
+@pytest.fixture
+def generator(monkeypatch, tmp_path):
+    # renders are hedged and retried here, as with an idempotent generator
+    monkeypatch.setattr("ale.tools.resume.c.RESUME_HEDGE_RENDER", True)
+    with stub_generator() as server:
+        client = BasicServices(server.url, deadline=2)
+        client.upstream.latency.initial_delay = 0.05
+        monkeypatch.setattr("ale.tools.resume.service", client)
+        server.client = client
+        yield server
+
+
+def _render(name: str, tmp_path, use_async: bool = False):
+    store = ResumeStore(str(tmp_path / name), 1024 * 1024, 60)
+    data = ResumeData(name=name)
+    if use_async:
+        return asyncio.run(arender_resume(data, store))
+    return render_resume(data, store)
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_slow_attempt_is_hedged(generator, tmp_path, use_async):
+    "A second attempt answers while the first one is stuck."
+    generator.faults.append(1.0)
+
+    start = time.monotonic()
+    path = _render("Alice", tmp_path, use_async)
+
+    assert path.exists()
+    assert time.monotonic() - start < 0.5
+    assert len(generator.requests) == 2
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_render_is_not_hedged_by_default(
+    generator, monkeypatch, tmp_path, use_async
+):
+    "A slow generator is waited for rather than sent the POST twice."
+    monkeypatch.setattr("ale.tools.resume.c.RESUME_HEDGE_RENDER", False)
+    generator.faults.append(0.3)
+
+    assert _render("Alice", tmp_path, use_async).exists()
+    assert len(generator.requests) == 1
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_failed_attempt_is_retried_once(generator, tmp_path, use_async):
+    # no hedge, so a slow first connection cannot add an attempt
+    generator.client.upstream.latency.initial_delay = 5
+    generator.faults.extend([503, "drop", 503, 503])
+
+    with pytest.raises(RuntimeError):
+        _render("Alice", tmp_path, use_async)
+    with pytest.raises(RuntimeError, match="503"):
+        _render("Bob", tmp_path, use_async)
+    assert _render("Carol", tmp_path, use_async).exists()
+    assert len(generator.requests) == 5
+
+
+@pytest.mark.parametrize("use_async", [False, True])
+def test_deadline_fails_fast(generator, tmp_path, use_async):
+    generator.client.deadline = 0.3
+    generator.faults.extend([2.0, 2.0])
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="within 0.3s"):
+        _render("Alice", tmp_path, use_async)
+    assert time.monotonic() - start < 1
+
+
+def test_breaker_opens_then_recovers(generator, tmp_path):
+    "Calls fail fast while the circuit is open, and a trial closes it."
+    breaker = generator.client.upstream.breaker
+    breaker.failure_threshold = 2
+    breaker.reset_timeout = 0.2
+    generator.faults.extend([500] * 4)
+
+    for name in ("Alice", "Bob"):
+        with pytest.raises(RuntimeError):
+            _render(name, tmp_path)
+    with pytest.raises(CircuitOpenError):
+        _render("Carol", tmp_path)
+    assert breaker.state == breaker.OPEN
+    assert len(generator.requests) == 4
+
+    time.sleep(0.25)
+    assert _render("Dave", tmp_path).exists()
+    assert breaker.state == breaker.CLOSED
@@ -0,0 +1,20 @@
+import asyncio
+
+from ale.tools import BasicServices
+from tests.fakes import stub_generator
+
+
+def test_async_clients_close_with_their_loop():
+    "A client is closed by the end of its loop, without an `aclose` call."
+    with stub_generator() as server:
+        service = BasicServices(server.url)
+
+        async def run():
+            response = await service.async_session.post(server.url, json={})
+            await response.aread()
+            return service.async_session
+
+        first, second = asyncio.run(run()), asyncio.run(run())
+
+    assert first is not second
+    assert first.is_closed and second.is_closed
@@ -0,0 +1,50 @@
+import os
+import time
+
+import pytest
+
+from ale.models.resume import ResumeData
+from ale.tools.storage import ResumeStore, content_key
+
+
+def test_content_key_is_canonical():
+    "Equal data hashes the same regardless of construction order."
+    first = ResumeData(name="Alice", skills={"ml": ["nlp"], "web": ["js"]})
+    second = ResumeData(skills={"web": ["js"], "ml": ["nlp"]}, name="Alice")
+
+    assert content_key(first) == content_key(second)
+    assert content_key(first) != content_key(ResumeData(name="Bob"))
+
+
+def test_writer_is_atomic(tmp_path):
+    "A failed download never leaves a visible entry behind."
+    store = ResumeStore(str(tmp_path), max_bytes=1024, ttl=60)
+
+    with pytest.raises(ValueError):
+        with store.writer("key") as file:
+            file.write(b"partial")
+            raise ValueError("connection dropped")
+
+    assert store.get("key") is None
+    assert list(tmp_path.iterdir()) == []
+
+    with store.writer("key") as file:
+        file.write(b"complete")
+    assert store.get("key").read_bytes() == b"complete"
+
+
+def test_eviction_by_ttl_and_size(tmp_path):
+    "Stale entries expire and the least recently used go over budget."
+    store = ResumeStore(str(tmp_path), max_bytes=10, ttl=60)
+    for key in ("old", "mid", "new"):
+        with store.writer(key) as file:
+            file.write(b"1234")
+        stamp = time.time() - {"old": 30, "mid": 20, "new": 10}[key]
+        os.utime(store.path(key), (stamp, stamp))
+
+    store.evict()
+    assert store.get("old") is None
+    assert store.get("mid") is not None
+
+    os.utime(store.path("new"), (time.time() - 120,) * 2)
+    assert store.get("new") is None